@@ -82,73 +82,160 @@ _patch_ld_library_path_and_reexec()
 # =========================
 # 기존 코드 (여기부터는 torch import OK)
 # =========================
-import pymysql
-import pandas as pd
 import numpy as np
 from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
-import joblib
 
 import torch
-import torch.nn as nn
-from torch.utils.data import Dataset, DataLoader
 
 # =========================
 # 1. 설정
 # =========================
+import argparse
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--finetune", action="store_true",
+                    help="이전 번들에서 이어서 학습 (지난 학습 이후 새 행 + 과거 행 replay)")
+parser.add_argument("--full", action="store_true", help="데이터 스냅샷(--reservoir면 reservoir)을 처음부터 다시 sync")
+parser.add_argument("--no-dedup", action="store_true", help="중복 행을 합치지 않고 그대로 학습")
+parser.add_argument("--round-temp", type=float, default=None,
+                    help="중복 비교 전에 기온을 이 간격으로 반올림 (예: 0.5)")
+parser.add_argument("--round-wind", type=float, default=None,
+                    help="중복 비교 전에 풍속을 이 간격으로 반올림 (예: 0.5)")
+parser.add_argument("--dedup-passes", type=int, default=1,
+                    help="에폭당 합친 train 반복 횟수 (기본 1: 에폭이 합친 행 수만큼 짧아짐, "
+                         "0이면 원본 행 수 / 합친 행 수 → 원본 에폭과 같은 step 수)")
+parser.add_argument("--reservoir", type=int, default=None,
+                    help="전체 스냅샷 대신 최근 행 가중 샘플 N행으로 학습 (reservoir.py)")
+parser.add_argument("--half-life", type=float, default=None,
+                    help="--reservoir 가중치 반감기 (일, 기본 reservoir.HALF_LIFE_DAYS)")
+parser.add_argument("--profile", action="store_true",
+                    help="에폭별 데이터 로딩 / 연산 시간 측정 (GPU면 배치마다 synchronize해서 학습이 느려짐)")
+args = parser.parse_args()
+
+FINETUNE = args.finetune
+
 BATCH_SIZE = 64
 EPOCHS = 30
 LR = 1e-3
 RANDOM_SEED = 42
 
+# 이어서 학습(--finetune) 설정: 에폭/학습률을 낮추고, 새 행 1개당 과거 행 REPLAY_RATIO개를 섞음
+FINETUNE_EPOCHS = 5
+FINETUNE_LR = 3e-4
+REPLAY_RATIO = 2.0
+MIN_REPLAY = 2000
+
+# early stopping: val(top+bottom 정확도 합)이 MIN_DELTA 넘게 좋아지지 않은 에폭이 PATIENCE번 연속이면 중단
+PATIENCE = 5
+MIN_DELTA = 1e-3
+
+# train 정확도: 매 에폭은 학습 중 forward 결과로 센 running 값만 출력 (추가 연산 없음)
+# TRAIN_EVAL_EVERY 에폭마다 train에서 TRAIN_EVAL_SAMPLE개를 뽑아 eval 모드로 다시 계산 (0이면 안 함, None이면 전체)
+TRAIN_EVAL_EVERY = 5
+TRAIN_EVAL_SAMPLE = 5000
+EVAL_BATCH_SIZE = 4096  # 평가는 grad가 없어서 큰 배치로
+
+# 같은 (weather_code, 기온, 풍속, top, bottom) 행은 split별로 하나로 합치고 개수를 샘플 가중치로 사용
+# (반올림을 안 하면 데이터 전체의 가중 loss / 정확도는 원본과 같고, 학습·평가 행 수만 줄어듦
+#  배치 하나의 가중 loss는 원본 배치 loss와 같지는 않고 그 불편 추정)
+DEDUP = not args.no_dedup
+DEDUP_TEMP_ROUND = args.round_temp
+DEDUP_WIND_ROUND = args.round_wind
+
+# 테이블이 커져도 학습 행 수 / 메모리를 고정하려면 최근 행 가중 reservoir 샘플 사용 (None이면 전체 스냅샷)
+RESERVOIR_SIZE = args.reservoir
+
+if FINETUNE:
+    EPOCHS = FINETUNE_EPOCHS
+    LR = FINETUNE_LR
+
 torch.manual_seed(RANDOM_SEED)
 np.random.seed(RANDOM_SEED)
 
+# 단계별 시간 / 최대 메모리 → train_profile.jsonl (train_profile.py)
+# --profile이면 에폭별 데이터 로딩 vs 연산 시간 / samples/s도 (배치마다 동기화하므로 측정할 때만)
+from train_profile import TRAIN_PROFILE_PATH, TrainProfiler
+
+prof = TrainProfiler(finetune=FINETUNE, batch_size=BATCH_SIZE, lr=LR, epochs=EPOCHS)
+
 # =========================
-# 2. DB에서 데이터 로드
+# 2. 데이터 로드 (data_snapshot.py / reservoir.py)
+#    - DB에서는 지난 학습 이후 새로 들어온 행만 스트리밍으로 가져와 로컬 스냅샷에 붙임
+#    - 학습은 스냅샷(memmap 컬럼 파일)에서 읽음
+#    - --reservoir N이면 스냅샷 대신 created_at 기준 최근 행 가중 샘플 N행 (읽는 인터페이스는 같음)
 # =========================
-conn = pymysql.connect(
-    host="localhost",
-    user="dbid253",
-    password="dbpass253",
-    db="db25320",
-    charset="utf8mb4"
-)
+prof.begin("db_load")
+if RESERVOIR_SIZE:
+    from reservoir import HALF_LIFE_DAYS, RESERVOIR_PATH, sync_reservoir
 
-query = """
-SELECT
-    weather_code,
-    temperature,
-    wind_speed,
-    top,
-    bottom
-FROM userdata
-WHERE top IS NOT NULL
-  AND bottom IS NOT NULL;
-"""
-df = pd.read_sql(query, conn)
-conn.close()
+    HALF_LIFE = args.half_life or HALF_LIFE_DAYS
+    snap = sync_reservoir(RESERVOIR_PATH, RESERVOIR_SIZE, HALF_LIFE, full=args.full)
+else:
+    from data_snapshot import SNAPSHOT_DIR, sync_snapshot
+
+    snap = sync_snapshot(SNAPSHOT_DIR, full=args.full)
 
 # =========================
 # 3. 입력(X) / 출력(y) 구성
 # =========================
-X_weather = df["weather_code"].astype(int).values
-X_num = df[["temperature", "wind_speed"]].astype(float).values
+prof.begin("snapshot_read")
+X_weather, X_num, y_top, y_bottom = snap.arrays()
+
+# 이어서 학습: 이전 번들의 watermark 이후 행 전부 + 그 이전 행에서 replay 샘플
+if FINETUNE:
+    from model_bundle import BUNDLE_PATH, ModelBundle
+
+    prev = ModelBundle.open(BUNDLE_PATH)
+    prev_watermark = prev.meta.get("snapshot_watermark")
+    if prev_watermark is None:
+        raise RuntimeError(f"{BUNDLE_PATH}에 snapshot_watermark가 없습니다. 먼저 전체 학습을 돌려야 합니다.")
+
+    is_new = np.asarray(snap["id"])[snap.labeled()] > prev_watermark  # arrays()와 같은 행
+    new_rows = np.flatnonzero(is_new)
+    old_rows = np.flatnonzero(~is_new)
+    if len(new_rows) == 0:
+        print(f"새 데이터 없음 (watermark={prev_watermark}) → 학습 생략")
+        sys.exit(0)
+
+    n_replay = min(len(old_rows), max(int(len(new_rows) * REPLAY_RATIO), MIN_REPLAY))
+    replay_rows = np.random.default_rng(RANDOM_SEED).choice(old_rows, n_replay, replace=False)
+    rows = np.sort(np.concatenate([new_rows, replay_rows]))
 
-y_top = df["top"].astype(str).values
-y_bottom = df["bottom"].astype(str).values
+    X_weather, X_num, y_top, y_bottom = X_weather[rows], X_num[rows], y_top[rows], y_bottom[rows]
+    print(f"이어서 학습: 새 행 {len(new_rows)} + replay {n_replay} (이전 bundle_id={prev.bundle_id})")
+
+n_rows = len(X_weather)
 
 # =========================
 # 4. 라벨 인코딩
 # =========================
-le_top = LabelEncoder()
-le_bottom = LabelEncoder()
-
-y_top_enc = le_top.fit_transform(y_top)
-y_bottom_enc = le_bottom.fit_transform(y_bottom)
-
-num_top_classes = len(le_top.classes_)
-num_bottom_classes = len(le_bottom.classes_)
+#    - 이어서 학습이면 이전 클래스 순서를 그대로 두고 새 클래스만 뒤에 붙임 (head 출력 확장)
+def extend_classes(classes, labels):
+    new = np.setdiff1d(np.unique(labels), classes)
+    return np.concatenate([classes, new]), new
+
+def encode_labels(classes, labels):
+    order = np.argsort(classes)
+    return order[np.searchsorted(classes[order], labels)]
+
+prof.begin("label_encode")
+if FINETUNE:
+    top_classes, new_top = extend_classes(np.array(prev["top_classes"]), y_top)
+    bottom_classes, new_bottom = extend_classes(np.array(prev["bottom_classes"]), y_bottom)
+    y_top_enc = encode_labels(top_classes, y_top)
+    y_bottom_enc = encode_labels(bottom_classes, y_bottom)
+    if len(new_top) or len(new_bottom):
+        print("새 클래스:", list(new_top), list(new_bottom))
+else:
+    le_top = LabelEncoder()
+    le_bottom = LabelEncoder()
+
+    y_top_enc = le_top.fit_transform(y_top)
+    y_bottom_enc = le_bottom.fit_transform(y_bottom)
+    top_classes, bottom_classes = le_top.classes_, le_bottom.classes_
+
+num_top_classes = len(top_classes)
+num_bottom_classes = len(bottom_classes)
 
 # =========================
 # 5. Train/Val/Test split  ✅ (여기만 교체됨)
@@ -156,103 +243,66 @@ num_bottom_classes = len(le_bottom.classes_)
 #    - 샘플 1개짜리 클래스는 train에만 넣고,
 #      나머지(2개 이상)만 stratify 적용
 # =========================
-idx = np.arange(len(df))
-y_strat = y_top_enc  # stratify 기준: top
-
-# 클래스별 카운트
-counts = np.bincount(y_strat)
-rare_classes = np.where(counts < 2)[0]  # 샘플 1개 클래스
-
-rare_mask = np.isin(y_strat, rare_classes)
-rare_idx = idx[rare_mask]        # 희귀 클래스 샘플
-common_idx = idx[~rare_mask]     # 2개 이상 클래스 샘플
-
-def safe_train_test_split(indices, test_size, seed, stratify_labels=None):
-    """
-    stratify_labels가 있고, 각 클래스가 최소 2개 이상일 때만 stratify 적용.
-    아니면 일반 랜덤 split으로 fallback.
-    """
-    if stratify_labels is None:
-        return train_test_split(indices, test_size=test_size, random_state=seed, shuffle=True)
-
-    c = np.bincount(stratify_labels)
-    if (c < 2).any():
-        return train_test_split(indices, test_size=test_size, random_state=seed, shuffle=True)
-
-    return train_test_split(
-        indices,
-        test_size=test_size,
-        random_state=seed,
-        shuffle=True,
-        stratify=stratify_labels
-    )
-
-# (1) common만 stratify로 train/temp split
-train_common, temp_common = safe_train_test_split(
-    common_idx,
-    test_size=0.3,
-    seed=RANDOM_SEED,
-    stratify_labels=y_strat[~rare_mask]
-)
-
-# (2) rare는 train에만 합류
-train_idx = np.concatenate([train_common, rare_idx])
-
-# train 섞기
-rng = np.random.default_rng(RANDOM_SEED)
-rng.shuffle(train_idx)
+from clothes_train import split_train_val_test
 
-# (3) temp를 val/test로 split (가능하면 stratify, 아니면 랜덤)
-val_idx, test_idx = safe_train_test_split(
-    temp_common,
-    test_size=0.5,
-    seed=RANDOM_SEED,
-    stratify_labels=y_strat[temp_common]
-)
+prof.begin("split")
+y_strat = y_top_enc  # stratify 기준: top
+train_idx, val_idx, test_idx = split_train_val_test(y_strat, RANDOM_SEED)
 
 # =========================
-# 6. 수치 입력 스케일링 (train 기준 mean/std)
+# 6. 입력 전처리: weather_code -> idx + 수치 스케일링 (preprocess.py, 추론과 같은 transform)
+#    - mean/std는 train 기준, weather_code 사전은 전체 행 기준
+#    - 이어서 학습이면 이전 transform을 그대로 쓰고 새 코드만 뒤에 추가
 # =========================
-train_num = X_num[train_idx]
-num_mean = train_num.mean(axis=0)
-num_std = train_num.std(axis=0) + 1e-8
+from preprocess import ClothesTransform
 
-X_num_scaled = (X_num - num_mean) / num_std
+prof.begin("scale")
+if FINETUNE:
+    transform, new_codes = ClothesTransform.from_arrays(prev).extend(X_weather)
+    if len(new_codes):
+        print("새 weather_code:", new_codes.tolist())
+else:
+    transform = ClothesTransform.fit(X_weather, X_num, train_idx)
 
-# weather_code -> 연속 인덱스 매핑
-unique_codes = np.unique(X_weather)
-code_to_idx = {c: i for i, c in enumerate(unique_codes)}
-X_weather_idx = np.array([code_to_idx[c] for c in X_weather], dtype=np.int64)
-num_weather_codes = len(unique_codes)
+X_weather_idx, X_num_scaled = transform.transform(X_weather, X_num[:, 0], X_num[:, 1])
+num_weather_codes = transform.num_codes
 
 # =========================
-# 7. Dataset / DataLoader
+# 7. Dataset / 배치 로더 (clothes_data.py)
+#    - split별로 통째 텐서, 미니배치는 셔플된 인덱스로 한 번에 슬라이싱
+#    - DEDUP이면 split 안에서 중복 행을 합침 (반올림은 원래 단위에서 한 뒤 스케일링)
 # =========================
-class ClothesDataset(Dataset):
-    def __init__(self, w_idx, x_num, y_top, y_bottom, indices):
-        self.w = w_idx[indices]
-        self.x = x_num[indices]
-        self.yt = y_top[indices]
-        self.yb = y_bottom[indices]
-
-    def __len__(self):
-        return len(self.w)
-
-    def __getitem__(self, i):
-        return (
-            torch.tensor(self.w[i], dtype=torch.long),
-            torch.tensor(self.x[i], dtype=torch.float32),
-            torch.tensor(self.yt[i], dtype=torch.long),
-            torch.tensor(self.yb[i], dtype=torch.long),
-        )
-
-train_ds = ClothesDataset(X_weather_idx, X_num_scaled, y_top_enc, y_bottom_enc, train_idx)
-val_ds   = ClothesDataset(X_weather_idx, X_num_scaled, y_top_enc, y_bottom_enc, val_idx)
-test_ds  = ClothesDataset(X_weather_idx, X_num_scaled, y_top_enc, y_bottom_enc, test_idx)
-
-train_loader = DataLoader(train_ds, batch_size=BATCH_SIZE, shuffle=True)
-val_loader   = DataLoader(val_ds, batch_size=BATCH_SIZE, shuffle=False)
-test_loader  = DataLoader(test_ds, batch_size=BATCH_SIZE, shuffle=False)
+from clothes_data import ClothesDataset, IndexBatchLoader, collapse_duplicates
+
+prof.begin("dataset")
+
+def make_dataset(indices):
+    if not DEDUP:
+        return ClothesDataset(X_weather_idx, X_num_scaled, y_top_enc, y_bottom_enc, indices)
+    w, x, yt, yb, counts = collapse_duplicates(
+        X_weather_idx[indices], X_num[indices], y_top_enc[indices], y_bottom_enc[indices],
+        temp_round=DEDUP_TEMP_ROUND, wind_round=DEDUP_WIND_ROUND)
+    return ClothesDataset(w, transform.scale(x), yt, yb, weight=counts)
+
+train_ds = make_dataset(train_idx)
+val_ds   = make_dataset(val_idx)
+test_ds  = make_dataset(test_idx)
+# 에폭 1회 = 합친 train을 한 번 (기본, 원본 에폭보다 step이 원본 행 수 / 합친 행 수 배 적어서 에폭이 짧음)
+# --dedup-passes N이면 N번, 0이면 원본 에폭과 같은 step 수가 되도록 반복 (에폭 수 / patience 의미 유지)
+dedup_ratio = args.dedup_passes or max(1, int(round(len(train_idx) / len(train_ds))))
+if DEDUP:
+    print(f"중복 합치기: train {len(train_idx)}→{len(train_ds)} / val {len(val_idx)}→{len(val_ds)} / "
+          f"test {len(test_idx)}→{len(test_ds)}행 (에폭당 {dedup_ratio}회)")
+
+train_loader = IndexBatchLoader(train_ds, batch_size=BATCH_SIZE, shuffle=True, seed=RANDOM_SEED,
+                                passes=dedup_ratio)
+val_loader   = IndexBatchLoader(val_ds, batch_size=EVAL_BATCH_SIZE, shuffle=False)
+test_loader  = IndexBatchLoader(test_ds, batch_size=EVAL_BATCH_SIZE, shuffle=False)
+
+# train 정확도 확인용 (train_idx는 이미 섞여 있어서 앞에서 자르면 랜덤 샘플)
+train_eval_ds = ClothesDataset(X_weather_idx, X_num_scaled, y_top_enc, y_bottom_enc,
+                               train_idx[:TRAIN_EVAL_SAMPLE])
+train_eval_loader = IndexBatchLoader(train_eval_ds, batch_size=EVAL_BATCH_SIZE, shuffle=False)
 
 # =========================
 # 8. GPU 디바이스 설정 (CPU 금지: cuda 없으면 중단)
@@ -263,109 +313,96 @@ if not torch.cuda.is_available():
 device = torch.device("cuda")
 print("DEVICE:", device, "| GPU:", torch.cuda.get_device_name(0))
 
-# =========================
-# 9. 모델 정의 (공유 trunk + top/bottom head)
-# =========================
-class MultiHeadClothesNet(nn.Module):
-    def __init__(self, num_weather_codes, num_top_classes, num_bottom_classes):
-        super().__init__()
-        emb_dim = min(16, max(4, (num_weather_codes + 1) // 2))
-        self.weather_emb = nn.Embedding(num_weather_codes, emb_dim)
-
-        self.trunk = nn.Sequential(
-            nn.Linear(emb_dim + 2, 64),
-            nn.ReLU(),
-            nn.Linear(64, 64),
-            nn.ReLU(),
-        )
-
-        self.head_top = nn.Linear(64, num_top_classes)
-        self.head_bottom = nn.Linear(64, num_bottom_classes)
-
-    def forward(self, w_idx, x_num):
-        w = self.weather_emb(w_idx)
-        h = torch.cat([w, x_num], dim=1)
-        z = self.trunk(h)
-        out_top = self.head_top(z)
-        out_bottom = self.head_bottom(z)
-        return out_top, out_bottom
-
-model = MultiHeadClothesNet(num_weather_codes, num_top_classes, num_bottom_classes).to(device)
-
-# =========================
-# 10. 학습 세팅
-# =========================
-crit = nn.CrossEntropyLoss()
-opt = torch.optim.Adam(model.parameters(), lr=LR)
-
-def eval_loader(loader):
-    model.eval()
-    top_correct = 0
-    bottom_correct = 0
-    n = 0
-    with torch.no_grad():
-        for w, x, yt, yb in loader:
-            w, x, yt, yb = w.to(device), x.to(device), yt.to(device), yb.to(device)
-            out_top, out_bottom = model(w, x)
-            pred_top = out_top.argmax(dim=1)
-            pred_bottom = out_bottom.argmax(dim=1)
-            top_correct += (pred_top == yt).sum().item()
-            bottom_correct += (pred_bottom == yb).sum().item()
-            n += yt.size(0)
-    return top_correct / n, bottom_correct / n
+# 데이터셋을 디바이스에 한 번만 올려둠 (배치마다 host->device 복사 없음)
+prof.begin("to_device")
+for ds in (train_ds, val_ds, test_ds, train_eval_ds):
+    ds.to(device)
 
 # =========================
-# 11. 학습 루프
+# 9. 모델 정의 (공유 trunk + top/bottom head, clothes_model.py)
+#    - 이어서 학습이면 이전 가중치를 올리고, 늘어난 임베딩 행 / head 출력만 새로 초기화
 # =========================
-best_val_sum = -1.0
-for epoch in range(1, EPOCHS + 1):
-    model.train()
-    total_loss = 0.0
+from clothes_model import MultiHeadClothesNet, load_expanded_state_dict
 
-    for w, x, yt, yb in train_loader:
-        w, x, yt, yb = w.to(device), x.to(device), yt.to(device), yb.to(device)
+prof.begin("model_init")
+if FINETUNE:
+    from np_engine import arrays_to_state_dict
 
-        opt.zero_grad()
-        out_top, out_bottom = model(w, x)
+    model = MultiHeadClothesNet(num_weather_codes, num_top_classes, num_bottom_classes,
+                                emb_dim=prev["emb"].shape[1], hidden=prev["w1"].shape[1])
+    expanded = load_expanded_state_dict(model, arrays_to_state_dict(prev))
+    if expanded:
+        print("확장된 파라미터:", expanded)
+    model = model.to(device)
+else:
+    model = MultiHeadClothesNet(num_weather_codes, num_top_classes, num_bottom_classes).to(device)
 
-        loss_top = crit(out_top, yt)
-        loss_bottom = crit(out_bottom, yb)
-        loss = loss_top + loss_bottom
-
-        loss.backward()
-        opt.step()
-
-        total_loss += loss.item()
-
-    val_top_acc, val_bottom_acc = eval_loader(val_loader)
-    train_top_acc, train_bottom_acc = eval_loader(train_loader)
-
-    print(
-        f"[{epoch:02d}/{EPOCHS}] "
-        f"loss={total_loss/len(train_loader):.4f} | "
-        f"train_top={train_top_acc:.3f} train_bottom={train_bottom_acc:.3f} | "
-        f"val_top={val_top_acc:.3f} val_bottom={val_bottom_acc:.3f}"
-    )
-
-    val_sum = val_top_acc + val_bottom_acc
-    if val_sum > best_val_sum:
-        best_val_sum = val_sum
-        torch.save(model.state_dict(), "clothes_multitask_gpu.pt")
+# =========================
+# 10~11. 학습 (clothes_train.py)
+#    - val(top+bottom 정확도 합) 기준 best를 체크포인트로 저장, PATIENCE 에폭 개선 없으면 중단
+# =========================
+from clothes_train import evaluate, train_model
+
+prof.begin("train")
+result = train_model(
+    model, train_loader, val_loader,
+    epochs=EPOCHS, lr=LR, patience=PATIENCE, min_delta=MIN_DELTA,
+    train_eval_loader=train_eval_loader, train_eval_every=TRAIN_EVAL_EVERY,
+    eval_initial=FINETUNE,  # 이어서 학습은 시작 가중치도 후보 (val이 나빠지면 이전 모델 유지)
+    ckpt_path="clothes_multitask_gpu.pt",
+    profiler=prof if args.profile else None,
+)
+epochs_run = result["epochs_run"]
 
 # =========================
 # 12. 최종 테스트 평가
 # =========================
+prof.begin("test_eval")
 model.load_state_dict(torch.load("clothes_multitask_gpu.pt", map_location=device))
-test_top_acc, test_bottom_acc = eval_loader(test_loader)
+test_top_acc, test_bottom_acc = evaluate(model, test_loader)
 print("TEST top_acc:", round(test_top_acc, 4))
 print("TEST bottom_acc:", round(test_bottom_acc, 4))
 
 # =========================
-# 13. 인코더/스케일 정보 저장
+# 13. 모델 번들 저장 (가중치 + 라벨 + weather_code 매핑 + 스케일러, model_bundle.py)
+#     - .pt는 학습 중 best 체크포인트 용도로만 사용
 # =========================
-joblib.dump(le_top, "top_label_encoder.pkl")
-joblib.dump(le_bottom, "bottom_label_encoder.pkl")
-joblib.dump(code_to_idx, "weather_code_to_idx.pkl")
-joblib.dump({"num_mean": num_mean, "num_std": num_std}, "num_scaler.pkl")
+from model_bundle import BUNDLE_PATH, write_bundle
+from np_engine import meta_to_arrays, state_dict_to_arrays
+
+prof.begin("save_bundle")
+bundle_arrays = state_dict_to_arrays(model.state_dict())
+bundle_arrays.update(meta_to_arrays(top_classes, bottom_classes, transform))
+bundle_id = write_bundle(BUNDLE_PATH, bundle_arrays, meta={
+    "epochs": EPOCHS,
+    "epochs_run": epochs_run,
+    "dedup": DEDUP,
+    "dedup_round": [DEDUP_TEMP_ROUND, DEDUP_WIND_ROUND],
+    "n_train_unique": len(train_ds),
+    "batch_size": BATCH_SIZE,
+    "lr": LR,
+    "n_rows": int(n_rows),
+    "snapshot_watermark": snap.watermark,
+    "reservoir": [RESERVOIR_SIZE, HALF_LIFE] if RESERVOIR_SIZE else None,
+    "finetune": FINETUNE,
+    "parent_bundle_id": prev.bundle_id if FINETUNE else None,
+    "test_top_acc": float(test_top_acc),
+    "test_bottom_acc": float(test_bottom_acc),
+})
+
+# test split 원본 값 저장 (quantize.py 등 오프라인 평가용)
+np.savez(
+    "test_split.npz",
+    weather_code=X_weather[test_idx],
+    temperature=X_num[test_idx, 0],
+    wind_speed=X_num[test_idx, 1],
+    top=np.asarray(y_top[test_idx], dtype=str),
+    bottom=np.asarray(y_bottom[test_idx], dtype=str),
+)
+
+print(f"✅ 저장 완료: {BUNDLE_PATH} (bundle_id={bundle_id}) + test_split.npz")
 
-print("✅ 저장 완료: 모델(.pt) + 인코더/스케일러(.pkl)")
+prof.end()
+prof.set(n_rows=int(n_rows), n_train=len(train_ds), epochs_run=epochs_run,
+         device=str(device), bundle_id=bundle_id)
+print(prof.summary(prof.save(TRAIN_PROFILE_PATH)))
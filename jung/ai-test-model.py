@@ -62,55 +62,37 @@ _patch_ld_library_path_and_reexec()
 # 1) imports
 # =========================
 import numpy as np
-import joblib
 import torch
-import torch.nn as nn
 
 # =========================
-# 2) 모델 정의 (학습 코드와 동일해야 함)
+# 2) 모델 정의 (학습 코드와 공용: clothes_model.py)
 # =========================
-class MultiHeadClothesNet(nn.Module):
-    def __init__(self, num_weather_codes, num_top_classes, num_bottom_classes):
-        super().__init__()
-        emb_dim = min(16, max(4, (num_weather_codes + 1) // 2))
-        self.weather_emb = nn.Embedding(num_weather_codes, emb_dim)
-
-        self.trunk = nn.Sequential(
-            nn.Linear(emb_dim + 2, 64),
-            nn.ReLU(),
-            nn.Linear(64, 64),
-            nn.ReLU(),
-        )
-
-        self.head_top = nn.Linear(64, num_top_classes)
-        self.head_bottom = nn.Linear(64, num_bottom_classes)
-
-    def forward(self, w_idx, x_num):
-        w = self.weather_emb(w_idx)
-        h = torch.cat([w, x_num], dim=1)
-        z = self.trunk(h)
-        return self.head_top(z), self.head_bottom(z)
+#    - 번들에 저장된 임베딩 / trunk 폭 그대로 MultiHeadClothesNet 생성
+from np_engine import torch_model_from_arrays
 
 # =========================
-# 3) 로드
+# 3) 로드 (모델 번들 하나: 가중치 + 라벨 + weather_code 매핑 + 스케일러)
+#    - 예전 산출물(.pt + .pkl)은 `python np_engine.py export`로 번들 변환
 # =========================
-le_top = joblib.load("top_label_encoder.pkl")
-le_bottom = joblib.load("bottom_label_encoder.pkl")
-code_to_idx = joblib.load("weather_code_to_idx.pkl")
-scaler = joblib.load("num_scaler.pkl")
-num_mean = scaler["num_mean"]
-num_std = scaler["num_std"]
+from model_bundle import BUNDLE_PATH, ModelBundle
+from preprocess import ClothesTransform
+from np_engine import k_best_pairs, k_best_pairs_batch, rows_from_arrays
 
-num_weather_codes = len(code_to_idx)
-num_top_classes = len(le_top.classes_)
-num_bottom_classes = len(le_bottom.classes_)
+bundle = ModelBundle.open(BUNDLE_PATH)
+top_labels = bundle["top_classes"]
+bottom_labels = bundle["bottom_classes"]
+# weather_code -> idx + 수치 스케일링: 학습과 같은 transform (preprocess.py)
+transform = ClothesTransform.from_arrays(bundle)
+
+num_weather_codes = transform.num_codes
+num_top_classes = len(top_labels)
+num_bottom_classes = len(bottom_labels)
 
 if not torch.cuda.is_available():
     raise RuntimeError("CUDA 사용 불가 (CPU 사용 금지 조건)")
 
 device = torch.device("cuda")
-model = MultiHeadClothesNet(num_weather_codes, num_top_classes, num_bottom_classes).to(device)
-model.load_state_dict(torch.load("clothes_multitask_gpu.pt", map_location=device))
+model = torch_model_from_arrays(bundle).to(device)
 model.eval()
 
 # =========================
@@ -118,22 +100,16 @@ model.eval()
 #    - 상의/하의를 따로 TOP-k 뽑는 대신,
 #      조합 점수 = P(top) * P(bottom) 로 계산해서
 #      "상의-하의 조합"을 TOP-k로 반환
+#    - exact=True면 top_k_each로 자르지 않고 진짜 TOP-k 조합 (np_engine.k_best_pairs)
 # =========================
 @torch.no_grad()
 def recommend_combo(weather_code: int, temperature: float, wind_speed: float,
-                    top_k_each: int = 5, combo_topk: int = 10):
-    # 4-1) weather_code -> idx (학습에 없던 코드면 0번으로 fallback)
-    if weather_code in code_to_idx:
-        w = code_to_idx[weather_code]
-    else:
-        w = 0
-
-    # 4-2) 수치 스케일링 (학습과 동일)
-    x = np.array([temperature, wind_speed], dtype=np.float32)
-    x = (x - num_mean) / (num_std + 1e-8)
+                    top_k_each: int = 5, combo_topk: int = 10, exact: bool = False):
+    # 4-1) weather_code -> idx (학습에 없던 코드면 0번으로 fallback) + 수치 스케일링 (학습과 동일)
+    w, x = transform.transform([weather_code], [temperature], [wind_speed])
 
-    w_t = torch.tensor([w], dtype=torch.long, device=device)
-    x_t = torch.tensor([x], dtype=torch.float32, device=device)
+    w_t = torch.from_numpy(w).to(device)
+    x_t = torch.from_numpy(x).to(device)
 
     out_top, out_bottom = model(w_t, x_t)
 
@@ -141,6 +117,10 @@ def recommend_combo(weather_code: int, temperature: float, wind_speed: float,
     p_top = torch.softmax(out_top, dim=1).squeeze(0)       # (Ct,)
     p_bottom = torch.softmax(out_bottom, dim=1).squeeze(0) # (Cb,)
 
+    if exact:
+        arrays = k_best_pairs(p_top.cpu().numpy(), p_bottom.cpu().numpy(), combo_topk)
+        return rows_from_arrays(top_labels, bottom_labels, *(a[None, :] for a in arrays))[0]
+
     # 상의/하의 각각에서 후보를 줄여서(속도) 조합 계산
     k_top = min(top_k_each, p_top.numel())
     k_bot = min(top_k_each, p_bottom.numel())
@@ -167,8 +147,8 @@ def recommend_combo(weather_code: int, temperature: float, wind_speed: float,
     best_bot_class_idx = bot_idx[j_idx].detach().cpu().numpy()
 
     # 라벨 문자열로 변환
-    best_top_labels = le_top.inverse_transform(best_top_class_idx)
-    best_bot_labels = le_bottom.inverse_transform(best_bot_class_idx)
+    best_top_labels = top_labels[best_top_class_idx]
+    best_bot_labels = bottom_labels[best_bot_class_idx]
 
     # 결과: (상의라벨, 하의라벨, 점수, P(top), P(bottom))
     results = []
@@ -184,7 +164,66 @@ def recommend_combo(weather_code: int, temperature: float, wind_speed: float,
     return results
 
 # =========================
-# 5) 예시 실행
+# 5) 배치 추천 (N개 입력을 한 번의 forward pass로)
+#    - 입력: weather_code / temperature / wind_speed 배열 (길이 N)
+#    - 상의/하의 TOP-k, 조합 점수, 조합 TOP-k 를 전부 배치 텐서 연산으로 처리
+#    - 라벨 변환은 번들의 라벨 배열 인덱싱
+# =========================
+@torch.no_grad()
+def recommend_combo_batch(weather_codes, temperatures, wind_speeds,
+                          top_k_each: int = 5, combo_topk: int = 10, exact: bool = False):
+    # weather_code -> idx + 수치 스케일링 (recommend_combo와 같은 transform, 배열 통째로)
+    w, x = transform.transform(weather_codes, temperatures, wind_speeds)
+    n = len(w)
+    if n == 0:
+        return []
+
+    w_t = torch.from_numpy(w).to(device)
+    x_t = torch.from_numpy(x).to(device)
+
+    out_top, out_bottom = model(w_t, x_t)
+    p_top = torch.softmax(out_top, dim=1)        # (N, Ct)
+    p_bottom = torch.softmax(out_bottom, dim=1)  # (N, Cb)
+
+    if exact:
+        arrays = k_best_pairs_batch(p_top.cpu().numpy(), p_bottom.cpu().numpy(), combo_topk)
+        return rows_from_arrays(top_labels, bottom_labels, *arrays)
+
+    k_top = min(top_k_each, p_top.size(1))
+    k_bot = min(top_k_each, p_bottom.size(1))
+
+    top_vals, top_idx = torch.topk(p_top, k=k_top, dim=1)     # (N, k_top)
+    bot_vals, bot_idx = torch.topk(p_bottom, k=k_bot, dim=1)  # (N, k_bot)
+
+    # 조합 점수: (N, k_top, k_bot) -> (N, k_top*k_bot)
+    combo_scores = (top_vals.unsqueeze(2) * bot_vals.unsqueeze(1)).reshape(n, -1)
+    k_combo = min(combo_topk, combo_scores.size(1))
+    best_scores, best_flat_idx = torch.topk(combo_scores, k=k_combo, dim=1)
+
+    i_idx = best_flat_idx // k_bot
+    j_idx = best_flat_idx % k_bot
+
+    # GPU -> CPU 복사는 한 번씩만
+    best_top_cls = torch.gather(top_idx, 1, i_idx).cpu().numpy()
+    best_bot_cls = torch.gather(bot_idx, 1, j_idx).cpu().numpy()
+    best_pt = torch.gather(top_vals, 1, i_idx).cpu().numpy()
+    best_pb = torch.gather(bot_vals, 1, j_idx).cpu().numpy()
+    best_scores = best_scores.cpu().numpy()
+
+    t_lbls = top_labels[best_top_cls].tolist()
+    b_lbls = bottom_labels[best_bot_cls].tolist()
+    s_list = best_scores.tolist()
+    pt_list = best_pt.tolist()
+    pb_list = best_pb.tolist()
+
+    # 결과: 입력마다 recommend_combo와 같은 형식의 리스트
+    return [
+        list(zip(t_lbls[r], b_lbls[r], s_list[r], pt_list[r], pb_list[r]))
+        for r in range(n)
+    ]
+
+# =========================
+# 6) 예시 실행
 # =========================
 if __name__ == "__main__":
     combos = recommend_combo(weather_code=1, temperature=5.0, wind_speed=3.2,
@@ -192,3 +231,11 @@ if __name__ == "__main__":
     print("TOP 조합 추천(상의, 하의, 점수=Ptop*Pbottom, Ptop, Pbottom):")
     for row in combos:
         print(row)
+
+    batch = recommend_combo_batch(weather_codes=[1, 3, 61],
+                                  temperatures=[5.0, 12.5, 20.0],
+                                  wind_speeds=[3.2, 1.0, 4.5],
+                                  top_k_each=5, combo_topk=3)
+    print("배치 추천 결과:")
+    for inp, rows in zip([(1, 5.0, 3.2), (3, 12.5, 1.0), (61, 20.0, 4.5)], batch):
+        print(inp, rows)
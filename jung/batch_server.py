@@ -0,0 +1,194 @@
+# =========================
+# 동적 micro-batching 추론 서버 (asyncio)
+#   - 동시에 들어온 recommend_combo 요청을 최대 max_wait_ms 또는 max_batch개까지 모아서
+#     recommend_combo_batch 한 번(= forward pass 한 번)으로 처리하고 결과를 각 요청에 돌려줌
+#   - 추론은 executor 스레드에서 돌려서 이벤트 루프를 막지 않음
+#     (추론 중에 들어온 요청은 다음 배치로 자연스럽게 모임)
+#   - 큐에 요청이 하나뿐이면(저부하) 기다리지 않고 바로 처리 → 저부하 지연은 그대로
+#
+# 사용법
+#   python batch_server.py --port 8765
+#   요청/응답: 한 줄에 JSON 하나 (JSON Lines)
+#     -> {"weather_code": 1, "temperature": 5.0, "wind_speed": 3.2, "combo_topk": 10}
+#     <- {"ok": true, "combos": [["재킷", "면바지", 0.023, 0.114, 0.201], ...]}
+# =========================
+import asyncio
+import json
+from collections import defaultdict
+
+
+class MicroBatcher:
+    def __init__(self, engine, max_batch=64, max_wait_ms=2.0, executor=None):
+        """
+        engine: recommend_combo_batch를 가진 객체 (NumpyClothesNet, ComboLookupTable, ComboCache 등)
+        executor: 추론을 돌릴 concurrent.futures executor (None이면 루프 기본 executor)
+        """
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor
+
+        self._queue = None
+        self._task = None
+        self._inflight = []  # 큐에서 꺼냈지만 아직 결과를 못 준 요청 (모으는 중 / 추론 중)
+
+        self.n_requests = 0
+        self.n_batches = 0
+        self.max_seen_batch = 0
+
+    async def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        task, self._task = self._task, None  # 이제부터 들어오는 요청은 RuntimeError
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        # 모으는 중 / 추론 중이던 배치와 큐에 남은 요청은 예외로 끝냄 (기다리던 쪽이 멈추지 않게)
+        pending, self._inflight = self._inflight, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, _, fut in pending:
+            if not fut.done():
+                fut.set_exception(RuntimeError("MicroBatcher가 종료되어 요청을 처리하지 못했습니다."))
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def recommend_combo(self, weather_code, temperature, wind_speed,
+                              top_k_each=5, combo_topk=10):
+        if self._task is None:
+            raise RuntimeError("MicroBatcher.start()를 먼저 호출해야 합니다.")
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put(((weather_code, temperature, wind_speed), (top_k_each, combo_topk), fut))
+        return await fut
+
+    # ---- 배치 수집 ----
+    async def _collect(self):
+        batch = self._inflight = [await self._queue.get()]
+
+        # 이미 쌓여 있는 요청은 기다리지 않고 바로 가져옴
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        # 혼자 온 요청(저부하)은 바로 처리, 동시 요청이 있을 때만 max_wait까지 더 모음
+        if len(batch) == 1:
+            return batch
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            self.n_requests += len(batch)
+            self.n_batches += 1
+            self.max_seen_batch = max(self.max_seen_batch, len(batch))
+
+            # recommend_combo_batch는 k 설정이 하나뿐이라 (top_k_each, combo_topk)별로 묶음
+            groups = defaultdict(list)
+            for args, ks, fut in batch:
+                groups[ks].append((args, fut))
+
+            for (top_k_each, combo_topk), items in groups.items():
+                items = [(a, f) for a, f in items if not f.cancelled()]
+                if not items:
+                    continue
+                w, t, ws = zip(*(a for a, _ in items))
+                try:
+                    rows = await loop.run_in_executor(
+                        self.executor,
+                        lambda: self.engine.recommend_combo_batch(
+                            w, t, ws, top_k_each=top_k_each, combo_topk=combo_topk),
+                    )
+                except Exception as e:
+                    for _, f in items:
+                        if not f.done():
+                            f.set_exception(e)
+                    continue
+                for (_, f), r in zip(items, rows):
+                    if not f.done():
+                        f.set_result(r)
+            self._inflight = []
+
+    def stats(self):
+        return {
+            "requests": self.n_requests,
+            "batches": self.n_batches,
+            "avg_batch": self.n_requests / self.n_batches if self.n_batches else 0.0,
+            "max_batch_seen": self.max_seen_batch,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+
+# =========================
+# JSON Lines TCP 서버
+# =========================
+async def _handle_client(batcher, reader, writer):
+    async def answer(line):
+        try:
+            req = json.loads(line)
+            rows = await batcher.recommend_combo(
+                int(req["weather_code"]), float(req["temperature"]), float(req["wind_speed"]),
+                top_k_each=int(req.get("top_k_each", 5)), combo_topk=int(req.get("combo_topk", 10)),
+            )
+            return {"ok": True, "combos": [list(r) for r in rows]}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            resp = await answer(line)
+            writer.write((json.dumps(resp, ensure_ascii=False) + "\n").encode("utf-8"))
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve(engine, host="127.0.0.1", port=8765, max_batch=64, max_wait_ms=2.0):
+    async with MicroBatcher(engine, max_batch=max_batch, max_wait_ms=max_wait_ms) as batcher:
+        server = await asyncio.start_server(
+            lambda r, w: _handle_client(batcher, r, w), host, port)
+        print(f"추천 서버 시작: {host}:{port} (max_batch={max_batch}, max_wait_ms={max_wait_ms})")
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from model_bundle import BUNDLE_PATH
+    from np_engine import NumpyClothesNet
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--bundle", default=BUNDLE_PATH)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    asyncio.run(serve(NumpyClothesNet.load(args.bundle), args.host, args.port,
+                      args.max_batch, args.max_wait_ms))
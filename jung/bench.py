@@ -0,0 +1,264 @@
+# =========================
+# 추천 경로 추론 벤치마크
+#   - 합성 모델(랜덤 가중치 번들) + 합성 입력으로 실행 → DB / GPU / 학습 산출물 불필요
+#   - 엔진별 측정
+#       latency    : 단건 recommend_combo 지연 p50 / p95 / p99 (ms)
+#       throughput : 배치 크기별 recommend_combo_batch 처리량 (rows/s)
+#       cold_start : 새 프로세스에서 import + 로드 + 첫 결과까지 시간, peak RSS
+#   - 엔진
+#       torch      : ai-test-model.py의 기존 경로 (CPU로 같은 연산)
+#       numpy      : np_engine.NumpyClothesNet
+#       numpy_int8 : quantize.py int8 번들
+#       lookup     : lookup_table.ComboLookupTable (격자 안 입력)
+#       cache      : combo_cache.ComboCache (warm)
+#   - 결과는 JSON (릴리스별 회귀 추적용)
+#
+# 사용법
+#   python bench.py --out bench_result.json
+#   python bench.py --quick --engines numpy lookup
+# =========================
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from model_bundle import ModelBundle, write_bundle
+from np_engine import NumpyClothesNet, meta_to_arrays
+from preprocess import ClothesTransform
+from train_profile import peak_rss_mb
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ENGINES = ("torch", "numpy", "numpy_int8", "lookup", "cache")
+BATCH_SIZES = (1, 16, 64, 256, 1024, 4096)
+
+WEATHER_CODES = [0, 1, 2, 3, 45, 48, 51, 53, 55, 61, 63, 65, 71, 73, 75, 80, 81, 82, 95]
+
+
+# =========================
+# 1) 합성 모델 / 입력
+# =========================
+def make_synthetic_bundle(path, n_top=40, n_bottom=25, hidden=64, seed=0):
+    rng = np.random.default_rng(seed)
+    n_codes = len(WEATHER_CODES)
+    emb_dim = min(16, max(4, (n_codes + 1) // 2))
+
+    def lin(n_in, n_out):
+        bound = 1.0 / np.sqrt(n_in)
+        return (rng.uniform(-bound, bound, (n_in, n_out)).astype(np.float32),
+                rng.uniform(-bound, bound, n_out).astype(np.float32))
+
+    arrays = {"emb": rng.normal(size=(n_codes, emb_dim)).astype(np.float32)}
+    arrays["w1"], arrays["b1"] = lin(emb_dim + 2, hidden)
+    arrays["w2"], arrays["b2"] = lin(hidden, hidden)
+    arrays["wt"], arrays["bt"] = lin(hidden, n_top)
+    arrays["wb"], arrays["bb"] = lin(hidden, n_bottom)
+    arrays.update(meta_to_arrays([f"top_{i:02d}" for i in range(n_top)],
+                                 [f"bottom_{i:02d}" for i in range(n_bottom)],
+                                 ClothesTransform.from_mapping({c: i for i, c in enumerate(WEATHER_CODES)},
+                                                               [12.0, 3.0], [9.0, 2.0])))
+    write_bundle(path, arrays, meta={"synthetic": True, "seed": seed})
+    return path
+
+
+def make_inputs(n, seed=1):
+    rng = np.random.default_rng(seed)
+    return (rng.choice(WEATHER_CODES, n),
+            np.round(rng.uniform(-15, 35, n), 1),
+            np.round(rng.uniform(0, 12, n), 1))
+
+
+# =========================
+# 2) 엔진
+# =========================
+class TorchReference:
+    """ai-test-model.py recommend_combo / recommend_combo_batch와 같은 연산 (CPU)"""
+
+    def __init__(self, bundle_path):
+        import torch
+        from np_engine import torch_model_from_arrays
+
+        self.torch = torch
+        b = ModelBundle.open(bundle_path)
+        self.top_labels = np.array(b["top_classes"])
+        self.bottom_labels = np.array(b["bottom_classes"])
+        self.transform = ClothesTransform.from_arrays(b)
+        self.model = torch_model_from_arrays(b)
+        self.model.eval()
+
+    def _combos(self, out_top, out_bottom, top_k_each, combo_topk):
+        torch = self.torch
+        p_top = torch.softmax(out_top, dim=1)
+        p_bottom = torch.softmax(out_bottom, dim=1)
+        top_vals, top_idx = torch.topk(p_top, k=min(top_k_each, p_top.size(1)), dim=1)
+        bot_vals, bot_idx = torch.topk(p_bottom, k=min(top_k_each, p_bottom.size(1)), dim=1)
+        k_bot = bot_vals.size(1)
+        combo = (top_vals.unsqueeze(2) * bot_vals.unsqueeze(1)).reshape(p_top.size(0), -1)
+        best, flat = torch.topk(combo, k=min(combo_topk, combo.size(1)), dim=1)
+        i_idx, j_idx = flat // k_bot, flat % k_bot
+        t = self.top_labels[torch.gather(top_idx, 1, i_idx).numpy()].tolist()
+        b = self.bottom_labels[torch.gather(bot_idx, 1, j_idx).numpy()].tolist()
+        pt = torch.gather(top_vals, 1, i_idx).numpy().tolist()
+        pb = torch.gather(bot_vals, 1, j_idx).numpy().tolist()
+        return [list(zip(*row)) for row in zip(t, b, best.numpy().tolist(), pt, pb)]
+
+    def recommend_combo(self, weather_code, temperature, wind_speed, top_k_each=5, combo_topk=10):
+        torch = self.torch
+        with torch.no_grad():
+            w, x = self.transform.transform([weather_code], [temperature], [wind_speed])
+            out_top, out_bottom = self.model(torch.from_numpy(w), torch.from_numpy(x))
+            return self._combos(out_top, out_bottom, top_k_each, combo_topk)[0]
+
+    def recommend_combo_batch(self, weather_codes, temperatures, wind_speeds,
+                              top_k_each=5, combo_topk=10):
+        torch = self.torch
+        with torch.no_grad():
+            w, x = self.transform.transform(weather_codes, temperatures, wind_speeds)
+            out_top, out_bottom = self.model(torch.from_numpy(w), torch.from_numpy(x))
+            return self._combos(out_top, out_bottom, top_k_each, combo_topk)
+
+
+def load_engine(name, bundle_path, workdir):
+    if name == "torch":
+        return TorchReference(bundle_path)
+    if name == "numpy":
+        return NumpyClothesNet.load(bundle_path)
+    if name == "numpy_int8":
+        from quantize import quantize_int8
+        path = os.path.join(workdir, "bench.int8.bundle")
+        if not os.path.exists(path):
+            write_bundle(path, quantize_int8(ModelBundle.open(bundle_path)))
+        return NumpyClothesNet.load(path)
+    if name == "lookup":
+        from lookup_table import ComboLookupTable, build_table
+        path = os.path.join(workdir, "bench_table.npz")
+        engine = NumpyClothesNet.load(bundle_path)
+        if not os.path.exists(path):
+            np.savez(path, **build_table(engine))
+        return ComboLookupTable.load(path, fallback=engine, bundle_path=bundle_path)
+    if name == "cache":
+        from combo_cache import ComboCache
+        return ComboCache(NumpyClothesNet.load(bundle_path), maxsize=100000, ttl=None)
+    raise ValueError(f"알 수 없는 엔진: {name}")
+
+
+# =========================
+# 3) 측정
+# =========================
+def _percentiles(samples_s):
+    a = np.asarray(samples_s) * 1000.0
+    return {"p50_ms": float(np.percentile(a, 50)), "p95_ms": float(np.percentile(a, 95)),
+            "p99_ms": float(np.percentile(a, 99)), "mean_ms": float(a.mean())}
+
+
+def bench_latency(engine, n_calls, warmup=50):
+    wc, t, ws = make_inputs(n_calls + warmup, seed=2)
+    wc, t, ws = wc.tolist(), t.tolist(), ws.tolist()
+    for i in range(warmup):
+        engine.recommend_combo(wc[i], t[i], ws[i])
+    samples = []
+    for i in range(warmup, warmup + n_calls):
+        t0 = time.perf_counter()
+        engine.recommend_combo(wc[i], t[i], ws[i])
+        samples.append(time.perf_counter() - t0)
+    return _percentiles(samples)
+
+
+def bench_throughput(engine, batch_sizes, min_rows, min_time=0.2):
+    out = {}
+    for bs in batch_sizes:
+        wc, t, ws = make_inputs(bs, seed=3)
+        engine.recommend_combo_batch(wc, t, ws)  # warmup
+        rows, t0 = 0, time.perf_counter()
+        while rows < min_rows or time.perf_counter() - t0 < min_time:
+            engine.recommend_combo_batch(wc, t, ws)
+            rows += bs
+        dt = time.perf_counter() - t0
+        out[str(bs)] = {"rows_per_s": rows / dt, "batch_ms": dt / (rows / bs) * 1000.0}
+    return out
+
+
+def bench_cold_start(name, bundle_path, workdir):
+    # 새 인터프리터에서 import + 로드 + 첫 결과까지 (자식 프로세스 안에서 측정)
+    cmd = [sys.executable, os.path.abspath(__file__), "--cold-start", name,
+           "--bundle", bundle_path, "--workdir", workdir]
+    t0 = time.perf_counter()
+    res = subprocess.run(cmd, capture_output=True, text=True, cwd=HERE)
+    wall = time.perf_counter() - t0
+    if res.returncode != 0:
+        return {"error": res.stderr.strip().splitlines()[-1] if res.stderr else "failed"}
+    out = json.loads(res.stdout.strip().splitlines()[-1])
+    out["process_wall_s"] = wall
+    return out
+
+
+def _cold_start_child(name, bundle_path, workdir):
+    t0 = time.perf_counter()
+    engine = load_engine(name, bundle_path, workdir)
+    engine.recommend_combo(1, 5.0, 3.2)
+    print(json.dumps({
+        "first_result_s": time.perf_counter() - t0,
+        "peak_rss_mb": peak_rss_mb(),
+    }))
+
+
+def run(engines=ENGINES, batch_sizes=BATCH_SIZES, n_calls=2000, min_rows=20000, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="oot_bench_")
+    bundle_path = make_synthetic_bundle(os.path.join(workdir, "bench.bundle"))
+
+    result = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {"n_calls": n_calls, "min_rows": min_rows, "batch_sizes": list(batch_sizes)},
+        "model": {k: list(ModelBundle.open(bundle_path)[k].shape) for k in ("emb", "wt", "wb")},
+        "engines": {},
+    }
+    for name in engines:
+        try:
+            engine = load_engine(name, bundle_path, workdir)
+        except ImportError as e:
+            result["engines"][name] = {"skipped": str(e)}
+            continue
+        result["engines"][name] = {
+            "cold_start": bench_cold_start(name, bundle_path, workdir),
+            "latency": bench_latency(engine, n_calls),
+            "throughput": bench_throughput(engine, batch_sizes, min_rows),
+        }
+        print(f"[{name}] p50={result['engines'][name]['latency']['p50_ms']:.3f}ms "
+              f"p99={result['engines'][name]['latency']['p99_ms']:.3f}ms "
+              f"bs{batch_sizes[-1]}="
+              f"{result['engines'][name]['throughput'][str(batch_sizes[-1])]['rows_per_s']:.0f} rows/s",
+              flush=True)
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default="bench_result.json")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=ENGINES)
+    parser.add_argument("--quick", action="store_true", help="적은 반복으로 빠르게")
+    parser.add_argument("--cold-start", dest="cold_start", help=argparse.SUPPRESS)
+    parser.add_argument("--bundle", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_start:
+        _cold_start_child(args.cold_start, args.bundle, args.workdir)
+        sys.exit(0)
+
+    if args.quick:
+        result = run(args.engines, batch_sizes=(1, 64, 1024), n_calls=300, min_rows=2000)
+    else:
+        result = run(args.engines)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print("✅ 저장 완료:", args.out)
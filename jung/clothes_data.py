@@ -0,0 +1,161 @@
+# =========================
+# 학습용 데이터셋 / 배치 로더 (통째 텐서)
+#   - ClothesDataset: split 하나를 연속(contiguous) 텐서로 들고 있음 (입력 2 + 라벨 2 + 샘플 가중치)
+#     (샘플마다 torch.tensor를 만들던 __getitem__ + DataLoader collate 비용 제거)
+#   - IndexBatchLoader: 에폭마다 인덱스 순열(randperm)을 만들고 미니배치를 통째로 슬라이싱
+#     shuffle=False면 순열 없이 연속 구간 view를 그대로 돌려줌 (복사 없음)
+#     passes > 1이면 한 번 순회할 때 데이터셋을 그만큼 반복 (순열은 매번 새로)
+#   - dataset.to(device)로 GPU에 한 번만 올려두면 배치마다 host->device 복사가 없음
+#   - 배치는 (w, x, yt, yb, sw): sw는 샘플 가중치 (기본 1, collapse_duplicates로 합친 행은 중복 수)
+#   - collapse_duplicates: 완전히 같은 (weather_code, 기온, 풍속, top, bottom) 행을 하나로 합치고 개수 반환
+#     (기온/풍속은 선택적으로 반올림 후 비교) → 개수를 가중치로 주면 데이터 전체의 가중 loss는 원본과 같음
+#     (미니배치 하나의 가중 loss는 원본 평균 loss의 불편 추정이지 같은 값은 아님)
+#
+# 사용 예
+#   train_ds = ClothesDataset(X_weather_idx, X_num_scaled, y_top_enc, y_bottom_enc, train_idx).to(device)
+#   train_loader = IndexBatchLoader(train_ds, batch_size=64, shuffle=True, seed=42)
+#   for w, x, yt, yb, sw in train_loader:
+#       ...
+# =========================
+import numpy as np
+import torch
+
+
+class ClothesDataset:
+    def __init__(self, w_idx, x_num, y_top, y_bottom, indices=None, weight=None):
+        if indices is not None:
+            w_idx, x_num = w_idx[indices], x_num[indices]
+            y_top, y_bottom = y_top[indices], y_bottom[indices]
+            if weight is not None:
+                weight = weight[indices]
+        if weight is None:
+            weight = np.ones(len(w_idx), dtype=np.float32)
+        self.w = torch.as_tensor(np.ascontiguousarray(w_idx, dtype=np.int64))
+        self.x = torch.as_tensor(np.ascontiguousarray(x_num, dtype=np.float32))
+        self.yt = torch.as_tensor(np.ascontiguousarray(y_top, dtype=np.int64))
+        self.yb = torch.as_tensor(np.ascontiguousarray(y_bottom, dtype=np.int64))
+        self.sw = torch.as_tensor(np.ascontiguousarray(weight, dtype=np.float32))
+
+    @property
+    def device(self):
+        return self.w.device
+
+    def to(self, device):
+        self.w, self.x = self.w.to(device), self.x.to(device)
+        self.yt, self.yb = self.yt.to(device), self.yb.to(device)
+        self.sw = self.sw.to(device)
+        return self
+
+    def __len__(self):
+        return len(self.w)
+
+    def __getitem__(self, i):
+        # i: 정수 / slice / 인덱스 텐서 -> 미니배치 통째로
+        return self.w[i], self.x[i], self.yt[i], self.yb[i], self.sw[i]
+
+    def total_weight(self):
+        # 원본 행 수 (중복을 합치지 않았으면 len과 같음)
+        return float(self.sw.sum())
+
+
+def collapse_duplicates(w_idx, x_num, y_top, y_bottom, temp_round=None, wind_round=None):
+    """
+    같은 (weather_code, 기온, 풍속, top, bottom) 행을 하나로 합침.
+    temp_round / wind_round: 지정하면 그 간격으로 반올림한 뒤 비교 (예: 0.5)
+    반환: (w_idx, x_num, y_top, y_bottom, counts) — 고유 행과 각 행의 원본 개수
+    """
+    x = np.array(x_num, dtype=np.float64)
+    if temp_round:
+        x[:, 0] = np.round(x[:, 0] / temp_round) * temp_round
+    if wind_round:
+        x[:, 1] = np.round(x[:, 1] / wind_round) * wind_round
+
+    # 정수 열은 float64로도 정확히 표현됨 → 한 행렬로 묶어서 np.unique(axis=0)
+    key = np.column_stack([np.asarray(w_idx, dtype=np.float64), x,
+                           np.asarray(y_top, dtype=np.float64), np.asarray(y_bottom, dtype=np.float64)])
+    uniq, counts = np.unique(key, axis=0, return_counts=True)
+    return (uniq[:, 0].astype(np.int64), uniq[:, 1:3], uniq[:, 3].astype(np.int64),
+            uniq[:, 4].astype(np.int64), counts.astype(np.float32))
+
+
+class IndexBatchLoader:
+    def __init__(self, dataset, batch_size=64, shuffle=False, seed=None, drop_last=False, passes=1):
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.passes = passes
+        self._gen = None
+        if shuffle:
+            # 순열은 CPU에서 만들고 데이터가 있는 디바이스로 한 번만 옮김 (cuda generator 불필요)
+            self._gen = torch.Generator()
+            if seed is not None:
+                self._gen.manual_seed(seed)
+
+    def __len__(self):
+        n = len(self.dataset)
+        if self.drop_last:
+            return n // self.batch_size * self.passes
+        return (n + self.batch_size - 1) // self.batch_size * self.passes
+
+    def __iter__(self):
+        n = len(self.dataset)
+        stop = n - n % self.batch_size if self.drop_last else n
+        for _ in range(self.passes):
+            if not self.shuffle:
+                for s in range(0, stop, self.batch_size):
+                    yield self.dataset[s:s + self.batch_size]
+                continue
+            perm = torch.randperm(n, generator=self._gen).to(self.dataset.device)
+            for s in range(0, stop, self.batch_size):
+                yield self.dataset[perm[s:s + self.batch_size]]
+
+
+if __name__ == "__main__":
+    # 테스트용: 기존 per-sample Dataset + DataLoader와 에폭 1회 순회 시간 비교
+    import time
+
+    from torch.utils.data import DataLoader, Dataset
+
+    class _PerSample(Dataset):
+        def __init__(self, ds):
+            self.w, self.x = ds.w.numpy(), ds.x.numpy()
+            self.yt, self.yb = ds.yt.numpy(), ds.yb.numpy()
+
+        def __len__(self):
+            return len(self.w)
+
+        def __getitem__(self, i):
+            return (torch.tensor(self.w[i], dtype=torch.long),
+                    torch.tensor(self.x[i], dtype=torch.float32),
+                    torch.tensor(self.yt[i], dtype=torch.long),
+                    torch.tensor(self.yb[i], dtype=torch.long))
+
+    rng = np.random.default_rng(0)
+    n = 50000
+    ds = ClothesDataset(rng.integers(0, 10, n), rng.normal(size=(n, 2)),
+                        rng.integers(0, 30, n), rng.integers(0, 20, n))
+
+    loader = IndexBatchLoader(ds, batch_size=64, shuffle=True, seed=0)
+    seen = torch.cat([b[0] for b in loader])
+    assert len(seen) == n and len(loader) == (n + 63) // 64
+    assert torch.equal(torch.sort(seen).values, torch.sort(ds.w).values)
+    assert torch.equal(torch.cat([b[1] for b in IndexBatchLoader(ds, 64)]), ds.x)
+
+    # 중복 합치기: 원본 행을 개수만큼 다시 펼치면 (순서 빼고) 원본과 같아야 함
+    wd = rng.integers(0, 3, n)
+    xd = rng.choice([-1.0, 0.5, 2.25], (n, 2))
+    ytd, ybd = rng.integers(0, 2, n), rng.integers(0, 2, n)
+    cw, cx, cyt, cyb, cnt = collapse_duplicates(wd, xd, ytd, ybd)
+    rep = np.repeat(np.column_stack([cw, cx, cyt, cyb]), cnt.astype(int), axis=0)
+    orig = np.column_stack([wd, xd, ytd, ybd])
+    assert cnt.sum() == n and len(cw) < n
+    assert np.array_equal(rep, orig[np.lexsort(orig.T[::-1])])
+    print(f"collapse_duplicates: {n}행 -> {len(cw)}행")
+
+    for name, it in (("DataLoader(per-sample)", lambda: DataLoader(_PerSample(ds), batch_size=64, shuffle=True)),
+                     ("IndexBatchLoader", lambda: IndexBatchLoader(ds, batch_size=64, shuffle=True))):
+        t0 = time.perf_counter()
+        for _ in it():
+            pass
+        print(f"{name}: {time.perf_counter() - t0:.3f}s / epoch ({n}행)")
@@ -0,0 +1,56 @@
+# =========================
+# MultiHeadClothesNet 정의 (학습/추론 공용)
+#   - ai-model.py(학습)와 ai-test-model.py(추론)가 같은 정의를 쓰도록 분리
+#   - state_dict 키: weather_emb / trunk.0 / trunk.2 / head_top / head_bottom
+#   - emb_dim을 지정하지 않으면 weather_code 개수로 정함, hidden은 trunk 폭
+#     (번들에서 복원하거나 이어서 학습할 때는 저장된 emb / trunk 폭을 그대로 넘겨야 함
+#      → np_engine.torch_model_from_arrays)
+# =========================
+import torch
+import torch.nn as nn
+
+
+class MultiHeadClothesNet(nn.Module):
+    def __init__(self, num_weather_codes, num_top_classes, num_bottom_classes, emb_dim=None,
+                 hidden=64):
+        super().__init__()
+        if emb_dim is None:
+            emb_dim = min(16, max(4, (num_weather_codes + 1) // 2))
+        self.weather_emb = nn.Embedding(num_weather_codes, emb_dim)
+
+        self.trunk = nn.Sequential(
+            nn.Linear(emb_dim + 2, hidden),
+            nn.ReLU(),
+            nn.Linear(hidden, hidden),
+            nn.ReLU(),
+        )
+
+        self.head_top = nn.Linear(hidden, num_top_classes)
+        self.head_bottom = nn.Linear(hidden, num_bottom_classes)
+
+    def forward(self, w_idx, x_num):
+        w = self.weather_emb(w_idx)
+        h = torch.cat([w, x_num], dim=1)
+        z = self.trunk(h)
+        return self.head_top(z), self.head_bottom(z)
+
+
+def load_expanded_state_dict(model, state_dict):
+    """
+    이전 state_dict를 (weather_code / 클래스가 늘어난) model에 올림.
+    첫 번째 축(임베딩 행 / head 출력)이 커진 텐서는 앞쪽에 기존 값을 복사하고,
+    새로 생긴 행은 model의 초기값을 그대로 둠. 반환: 확장된 키 목록
+    """
+    own = model.state_dict()
+    expanded = []
+    with torch.no_grad():
+        for k, v in state_dict.items():
+            dst = own[k]
+            if dst.shape == v.shape:
+                dst.copy_(v)
+            elif dst.shape[1:] == v.shape[1:] and dst.shape[0] >= v.shape[0]:
+                dst[:v.shape[0]].copy_(v)
+                expanded.append(k)
+            else:
+                raise ValueError(f"{k}: {tuple(v.shape)} -> {tuple(dst.shape)} 로 확장할 수 없습니다.")
+    return expanded
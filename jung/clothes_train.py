@@ -0,0 +1,222 @@
+# =========================
+# 학습 루프 / 평가 / split (ai-model.py, sweep.py 공용)
+#   - split_train_val_test: 희귀 클래스(샘플 1개)는 train에만, 나머지는 stratify로 70/15/15
+#   - evaluate: 로더 전체에 대한 top / bottom 정확도 (샘플 가중치 반영)
+#   - train_model: Adam + CrossEntropy(top) + CrossEntropy(bottom),
+#                  val(top+bottom 정확도 합) 기준 best 저장 + early stopping
+#     loss는 샘플 가중치 sw로 가중: sum(sw * l) / (배치 크기 * 데이터셋 평균 sw)
+#     → 중복을 합쳐 개수를 가중치로 준 데이터셋에서도 원본 평균 loss의 불편 추정 (가중치 1이면 그냥 평균)
+#     로더의 데이터는 이미 모델과 같은 디바이스에 있다고 가정 (clothes_data.py)
+# =========================
+import copy
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+from sklearn.model_selection import train_test_split
+
+
+# =========================
+# 1) Train/Val/Test split
+# =========================
+def safe_train_test_split(indices, test_size, seed, stratify_labels=None):
+    """
+    stratify_labels가 있고, 각 클래스가 최소 2개 이상일 때만 stratify 적용.
+    아니면 일반 랜덤 split으로 fallback.
+    """
+    if stratify_labels is None:
+        return train_test_split(indices, test_size=test_size, random_state=seed, shuffle=True)
+
+    c = np.bincount(stratify_labels)
+    if (c < 2).any():
+        return train_test_split(indices, test_size=test_size, random_state=seed, shuffle=True)
+
+    return train_test_split(
+        indices,
+        test_size=test_size,
+        random_state=seed,
+        shuffle=True,
+        stratify=stratify_labels
+    )
+
+
+def split_train_val_test(y_strat, seed):
+    """y_strat: stratify 기준 라벨(정수). 반환: (train_idx, val_idx, test_idx), train은 섞인 상태"""
+    idx = np.arange(len(y_strat))
+
+    # 클래스별 카운트
+    counts = np.bincount(y_strat)
+    rare_classes = np.where(counts < 2)[0]  # 샘플 1개 클래스
+
+    rare_mask = np.isin(y_strat, rare_classes)
+    rare_idx = idx[rare_mask]        # 희귀 클래스 샘플
+    common_idx = idx[~rare_mask]     # 2개 이상 클래스 샘플
+
+    # (1) common만 stratify로 train/temp split
+    train_common, temp_common = safe_train_test_split(
+        common_idx,
+        test_size=0.3,
+        seed=seed,
+        stratify_labels=y_strat[~rare_mask]
+    )
+
+    # (2) rare는 train에만 합류
+    train_idx = np.concatenate([train_common, rare_idx])
+
+    # train 섞기
+    rng = np.random.default_rng(seed)
+    rng.shuffle(train_idx)
+
+    # (3) temp를 val/test로 split (가능하면 stratify, 아니면 랜덤)
+    val_idx, test_idx = safe_train_test_split(
+        temp_common,
+        test_size=0.5,
+        seed=seed,
+        stratify_labels=y_strat[temp_common]
+    )
+    return train_idx, val_idx, test_idx
+
+
+# =========================
+# 2) 평가
+# =========================
+def evaluate(model, loader):
+    model.eval()
+    top_correct = 0.0
+    bottom_correct = 0.0
+    n = 0.0
+    with torch.no_grad():
+        for w, x, yt, yb, sw in loader:
+            out_top, out_bottom = model(w, x)
+            pred_top = out_top.argmax(dim=1)
+            pred_bottom = out_bottom.argmax(dim=1)
+            top_correct += ((pred_top == yt) * sw).sum().item()
+            bottom_correct += ((pred_bottom == yb) * sw).sum().item()
+            n += sw.sum().item()
+    return top_correct / n, bottom_correct / n
+
+
+# =========================
+# 3) 학습 루프
+# =========================
+def train_model(model, train_loader, val_loader, epochs, lr, patience=None, min_delta=0.0,
+                train_eval_loader=None, train_eval_every=0, eval_initial=False,
+                ckpt_path=None, log=print, profiler=None):
+    """
+    patience: val이 min_delta 넘게 좋아지지 않은 에폭이 patience번 연속이면 중단 (None이면 끝까지)
+              min_delta는 중단 판단에만 쓰고, best 저장은 val이 조금이라도 좋아지면 함
+    train_eval_loader / train_eval_every: 그 에폭마다 train 샘플에서 eval 모드 정확도를 다시 계산,
+                                          나머지 에폭은 학습 중 forward로 센 running 정확도만 출력
+    eval_initial: 시작 가중치도 best 후보로 (이어서 학습할 때 나빠지면 이전 모델 유지)
+    ckpt_path: best가 갱신될 때마다 state_dict 저장 (None이면 메모리에만)
+    profiler: train_profile.TrainProfiler — 에폭별 데이터 로딩 / forward+backward / 평가 시간 기록
+    반환: best_state / best_val_sum / best_epoch / epochs_run / history
+    """
+    device = next(model.parameters()).device
+    crit = nn.CrossEntropyLoss(reduction="none")
+    opt = torch.optim.Adam(model.parameters(), lr=lr)
+    n_train = len(train_loader.dataset)
+    total_w = train_loader.dataset.total_weight()
+    mean_w = total_w / n_train
+    # 에폭 1회에 데이터셋을 몇 번 도는지 (IndexBatchLoader passes)
+    passes = getattr(train_loader, "passes", 1)
+    rows_per_epoch, weight_per_epoch = n_train * passes, total_w * passes
+
+    best = {"best_val_sum": -1.0, "best_epoch": 0, "best_state": None}
+
+    def save_best(val_sum, epoch):
+        best["best_val_sum"] = val_sum
+        best["best_epoch"] = epoch
+        best["best_state"] = copy.deepcopy(model.state_dict())
+        if ckpt_path is not None:
+            torch.save(model.state_dict(), ckpt_path)
+
+    if eval_initial:
+        save_best(sum(evaluate(model, val_loader)), 0)
+        if log is not None:
+            log(f"[시작] val_sum={best['best_val_sum']:.3f}")
+
+    history = []
+    bad_epochs = 0
+    epoch = 0
+    for epoch in range(1, epochs + 1):
+        model.train()
+        # loss / 정답 수는 디바이스 텐서로 누적 (배치마다 .item()으로 동기화하지 않음)
+        total_loss = torch.zeros((), device=device)
+        run_top = torch.zeros((), device=device)
+        run_bottom = torch.zeros((), device=device)
+
+        # 배치 사이 시간 = 데이터 로딩, 배치 안 시간 = forward/backward/step
+        data_s = compute_s = 0.0
+        t_mark = time.perf_counter()
+        for w, x, yt, yb, sw in train_loader:
+            t_batch = time.perf_counter()
+            data_s += t_batch - t_mark
+
+            opt.zero_grad()
+            out_top, out_bottom = model(w, x)
+
+            norm = len(yt) * mean_w
+            loss_top = (crit(out_top, yt) * sw).sum() / norm
+            loss_bottom = (crit(out_bottom, yb) * sw).sum() / norm
+            loss = loss_top + loss_bottom
+
+            loss.backward()
+            opt.step()
+
+            total_loss += loss.detach()
+            run_top += ((out_top.argmax(dim=1) == yt) * sw).sum()
+            run_bottom += ((out_bottom.argmax(dim=1) == yb) * sw).sum()
+
+            if profiler is not None:
+                profiler.sync(device)
+            t_mark = time.perf_counter()
+            compute_s += t_mark - t_batch
+
+        val_top_acc, val_bottom_acc = evaluate(model, val_loader)
+
+        if train_eval_loader is not None and train_eval_every and \
+                (epoch % train_eval_every == 0 or epoch == epochs):
+            train_top_acc, train_bottom_acc = evaluate(model, train_eval_loader)
+            train_msg = f"train_top={train_top_acc:.3f} train_bottom={train_bottom_acc:.3f}"
+        else:
+            train_top_acc = run_top.item() / weight_per_epoch
+            train_bottom_acc = run_bottom.item() / weight_per_epoch
+            train_msg = f"train_top~{train_top_acc:.3f} train_bottom~{train_bottom_acc:.3f}"
+
+        avg_loss = total_loss.item() / len(train_loader)
+        eval_s = time.perf_counter() - t_mark
+        if profiler is not None:
+            profiler.epoch(epoch=epoch, samples=rows_per_epoch, weighted_samples=weight_per_epoch,
+                           data_s=data_s, compute_s=compute_s, eval_s=eval_s,
+                           samples_per_s=rows_per_epoch / max(data_s + compute_s, 1e-9))
+        history.append({"epoch": epoch, "loss": avg_loss,
+                        "train_top": train_top_acc, "train_bottom": train_bottom_acc,
+                        "val_top": val_top_acc, "val_bottom": val_bottom_acc})
+        if log is not None:
+            log(
+                f"[{epoch:02d}/{epochs}] "
+                f"loss={avg_loss:.4f} | "
+                f"{train_msg} | "
+                f"val_top={val_top_acc:.3f} val_bottom={val_bottom_acc:.3f}"
+            )
+
+        # best는 조금이라도 좋아지면 저장, patience는 min_delta 넘게 좋아졌을 때만 초기화
+        val_sum = val_top_acc + val_bottom_acc
+        prev_best = best["best_val_sum"]
+        if val_sum > prev_best:
+            save_best(val_sum, epoch)
+        if val_sum > prev_best + min_delta:
+            bad_epochs = 0
+        else:
+            bad_epochs += 1
+            if patience is not None and bad_epochs >= patience:
+                if log is not None:
+                    log(f"early stopping: {patience}에폭 동안 val 개선 없음 "
+                        f"(best val_sum={best['best_val_sum']:.3f})")
+                break
+
+    best["epochs_run"] = epoch
+    best["history"] = history
+    return best
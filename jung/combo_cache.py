@@ -0,0 +1,208 @@
+# =========================
+# recommend_combo 결과 캐시 (LRU + TTL)
+#   - 키: (weather_code, 기온 bin, 풍속 bin, top_k_each, combo_topk)
+#     기온/풍속은 temp_step / wind_step 간격으로 양자화하고,
+#     모델에는 bin 중심값을 넣어서 같은 bin이면 누가 먼저 물어봐도 같은 결과
+#   - 모델 번들이 바뀌면(bundle_id 변경) 캐시 전체 무효화 + 엔진 재로드
+#     (확인 / 교체는 락 안에서 한 스레드만, 항목마다 만든 엔진의 version을 같이 저장해서
+#      교체 전에 시작한 계산 결과는 교체 후 캐시에 들어가지 않음)
+#   - hit / miss / eviction / expired / invalidation 카운터로 크기 조정
+#
+# 사용 예
+#   engine = NumpyClothesNet.load()
+#   cache = ComboCache(engine, maxsize=20000, ttl=3600,
+#                      bundle_path=BUNDLE_PATH, reload=NumpyClothesNet.load)
+#   cache.recommend_combo(1, 5.0, 3.2)
+#   print(cache.stats())
+# =========================
+import threading
+import time
+from collections import OrderedDict
+
+from model_bundle import read_bundle_id
+
+
+class ComboCache:
+    def __init__(self, engine, maxsize=10000, ttl=3600.0, temp_step=1.0, wind_step=1.0,
+                 bundle_path=None, reload=None, check_interval=5.0, clock=time.monotonic):
+        """
+        engine: recommend_combo / recommend_combo_batch를 가진 객체
+                (NumpyClothesNet, ComboLookupTable 등)
+        ttl: 초 단위, None이면 만료 없음
+        bundle_path: 지정하면 check_interval초마다 번들 헤더의 bundle_id를 확인해서
+                     바뀌었으면 캐시를 비우고 reload(bundle_path)로 엔진 교체 (reload 필수)
+        """
+        if bundle_path is not None and reload is None:
+            raise ValueError("bundle_path를 주면 reload(새 엔진을 만드는 함수)도 필요합니다.")
+        self.engine = engine
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.temp_step = temp_step
+        self.wind_step = wind_step
+
+        self.bundle_path = bundle_path
+        self.reload = reload
+        self.check_interval = check_interval
+        self.version = getattr(engine, "bundle_id", None)
+        self._clock = clock
+        self._last_check = clock()
+
+        self._data = OrderedDict()  # key -> (expires_at, version, rows)
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()  # 엔진 재로드는 한 스레드만 (로드 중에도 조회는 예전 엔진으로)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self.invalidations = 0
+
+    # ---- 키 ----
+    def _key(self, weather_code, temperature, wind_speed, top_k_each, combo_topk):
+        return (int(weather_code),
+                round(temperature / self.temp_step),
+                round(wind_speed / self.wind_step),
+                top_k_each, combo_topk)
+
+    # ---- 무효화 ----
+    def invalidate(self):
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+
+    def set_version(self, version, engine=None):
+        """version이 바뀌면 (engine을 주면 엔진도 같이) 교체하고 캐시 비움"""
+        with self._lock:
+            if version == self.version:
+                return
+            if engine is not None:
+                self.engine = engine
+            self.version = version
+            self._data.clear()
+            self.invalidations += 1
+
+    def _maybe_reload(self, now):
+        if self.bundle_path is None:
+            return
+        with self._lock:
+            if now - self._last_check < self.check_interval:
+                return
+            self._last_check = now  # 이번 주기는 이 스레드만 확인
+        if not self._reload_lock.acquire(blocking=False):
+            return  # 다른 스레드가 재로드 중
+        try:
+            try:
+                bundle_id = read_bundle_id(self.bundle_path)
+            except OSError:
+                return  # 번들 교체 중(파일 없음) — 다음 확인 때 다시
+            if bundle_id != self.version:
+                self.set_version(bundle_id, engine=self.reload(self.bundle_path))
+        finally:
+            self._reload_lock.release()
+
+    def _current(self):
+        with self._lock:
+            return self.engine, self.version
+
+    # ---- 조회 / 저장 ----
+    def _get(self, key, now, version):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, item_version, rows = item
+            if item_version != version:
+                del self._data[key]  # 예전 엔진 결과
+                self.misses += 1
+                return None
+            if expires_at is not None and now >= expires_at:
+                del self._data[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return rows
+
+    def _put(self, key, rows, now, version):
+        expires_at = None if self.ttl is None else now + self.ttl
+        with self._lock:
+            if version != self.version:
+                return  # 계산하는 동안 엔진이 바뀜 → 예전 엔진 결과는 저장하지 않음
+            self._data[key] = (expires_at, version, rows)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def recommend_combo(self, weather_code, temperature, wind_speed,
+                        top_k_each=5, combo_topk=10):
+        now = self._clock()
+        self._maybe_reload(now)
+        engine, version = self._current()
+
+        key = self._key(weather_code, temperature, wind_speed, top_k_each, combo_topk)
+        rows = self._get(key, now, version)
+        if rows is None:
+            rows = engine.recommend_combo(key[0], key[1] * self.temp_step,
+                                          key[2] * self.wind_step,
+                                          top_k_each=top_k_each, combo_topk=combo_topk)
+            self._put(key, rows, now, version)
+        return list(rows)
+
+    def recommend_combo_batch(self, weather_codes, temperatures, wind_speeds,
+                              top_k_each=5, combo_topk=10):
+        now = self._clock()
+        self._maybe_reload(now)
+        engine, version = self._current()
+
+        keys = [self._key(w, t, ws, top_k_each, combo_topk)
+                for w, t, ws in zip(weather_codes, temperatures, wind_speeds)]
+        results = [self._get(k, now, version) for k in keys]
+
+        # miss만 모아서 한 번에 계산 (같은 키가 여러 번 나오면 한 번만)
+        missing = list(OrderedDict.fromkeys(k for k, r in zip(keys, results) if r is None))
+        if missing:
+            computed = engine.recommend_combo_batch(
+                [k[0] for k in missing],
+                [k[1] * self.temp_step for k in missing],
+                [k[2] * self.wind_step for k in missing],
+                top_k_each=top_k_each, combo_topk=combo_topk,
+            )
+            fresh = dict(zip(missing, computed))
+            for k, rows in fresh.items():
+                self._put(k, rows, now, version)
+            results = [fresh[k] if r is None else r for k, r in zip(keys, results)]
+
+        return [list(r) for r in results]
+
+    # ---- 통계 ----
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "invalidations": self.invalidations,
+                "version": self.version,
+            }
+
+
+if __name__ == "__main__":
+    import random
+
+    from model_bundle import BUNDLE_PATH
+    from np_engine import NumpyClothesNet
+
+    cache = ComboCache(NumpyClothesNet.load(), maxsize=1000, ttl=3600,
+                       bundle_path=BUNDLE_PATH, reload=NumpyClothesNet.load)
+    for _ in range(5000):
+        cache.recommend_combo(random.choice([0, 1, 3, 61]),
+                              random.uniform(-5, 30), random.uniform(0, 8))
+    print(cache.stats())
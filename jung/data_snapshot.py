@@ -0,0 +1,305 @@
+# =========================
+# 학습 데이터 로컬 스냅샷 (컬럼형, memmap)
+#   - userdata를 서버측 스트리밍 커서(SSCursor)로 chunk 단위로 읽어서
+#     컬럼별 raw 바이너리 파일에 이어 붙임 (파일 하나 = 컬럼 하나, np.memmap으로 바로 읽기)
+#   - top / bottom 문자열은 사전(vocab) 인코딩: 파일에는 int32 코드, vocab은 meta.json
+#   - meta.json에 watermark(가져온 id 중 최대) 저장 → 다음 실행부터는 id > watermark - rescan 인 행만 가져옴
+#     (재학습 때 DB는 새 행만 읽고, 전체 테이블 스캔 없음)
+#   - 늦게 커밋된 행: AUTO_INCREMENT id는 INSERT 때 정해지고 커밋 순서와 다를 수 있음
+#     → 매번 watermark 아래 rescan(기본 RESCAN_WINDOW)개 id 범위를 다시 읽어서 스냅샷에 없는 id만 붙임
+#     (그보다 더 늦게 커밋된 행은 빠짐 → 긴 트랜잭션이 있었으면 --full)
+#   - top / bottom이 NULL인 행도 코드 UNLABELED(-1)로 저장해 둠 (sentinel)
+#     → 다음 sync 때 그 id들만 다시 조회해서 라벨이 채워졌으면 그 자리에 덮어씀
+#     학습용으로 읽을 때(arrays() / labels())는 라벨이 있는 행만 (labeled() 마스크)
+#   - 컬럼 파일을 먼저 쓰고 meta.json은 마지막에 원자적으로 교체
+#     → 중간에 죽어도 meta의 n_rows까지만 유효, 다음 sync 때 뒤에 남은 조각은 잘라냄
+#   - normalize.py 등으로 (라벨 채우기 말고) 기존 행이 바뀌었으면 full=True (--full)로 다시 만들어야 함
+#
+# 사용법
+#   python data_snapshot.py            # 증분 sync
+#   python data_snapshot.py --full     # 처음부터 다시
+#   python data_snapshot.py --info     # DB 접속 없이 스냅샷 정보만
+#
+#   snap = sync_snapshot()             # 학습 코드에서
+#   X_weather = snap["weather_code"]; y_top = snap.labels("top")
+# =========================
+import json
+import os
+
+import numpy as np
+
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "dbid253",
+    "password": "dbpass253",
+    "db": "db25320",
+    "charset": "utf8mb4",
+}
+
+SNAPSHOT_DIR = "userdata_snapshot"
+SOURCE_TABLE = "userdata"
+WATERMARK_COL = "id"
+CHUNK_SIZE = 20000
+RESCAN_WINDOW = 1000    # 늦게 커밋된 행을 찾으려고 watermark 아래로 다시 읽는 id 범위
+FILL_BATCH = 1000       # sentinel 행 라벨 확인 때 IN (...) 하나에 넣는 id 수
+UNLABELED = -1          # top / bottom이 NULL인 행의 코드
+FORMAT_VERSION = 2      # 1: sentinel 없음 (그대로 읽을 수 있음)
+
+# 컬럼 -> 저장 dtype (top / bottom은 vocab 코드)
+COLUMNS = {
+    "id": "<i8",
+    "weather_code": "<i4",
+    "temperature": "<f8",
+    "wind_speed": "<f8",
+    "top": "<i4",
+    "bottom": "<i4",
+}
+LABEL_COLUMNS = ("top", "bottom")
+
+
+def _empty_meta():
+    return {
+        "format_version": FORMAT_VERSION,
+        "source_table": SOURCE_TABLE,
+        "columns": COLUMNS,
+        "n_rows": 0,
+        "watermark": None,
+        "vocab": {c: [] for c in LABEL_COLUMNS},
+    }
+
+
+def _to_float(v):
+    return np.nan if v is None else float(v)
+
+
+class Snapshot:
+    def __init__(self, path=SNAPSHOT_DIR):
+        self.path = path
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                self.meta = json.load(f)
+            if self.meta.get("format_version") not in (1, FORMAT_VERSION):
+                raise ValueError(f"지원하지 않는 스냅샷 포맷: {self.meta.get('format_version')}")
+            self.meta["format_version"] = FORMAT_VERSION
+        else:
+            self.meta = _empty_meta()
+        self.filled = 0
+
+    @property
+    def n_rows(self):
+        return self.meta["n_rows"]
+
+    @property
+    def watermark(self):
+        return self.meta["watermark"]
+
+    def __len__(self):
+        return self.n_rows
+
+    def _file(self, col):
+        return os.path.join(self.path, col + ".bin")
+
+    def __getitem__(self, col):
+        # 읽기 전용 memmap (n_rows까지만)
+        dtype = np.dtype(self.meta["columns"][col])
+        if self.n_rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self._file(col), dtype=dtype, mode="r", shape=(self.n_rows,))
+
+    def vocab(self, col):
+        return np.asarray(self.meta["vocab"][col], dtype=str)
+
+    def labeled(self):
+        # top / bottom이 둘 다 있는 행 (sentinel 제외)
+        return (np.asarray(self["top"]) != UNLABELED) & (np.asarray(self["bottom"]) != UNLABELED)
+
+    def labels(self, col):
+        # vocab 코드 -> 라벨 문자열 배열 (라벨 있는 행만, arrays()와 같은 순서)
+        return self.vocab(col)[np.asarray(self[col])[self.labeled()]]
+
+    def arrays(self):
+        # 학습 코드용: (weather_code, [temperature, wind_speed], top 라벨, bottom 라벨), 라벨 있는 행만
+        mask = self.labeled()
+        X_weather = np.asarray(self["weather_code"], dtype=np.int64)[mask]
+        X_num = np.stack([self["temperature"], self["wind_speed"]], axis=1)[mask]
+        return X_weather, X_num, self.labels("top"), self.labels("bottom")
+
+    # ---- 쓰기 ----
+    def _write_meta(self):
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    def _open_columns(self):
+        # 지난 sync가 중간에 죽었으면 meta.n_rows 뒤의 조각을 잘라내고 append 모드로 염
+        files = {}
+        for col, dtype in COLUMNS.items():
+            path = self._file(col)
+            with open(path, "ab") as f:
+                f.truncate(self.n_rows * np.dtype(dtype).itemsize)
+            files[col] = open(path, "ab")
+        return files
+
+    def reset(self):
+        os.makedirs(self.path, exist_ok=True)
+        self.meta = _empty_meta()
+        for col in COLUMNS:
+            if os.path.exists(self._file(col)):
+                os.remove(self._file(col))
+        self._write_meta()
+
+    def _encode(self, col, values):
+        # 라벨 -> vocab 코드 (처음 보는 라벨은 vocab 뒤에 추가, None은 UNLABELED)
+        vocab = self.meta["vocab"][col]
+        idx = {v: i for i, v in enumerate(vocab)}
+        out = np.empty(len(values), dtype=COLUMNS[col])
+        for i, v in enumerate(values):
+            if v is None:
+                out[i] = UNLABELED
+                continue
+            v = str(v)
+            code = idx.get(v)
+            if code is None:
+                code = idx[v] = len(vocab)
+                vocab.append(v)
+            out[i] = code
+        return out
+
+    def append_rows(self, files, rows):
+        # rows: (id, weather_code, temperature, wind_speed, top, bottom) 튜플 리스트
+        ids, codes, temps, winds, tops, bottoms = zip(*rows)
+        cols = {
+            "id": np.asarray(ids, dtype=COLUMNS["id"]),
+            "weather_code": np.asarray(codes, dtype=COLUMNS["weather_code"]),
+            "temperature": np.asarray([_to_float(v) for v in temps], dtype=COLUMNS["temperature"]),
+            "wind_speed": np.asarray([_to_float(v) for v in winds], dtype=COLUMNS["wind_speed"]),
+            "top": self._encode("top", tops),
+            "bottom": self._encode("bottom", bottoms),
+        }
+        for col, a in cols.items():
+            files[col].write(a.tobytes())
+        self.meta["n_rows"] += len(rows)
+        # 늦게 커밋된 행은 id 순서가 아니게 붙으므로 마지막 id가 아니라 최대 id
+        self.meta["watermark"] = max(int(cols["id"].max()), self.watermark if self.watermark is not None else -1)
+
+    def sync(self, connect=None, chunk_size=CHUNK_SIZE, full=False, rescan=RESCAN_WINDOW):
+        """
+        DB에서 watermark - rescan 이후 행 중 스냅샷에 없는 것만 스트리밍으로 가져와 붙이고,
+        라벨이 비어 있던 행은 채워졌는지 확인해서 덮어씀.
+        반환: 새로 붙인 행 수 (라벨이 새로 채워진 행 수는 self.filled)
+        """
+        import pymysql
+
+        if full or not os.path.exists(os.path.join(self.path, "meta.json")):
+            self.reset()
+
+        conn = connect() if connect is not None else pymysql.connect(**DB_CONFIG)
+        try:
+            added = self._append_new(conn, chunk_size, rescan)
+            self.filled = self._fill_labels(conn)
+        finally:
+            conn.close()
+        return added
+
+    def _append_new(self, conn, chunk_size, rescan):
+        import pymysql
+
+        low = -1 if self.watermark is None else self.watermark - rescan
+        ids = np.asarray(self["id"])
+        have = set(ids[ids > low].tolist())  # rescan 범위에서 이미 가져온 id
+
+        files = self._open_columns()
+        added = 0
+        try:
+            cursor = conn.cursor(pymysql.cursors.SSCursor)
+            # 라벨 NULL 조건은 넣지 않음 (NULL 행도 sentinel로 저장해야 나중에 채워진 걸 찾음)
+            query = f"""
+            SELECT {WATERMARK_COL}, weather_code, temperature, wind_speed, top, bottom
+            FROM {SOURCE_TABLE}
+            WHERE {WATERMARK_COL} > %s
+            ORDER BY {WATERMARK_COL}
+            """
+            cursor.execute(query, (low,))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                rows = [r for r in rows if r[0] not in have]
+                if rows:
+                    self.append_rows(files, rows)
+                    added += len(rows)
+            cursor.close()
+        finally:
+            for f in files.values():
+                f.flush()
+                os.fsync(f.fileno())
+                f.close()
+            # 컬럼 파일이 다 써진 뒤에 meta 교체 (예외가 나도 그때까지 붙인 chunk는 유효)
+            self._write_meta()
+        return added
+
+    def _fill_labels(self, conn):
+        # sentinel 행(라벨 NULL이었던 행) 중 지금은 top / bottom이 다 있는 행을 그 자리에 덮어씀
+        pos = np.flatnonzero(~self.labeled())
+        if len(pos) == 0:
+            return 0
+        ids = np.asarray(self["id"])[pos]
+        where = {int(i): int(p) for i, p in zip(ids, pos)}
+
+        found = []
+        with conn.cursor() as cursor:
+            for start in range(0, len(ids), FILL_BATCH):
+                chunk = ids[start:start + FILL_BATCH].tolist()
+                cursor.execute(
+                    f"SELECT {WATERMARK_COL}, top, bottom FROM {SOURCE_TABLE} "
+                    f"WHERE {WATERMARK_COL} IN ({', '.join(['%s'] * len(chunk))}) "
+                    f"AND top IS NOT NULL AND bottom IS NOT NULL",
+                    chunk,
+                )
+                found.extend(cursor.fetchall())
+        if not found:
+            return 0
+
+        rows = [where[int(r[0])] for r in found]
+        codes = {c: self._encode(c, [r[i + 1] for r in found]) for i, c in enumerate(LABEL_COLUMNS)}
+        # vocab을 먼저 저장 (덮어쓰다 죽어도 파일의 코드는 항상 meta vocab 안에 있음, 다음 sync 때 이어서 채움)
+        self._write_meta()
+        for col in LABEL_COLUMNS:
+            itemsize = np.dtype(COLUMNS[col]).itemsize
+            with open(self._file(col), "r+b") as f:
+                for p, code in zip(rows, codes[col]):
+                    f.seek(p * itemsize)
+                    f.write(code.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        return len(found)
+
+
+def sync_snapshot(path=SNAPSHOT_DIR, full=False, chunk_size=CHUNK_SIZE, connect=None):
+    snap = Snapshot(path)
+    added = snap.sync(connect=connect, chunk_size=chunk_size, full=full)
+    print(f"스냅샷 sync: +{added}행, 라벨 채워짐 {snap.filled}행 "
+          f"(총 {snap.n_rows}행 중 라벨 없음 {snap.n_rows - int(snap.labeled().sum())}행, watermark={snap.watermark})")
+    return snap
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", default=SNAPSHOT_DIR)
+    parser.add_argument("--full", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--info", action="store_true")
+    args = parser.parse_args()
+
+    if args.info:
+        snap = Snapshot(args.path)
+    else:
+        snap = sync_snapshot(args.path, full=args.full, chunk_size=args.chunk_size)
+    print(f"{args.path}: {snap.n_rows}행, watermark={snap.watermark}, "
+          f"top {len(snap.meta['vocab']['top'])}종 / bottom {len(snap.meta['vocab']['bottom'])}종")
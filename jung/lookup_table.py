@@ -0,0 +1,252 @@
+# =========================
+# 추천 결과 룩업 테이블 (weather_code × 기온 구간 × 풍속 구간)
+#   - build: 학습된 모델을 (알려진 weather_code 전체) × (기온 bin) × (풍속 bin) 격자에서
+#            한 번에 평가해서 셀마다 TOP 조합을 미리 계산해 .npz로 저장
+#   - lookup: recommend_combo와 같은 인자/출력, 격자 안이면 배열 인덱싱만으로 O(1)
+#             interpolate=True면 주변 4개 셀 확률을 bilinear 보간 후 조합 계산
+#             격자 밖(모르는 코드, 범위 밖 기온/풍속, 다른 k 설정)은 live 모델로 fallback
+#   - 테이블에 만든 번들의 bundle_id를 저장, load 때 현재 번들과 다르면 다시 만듦
+#     (재학습 후 예전 테이블을 그대로 쓰지 않게), ComboCache의 version으로도 쓰임
+#
+# 사용법
+#   python lookup_table.py build        # clothes_model.bundle -> combo_table.npz
+#   python lookup_table.py              # 예시 조회
+# =========================
+import numpy as np
+
+from model_bundle import read_bundle_id
+from np_engine import BUNDLE_PATH, NumpyClothesNet, combo_arrays, combos_from_proba, rows_from_arrays
+
+TABLE_PATH = "combo_table.npz"
+
+# (최소, 최대, 간격) — 최소/최대도 격자점에 포함
+TEMP_GRID = (-25.0, 40.0, 0.5)
+WIND_GRID = (0.0, 20.0, 0.5)
+
+
+def _axis(grid):
+    lo, hi, step = grid
+    n = int(round((hi - lo) / step)) + 1
+    return lo + step * np.arange(n)
+
+
+# =========================
+# 1) build
+# =========================
+def build_table(engine, temp_grid=TEMP_GRID, wind_grid=WIND_GRID,
+                top_k_each=5, combo_topk=10, chunk=65536):
+    temps = _axis(temp_grid)
+    winds = _axis(wind_grid)
+    codes = engine.codes
+    n_cells = len(codes) * len(temps) * len(winds)
+
+    # 셀 순서: (code, temp, wind) C-order
+    g_code, g_temp, g_wind = (a.reshape(-1) for a in np.meshgrid(codes, temps, winds, indexing="ij"))
+
+    k_top = min(top_k_each, len(engine.top_labels))
+    k_bot = min(top_k_each, len(engine.bottom_labels))
+    k_combo = min(combo_topk, k_top * k_bot)
+
+    p_top = np.empty((n_cells, len(engine.top_labels)), dtype=np.float16)
+    p_bottom = np.empty((n_cells, len(engine.bottom_labels)), dtype=np.float16)
+    combo_top = np.empty((n_cells, k_combo), dtype=np.int16)
+    combo_bottom = np.empty((n_cells, k_combo), dtype=np.int16)
+    combo_score = np.empty((n_cells, k_combo), dtype=np.float32)
+    combo_pt = np.empty((n_cells, k_combo), dtype=np.float32)
+    combo_pb = np.empty((n_cells, k_combo), dtype=np.float32)
+
+    for s in range(0, n_cells, chunk):
+        e = min(s + chunk, n_cells)
+        pt, pb = engine.predict_proba(g_code[s:e], g_temp[s:e], g_wind[s:e])
+        p_top[s:e] = pt
+        p_bottom[s:e] = pb
+        (combo_top[s:e], combo_bottom[s:e], combo_score[s:e],
+         combo_pt[s:e], combo_pb[s:e]) = combo_arrays(pt, pb, top_k_each, combo_topk)
+
+    return {
+        "bundle_id": np.array(engine.bundle_id or ""),
+        "codes": codes,
+        "temp_grid": np.array(temp_grid, dtype=np.float64),
+        "wind_grid": np.array(wind_grid, dtype=np.float64),
+        "k": np.array([top_k_each, combo_topk], dtype=np.int64),
+        "top_classes": engine.top_labels,
+        "bottom_classes": engine.bottom_labels,
+        "p_top": p_top,
+        "p_bottom": p_bottom,
+        "combo_top": combo_top,
+        "combo_bottom": combo_bottom,
+        "combo_score": combo_score,
+        "combo_pt": combo_pt,
+        "combo_pb": combo_pb,
+    }
+
+
+def build_and_save(bundle_path=BUNDLE_PATH, out_path=TABLE_PATH, **kwargs):
+    table = build_table(NumpyClothesNet.load(bundle_path), **kwargs)
+    np.savez(out_path, **table)
+    return out_path
+
+
+# =========================
+# 2) lookup
+# =========================
+class ComboLookupTable:
+    def __init__(self, table, fallback=None):
+        # 예전(bundle_id 없는) 테이블은 None → 어떤 번들과도 다름
+        self.bundle_id = str(table["bundle_id"]) or None if "bundle_id" in table else None
+        self.codes = np.asarray(table["codes"], dtype=np.int64)
+        self.t_lo, self.t_hi, self.t_step = (float(v) for v in table["temp_grid"])
+        self.w_lo, self.w_hi, self.w_step = (float(v) for v in table["wind_grid"])
+        self.n_temp = len(_axis(table["temp_grid"]))
+        self.n_wind = len(_axis(table["wind_grid"]))
+        self.top_k_each, self.combo_topk = (int(v) for v in table["k"])
+
+        self.top_labels = np.asarray(table["top_classes"])
+        self.bottom_labels = np.asarray(table["bottom_classes"])
+        self.p_top = table["p_top"]
+        self.p_bottom = table["p_bottom"]
+        self.combo_top = table["combo_top"]
+        self.combo_bottom = table["combo_bottom"]
+        self.combo_score = table["combo_score"]
+        self.combo_pt = table["combo_pt"]
+        self.combo_pb = table["combo_pb"]
+
+        self._code_pos = {int(c): i for i, c in enumerate(self.codes)}
+
+        # 격자 밖 입력용 live 모델 (recommend_combo / recommend_combo_batch를 가진 객체)
+        self.fallback = fallback
+
+    @classmethod
+    def load(cls, path=TABLE_PATH, fallback=None, bundle_path=BUNDLE_PATH, rebuild=True):
+        """
+        bundle_path: 이 번들의 bundle_id와 테이블의 bundle_id를 비교 (None이면 확인 안 함)
+                     다르면 rebuild=True일 때 그 번들로 다시 만들어 path에 저장,
+                     rebuild=False면 fallback 모델을 그대로 반환 (fallback도 없으면 ValueError)
+        """
+        with np.load(path) as f:
+            table = cls({k: f[k] for k in f.files}, fallback=fallback)
+        if bundle_path is None:
+            return table
+        current = read_bundle_id(bundle_path)
+        if table.bundle_id == current:
+            return table
+        print(f"⚠️ 룩업 테이블이 예전 번들로 만들어짐 (테이블 {table.bundle_id}, 현재 {current})")
+        if rebuild:
+            build_and_save(bundle_path, path)
+            return cls.load(path, fallback=fallback, bundle_path=None)
+        if fallback is not None:
+            return fallback
+        raise ValueError(f"룩업 테이블 bundle_id가 현재 번들과 다릅니다: {table.bundle_id} != {current}")
+
+    def _locate(self, weather_codes, temperatures, wind_speeds):
+        wc = np.asarray(weather_codes, dtype=np.int64).reshape(-1)
+        t = np.asarray(temperatures, dtype=np.float64).reshape(-1)
+        ws = np.asarray(wind_speeds, dtype=np.float64).reshape(-1)
+        if not (len(wc) == len(t) == len(ws)):
+            raise ValueError("weather_codes / temperatures / wind_speeds 길이가 다릅니다.")
+
+        pos = np.clip(np.searchsorted(self.codes, wc), 0, len(self.codes) - 1)
+        inside = ((self.codes[pos] == wc)
+                  & (t >= self.t_lo) & (t <= self.t_hi)
+                  & (ws >= self.w_lo) & (ws <= self.w_hi))
+        ft = (np.clip(t, self.t_lo, self.t_hi) - self.t_lo) / self.t_step
+        fw = (np.clip(ws, self.w_lo, self.w_hi) - self.w_lo) / self.w_step
+        return pos, ft, fw, inside
+
+    def _cell(self, pos, ti, wi):
+        return (pos * self.n_temp + ti) * self.n_wind + wi
+
+    def _from_cells(self, cells, k):
+        return rows_from_arrays(self.top_labels, self.bottom_labels,
+                                self.combo_top[cells, :k], self.combo_bottom[cells, :k],
+                                self.combo_score[cells, :k], self.combo_pt[cells, :k],
+                                self.combo_pb[cells, :k])
+
+    def _interpolate(self, pos, ft, fw, top_k_each, combo_topk):
+        t0 = np.minimum(np.floor(ft).astype(np.int64), self.n_temp - 1)
+        w0 = np.minimum(np.floor(fw).astype(np.int64), self.n_wind - 1)
+        t1 = np.minimum(t0 + 1, self.n_temp - 1)
+        w1 = np.minimum(w0 + 1, self.n_wind - 1)
+        at = (ft - t0)[:, None]
+        aw = (fw - w0)[:, None]
+
+        def blend(p):
+            p00 = p[self._cell(pos, t0, w0)].astype(np.float32)
+            p01 = p[self._cell(pos, t0, w1)].astype(np.float32)
+            p10 = p[self._cell(pos, t1, w0)].astype(np.float32)
+            p11 = p[self._cell(pos, t1, w1)].astype(np.float32)
+            return ((1 - at) * ((1 - aw) * p00 + aw * p01)
+                    + at * ((1 - aw) * p10 + aw * p11)).astype(np.float32)
+
+        return combos_from_proba(blend(self.p_top), blend(self.p_bottom),
+                                 self.top_labels, self.bottom_labels, top_k_each, combo_topk)
+
+    def recommend_combo_batch(self, weather_codes, temperatures, wind_speeds,
+                              top_k_each=5, combo_topk=10, interpolate=False):
+        pos, ft, fw, inside = self._locate(weather_codes, temperatures, wind_speeds)
+        n = len(pos)
+
+        # 미리 계산한 조합은 build 때의 k 설정에서만 그대로 쓸 수 있음
+        precomputed = top_k_each == self.top_k_each and combo_topk <= self.combo_topk
+        if not precomputed and not interpolate:
+            inside = np.zeros(n, dtype=bool)
+
+        results = [None] * n
+        hit = np.flatnonzero(inside)
+        if len(hit):
+            if interpolate:
+                rows = self._interpolate(pos[hit], ft[hit], fw[hit], top_k_each, combo_topk)
+            else:
+                ti = np.rint(ft[hit]).astype(np.int64)
+                wi = np.rint(fw[hit]).astype(np.int64)
+                rows = self._from_cells(self._cell(pos[hit], ti, wi), combo_topk)
+            for i, r in zip(hit.tolist(), rows):
+                results[i] = r
+
+        miss = np.flatnonzero(~inside)
+        if len(miss):
+            if self.fallback is None:
+                raise KeyError("룩업 테이블 격자 밖 입력인데 fallback 모델이 없습니다.")
+            rows = self.fallback.recommend_combo_batch(
+                np.asarray(weather_codes).reshape(-1)[miss],
+                np.asarray(temperatures).reshape(-1)[miss],
+                np.asarray(wind_speeds).reshape(-1)[miss],
+                top_k_each=top_k_each, combo_topk=combo_topk,
+            )
+            for i, r in zip(miss.tolist(), rows):
+                results[i] = r
+
+        return results
+
+    def recommend_combo(self, weather_code, temperature, wind_speed,
+                        top_k_each=5, combo_topk=10, interpolate=False):
+        # 단건 빠른 경로: 배열 변환 없이 셀 인덱스만 계산
+        if not interpolate and top_k_each == self.top_k_each and combo_topk <= self.combo_topk:
+            pos = self._code_pos.get(weather_code)
+            if (pos is not None and self.t_lo <= temperature <= self.t_hi
+                    and self.w_lo <= wind_speed <= self.w_hi):
+                ti = round((temperature - self.t_lo) / self.t_step)
+                wi = round((wind_speed - self.w_lo) / self.w_step)
+                return self._from_cells([self._cell(pos, ti, wi)], combo_topk)[0]
+        return self.recommend_combo_batch([weather_code], [temperature], [wind_speed],
+                                          top_k_each=top_k_each, combo_topk=combo_topk,
+                                          interpolate=interpolate)[0]
+
+
+# =========================
+# 3) 실행
+# =========================
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        print("✅ 저장 완료:", build_and_save())
+    else:
+        table = ComboLookupTable.load(fallback=NumpyClothesNet.load())
+        print("TOP 조합 추천(상의, 하의, 점수=Ptop*Pbottom, Ptop, Pbottom):")
+        for row in table.recommend_combo(weather_code=1, temperature=5.0, wind_speed=3.2):
+            print(row)
+        print("보간:")
+        for row in table.recommend_combo(weather_code=1, temperature=5.2, wind_speed=3.3,
+                                         interpolate=True):
+            print(row)
@@ -0,0 +1,162 @@
+# =========================
+# 모델 번들 (.bundle) — 가중치 + 라벨 + weather_code 매핑 + 스케일러를 파일 하나로
+#   - 기존: clothes_multitask_gpu.pt + *_label_encoder.pkl + weather_code_to_idx.pkl + num_scaler.pkl
+#   - 번들: [헤더(JSON)] + [64바이트 정렬된 raw 배열들]
+#   - 로드: mmap으로 열고 헤더만 파싱, 배열은 처음 접근할 때 np.frombuffer 뷰로 (복사 없음)
+#           → 같은 파일을 여는 워커 프로세스들이 페이지 캐시를 공유
+#
+# 파일 구조 (little endian)
+#   0   : MAGIC (8바이트, b"OOTBNDL\0")
+#   8   : format version (uint32)
+#   12  : header 길이 (uint32)
+#   16  : header JSON (utf-8)
+#   ... : 64바이트 정렬 후 배열 데이터 (header["arrays"][name]["offset"]는 데이터 시작 기준)
+# =========================
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+BUNDLE_PATH = "clothes_model.bundle"
+
+MAGIC = b"OOTBNDL\0"
+FORMAT_VERSION = 1
+ALIGN = 64
+_PREFIX = struct.Struct("<8sII")
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+# =========================
+# 1) 쓰기
+# =========================
+def write_bundle(path, arrays, meta=None):
+    """
+    arrays: {이름: np.ndarray}  (object dtype 불가, 문자열은 '<U' 고정폭 배열)
+    meta: JSON 직렬화 가능한 부가 정보 (학습 설정, 정확도 등)
+    임시 파일에 쓴 뒤 os.replace로 교체 → 읽는 쪽은 항상 완성된 파일만 봄
+    """
+    arrays = {k: np.ascontiguousarray(v) for k, v in arrays.items()}
+    for k, v in arrays.items():
+        if v.dtype.hasobject:
+            raise TypeError(f"번들에 object 배열은 저장할 수 없습니다: {k}")
+
+    digest = hashlib.sha256()
+    for k in sorted(arrays):
+        digest.update(k.encode())
+        digest.update(arrays[k].dtype.str.encode())
+        digest.update(str(arrays[k].shape).encode())
+        digest.update(arrays[k].tobytes())
+
+    entries = {}
+    offset = 0
+    for k, v in arrays.items():
+        entries[k] = {"dtype": v.dtype.str, "shape": list(v.shape),
+                      "offset": offset, "nbytes": int(v.nbytes)}
+        offset = _align(offset + v.nbytes)
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "bundle_id": digest.hexdigest()[:16],
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "meta": meta or {},
+        "arrays": entries,
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    data_start = _align(_PREFIX.size + len(header_bytes))
+
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for k, v in arrays.items():
+            f.write(b"\0" * (data_start + entries[k]["offset"] - f.tell()))
+            f.write(v.tobytes())
+    os.replace(tmp, path)
+    return header["bundle_id"]
+
+
+# =========================
+# 2) 읽기 (mmap, lazy, zero-copy)
+# =========================
+class ModelBundle:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, header_len = _PREFIX.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"모델 번들 파일이 아닙니다: {path}")
+        if version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"지원하지 않는 번들 버전: {version} (지원: {FORMAT_VERSION})")
+
+        self.header = json.loads(bytes(self._mm[_PREFIX.size:_PREFIX.size + header_len]))
+        self._data_start = _align(_PREFIX.size + header_len)
+        self.version = version
+        self.bundle_id = self.header["bundle_id"]
+        self.meta = self.header["meta"]
+        self._entries = self.header["arrays"]
+        self._cache = {}
+
+    @classmethod
+    def open(cls, path=BUNDLE_PATH):
+        return cls(path)
+
+    def keys(self):
+        return self._entries.keys()
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __getitem__(self, name):
+        arr = self._cache.get(name)
+        if arr is None:
+            e = self._entries[name]
+            arr = np.frombuffer(self._mm, dtype=np.dtype(e["dtype"]),
+                                count=int(np.prod(e["shape"])),
+                                offset=self._data_start + e["offset"]).reshape(e["shape"])
+            self._cache[name] = arr
+        return arr
+
+    def close(self):
+        # 뷰가 남아 있으면 mmap을 닫을 수 없으므로 캐시를 먼저 비움
+        self._cache.clear()
+        try:
+            self._mm.close()
+        except BufferError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_bundle_id(path=BUNDLE_PATH):
+    """헤더만 읽어서 bundle_id 반환 (모델 교체 감지용)"""
+    with open(path, "rb") as f:
+        magic, version, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"모델 번들 파일이 아닙니다: {path}")
+        return json.loads(f.read(header_len))["bundle_id"]
+
+
+if __name__ == "__main__":
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else BUNDLE_PATH
+    with ModelBundle.open(path) as b:
+        print("bundle_id:", b.bundle_id, "| version:", b.version, "| created_at:", b.header["created_at"])
+        print("meta:", b.meta)
+        for name, e in b._entries.items():
+            print(f"  {name:16s} {e['dtype']:6s} {tuple(e['shape'])}")
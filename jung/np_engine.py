@@ -0,0 +1,423 @@
+# =========================
+# NumPy 추론 엔진 (torch 없이 MultiHeadClothesNet 추론)
+#   - 입력: 모델 번들(clothes_model.bundle, model_bundle.py)
+#   - export: 예전 산출물(clothes_multitask_gpu.pt + 인코더/스케일러 .pkl) -> 번들 변환
+#   - 추론: forward / softmax / top-k 를 전부 numpy로 (CPU 전용, CUDA 불필요)
+#   - recommend_combo / recommend_combo_batch 출력 형식은 ai-test-model.py와 동일
+#
+# 사용법
+#   python np_engine.py export          # 예전 산출물(.pt + .pkl) -> clothes_model.bundle
+#   python np_engine.py check           # torch 모델과 출력 비교 (parity)
+#   python np_engine.py check --synthetic   # 학습 산출물 없이 랜덤 모델로 비교
+# =========================
+import numpy as np
+
+from model_bundle import BUNDLE_PATH, ModelBundle, write_bundle
+from preprocess import TRANSFORM_KEYS, ClothesTransform
+
+PT_PATH = "clothes_multitask_gpu.pt"
+
+# state_dict 키 -> 엔진 배열 이름 (Linear weight는 (in, out)으로 전치해서 저장)
+_LINEAR_KEYS = {
+    "trunk.0": ("w1", "b1"),
+    "trunk.2": ("w2", "b2"),
+    "head_top": ("wt", "bt"),
+    "head_bottom": ("wb", "bb"),
+}
+
+
+# =========================
+# 1) export (torch/joblib은 여기서만 필요)
+# =========================
+def state_dict_to_arrays(state_dict):
+    arrays = {"emb": state_dict["weather_emb.weight"].detach().cpu().numpy().astype(np.float32)}
+    for prefix, (w_name, b_name) in _LINEAR_KEYS.items():
+        w = state_dict[prefix + ".weight"].detach().cpu().numpy().astype(np.float32)
+        b = state_dict[prefix + ".bias"].detach().cpu().numpy().astype(np.float32)
+        arrays[w_name] = np.ascontiguousarray(w.T)
+        arrays[b_name] = b
+    return arrays
+
+
+META_KEYS = ("top_classes", "bottom_classes") + TRANSFORM_KEYS
+
+
+def meta_to_arrays(top_classes, bottom_classes, transform):
+    """transform: preprocess.ClothesTransform (weather_code 매핑 + 스케일러)"""
+    arrays = {
+        "top_classes": np.asarray(top_classes).astype(str),
+        "bottom_classes": np.asarray(bottom_classes).astype(str),
+    }
+    arrays.update(transform.to_arrays())
+    return arrays
+
+
+def arrays_to_state_dict(arrays):
+    """state_dict_to_arrays의 역변환 (torch 모델에 번들 가중치를 올릴 때)"""
+    import torch
+
+    sd = {"weather_emb.weight": torch.tensor(np.array(arrays["emb"]))}
+    for prefix, (w_name, b_name) in _LINEAR_KEYS.items():
+        sd[prefix + ".weight"] = torch.tensor(np.array(arrays[w_name]).T)
+        sd[prefix + ".bias"] = torch.tensor(np.array(arrays[b_name]))
+    return sd
+
+
+def torch_model_from_arrays(arrays):
+    """번들 배열 -> 가중치가 올라간 MultiHeadClothesNet (CPU). 임베딩 / trunk 폭은 저장된 값 그대로"""
+    from clothes_model import MultiHeadClothesNet
+
+    model = MultiHeadClothesNet(len(arrays["codes"]), len(arrays["top_classes"]),
+                                len(arrays["bottom_classes"]),
+                                emb_dim=arrays["emb"].shape[1], hidden=arrays["w1"].shape[1])
+    model.load_state_dict(arrays_to_state_dict(arrays))
+    return model
+
+
+def export_bundle(pt_path=PT_PATH, out_path=BUNDLE_PATH,
+               top_encoder_path="top_label_encoder.pkl",
+               bottom_encoder_path="bottom_label_encoder.pkl",
+               code_map_path="weather_code_to_idx.pkl",
+               scaler_path="num_scaler.pkl"):
+    import joblib
+    import torch
+
+    le_top = joblib.load(top_encoder_path)
+    le_bottom = joblib.load(bottom_encoder_path)
+    code_to_idx = joblib.load(code_map_path)
+    scaler = joblib.load(scaler_path)
+
+    arrays = state_dict_to_arrays(torch.load(pt_path, map_location="cpu"))
+    # num_scaler.pkl의 num_std는 학습 때 이미 +1e-8 된 값 → 그대로 나눗셈에 씀
+    transform = ClothesTransform.from_mapping(code_to_idx, scaler["num_mean"], scaler["num_std"])
+    arrays.update(meta_to_arrays(le_top.classes_, le_bottom.classes_, transform))
+    write_bundle(out_path, arrays, meta={"source": "legacy .pt/.pkl export"})
+    return out_path
+
+
+# =========================
+# 2) 공용 연산
+# =========================
+def softmax(logits):
+    z = logits - logits.max(axis=1, keepdims=True)
+    np.exp(z, out=z)
+    z /= z.sum(axis=1, keepdims=True)
+    return z
+
+
+def topk(a, k):
+    """
+    a: (N, C) -> 행마다 큰 순서대로 k개 (값, 인덱스).
+    torch.topk와 같은 내림차순 정렬.
+    """
+    k = min(k, a.shape[1])
+    if k < a.shape[1]:
+        idx = np.argpartition(-a, k - 1, axis=1)[:, :k]
+    else:
+        idx = np.broadcast_to(np.arange(a.shape[1]), a.shape).copy()
+    vals = np.take_along_axis(a, idx, axis=1)
+    order = np.argsort(-vals, axis=1, kind="stable")
+    idx = np.take_along_axis(idx, order, axis=1)
+    vals = np.take_along_axis(vals, order, axis=1)
+    return vals, idx
+
+
+def combo_arrays(p_top, p_bottom, top_k_each=5, combo_topk=10):
+    """
+    p_top: (N, Ct), p_bottom: (N, Cb) 확률 -> 행마다 TOP 조합 배열
+    (top 클래스, bottom 클래스, 점수, P(top), P(bottom)), 각각 (N, k_combo).
+    조합 점수 = P(top) * P(bottom), 상의/하의 각각 top_k_each개 후보의 외적에서 TOP-k.
+    """
+    n = p_top.shape[0]
+    top_vals, top_idx = topk(p_top, top_k_each)
+    bot_vals, bot_idx = topk(p_bottom, top_k_each)
+    k_bot = bot_vals.shape[1]
+
+    combo_scores = (top_vals[:, :, None] * bot_vals[:, None, :]).reshape(n, -1)
+    best_scores, best_flat_idx = topk(combo_scores, combo_topk)
+    i_idx = best_flat_idx // k_bot
+    j_idx = best_flat_idx % k_bot
+
+    return (np.take_along_axis(top_idx, i_idx, axis=1),
+            np.take_along_axis(bot_idx, j_idx, axis=1),
+            best_scores,
+            np.take_along_axis(top_vals, i_idx, axis=1),
+            np.take_along_axis(bot_vals, j_idx, axis=1))
+
+
+def k_best_pairs(p_top, p_bottom, k):
+    """
+    1-D 확률 두 개에서 P(top) * P(bottom)가 큰 조합 k개를 정확히 (top_k_each 자르기 없음).
+    두 벡터를 내림차순으로 본 곱 격자에서 (0, 0)부터 heap frontier로 확장 → O(k log k).
+    반환: combo_arrays와 같은 (top 클래스, bottom 클래스, 점수, P(top), P(bottom)) 1-D 배열
+    """
+    import heapq
+
+    k = min(k, len(p_top) * len(p_bottom))
+    if k <= 0:
+        idx = np.empty(0, dtype=np.int64)
+        score = np.empty(0, dtype=p_top.dtype)
+        return idx, idx, score, score, np.empty(0, dtype=p_bottom.dtype)
+    tv, ti = topk(p_top[None, :], k)
+    bv, bi = topk(p_bottom[None, :], k)
+    tv, ti, bv, bi = tv[0], ti[0], bv[0], bi[0]
+    tl, bl = tv.tolist(), bv.tolist()
+
+    heap = [(-tl[0] * bl[0], 0, 0)]
+    seen = {(0, 0)}
+    pairs = []
+    while len(pairs) < k:
+        _, i, j = heapq.heappop(heap)
+        pairs.append((i, j))
+        for ni, nj in ((i + 1, j), (i, j + 1)):
+            if ni < len(tl) and nj < len(bl) and (ni, nj) not in seen:
+                seen.add((ni, nj))
+                heapq.heappush(heap, (-tl[ni] * bl[nj], ni, nj))
+
+    i_idx = np.array([p[0] for p in pairs], dtype=np.int64)
+    j_idx = np.array([p[1] for p in pairs], dtype=np.int64)
+    return ti[i_idx], bi[j_idx], tv[i_idx] * bv[j_idx], tv[i_idx], bv[j_idx]
+
+
+def _pair_candidates(k, n_top, n_bot):
+    # 정렬된 곱 격자에서 (i, j)보다 점수가 크거나 같은 칸이 (i+1)*(j+1)개 있으므로
+    # TOP-k 조합은 항상 (i+1)*(j+1) <= k 인 칸 안에 있음 (후보 O(k log k)개)
+    ii, jj = np.meshgrid(np.arange(n_top), np.arange(n_bot), indexing="ij")
+    mask = (ii + 1) * (jj + 1) <= k
+    return ii[mask], jj[mask]
+
+
+def k_best_pairs_batch(p_top, p_bottom, k):
+    """
+    k_best_pairs의 배치 버전. p_top: (N, Ct), p_bottom: (N, Cb).
+    행마다 후보 칸 (i+1)*(j+1) <= k 만 점수 계산 후 TOP-k → combo_arrays와 같은 (N, k) 배열들
+    """
+    tv, ti = topk(p_top, k)
+    bv, bi = topk(p_bottom, k)
+    ci, cj = _pair_candidates(k, tv.shape[1], bv.shape[1])
+
+    best_scores, pos = topk(tv[:, ci] * bv[:, cj], k)
+    i_idx, j_idx = ci[pos], cj[pos]
+    return (np.take_along_axis(ti, i_idx, axis=1),
+            np.take_along_axis(bi, j_idx, axis=1),
+            best_scores,
+            np.take_along_axis(tv, i_idx, axis=1),
+            np.take_along_axis(bv, j_idx, axis=1))
+
+
+def rows_from_arrays(top_labels, bottom_labels, top_cls, bot_cls, scores, pt, pb):
+    """combo_arrays 결과 -> 행마다 [(상의라벨, 하의라벨, 점수, P(top), P(bottom)), ...]"""
+    t_lbls = top_labels[top_cls].tolist()
+    b_lbls = bottom_labels[bot_cls].tolist()
+    return [
+        list(zip(*row))
+        for row in zip(t_lbls, b_lbls, scores.tolist(), pt.tolist(), pb.tolist())
+    ]
+
+
+def combos_from_proba(p_top, p_bottom, top_labels, bottom_labels,
+                      top_k_each=5, combo_topk=10, exact=False):
+    """exact=True면 top_k_each를 무시하고 진짜 TOP combo_topk 조합 (k_best_pairs_batch)"""
+    if p_top.shape[0] == 0:
+        return []
+    if exact:
+        arrays = k_best_pairs_batch(p_top, p_bottom, combo_topk)
+    else:
+        arrays = combo_arrays(p_top, p_bottom, top_k_each, combo_topk)
+    return rows_from_arrays(top_labels, bottom_labels, *arrays)
+
+
+def _dequant(arrays, name):
+    w = arrays[name]
+    if name + "_scale" in arrays:
+        return w.astype(np.float32) * arrays[name + "_scale"]
+    return w.astype(np.float32, copy=False)
+
+
+def _linear(x, w, scale=None):
+    # int8 / float16 가중치는 float32로 올려서 곱하고, int8이면 열별 스케일을 뒤에 곱함
+    y = x @ (w if w.dtype == np.float32 else w.astype(np.float32))
+    if scale is not None:
+        y *= scale
+    return y
+
+
+# =========================
+# 3) 엔진
+# =========================
+class NumpyClothesNet:
+    def __init__(self, arrays):
+        # arrays: dict 또는 ModelBundle (번들이면 가중치는 mmap 뷰 그대로 사용)
+        #   가중치는 float32 / float16 / int8(+ "<이름>_scale" 열별 스케일, quantize.py) 모두 가능,
+        #   저장된 dtype 그대로 들고 있다가 matmul 때만 float32로 올림
+        self.bundle_id = getattr(arrays, "bundle_id", None)
+        self.emb = _dequant(arrays, "emb")
+        self.w1, self.b1 = _dequant(arrays, "w1"), arrays["b1"]
+        self.w2, self.b2 = arrays["w2"], arrays["b2"]
+        self.wt, self.bt = arrays["wt"], arrays["bt"]
+        self.wb, self.bb = arrays["wb"], arrays["bb"]
+        self.s2 = arrays["w2_scale"] if "w2_scale" in arrays else None
+        self.st = arrays["wt_scale"] if "wt_scale" in arrays else None
+        self.sb = arrays["wb_scale"] if "wb_scale" in arrays else None
+
+        self.top_labels = np.asarray(arrays["top_classes"])
+        self.bottom_labels = np.asarray(arrays["bottom_classes"])
+        self.transform = ClothesTransform.from_arrays(arrays)
+        self.codes = self.transform.codes
+        self.code_idx = self.transform.code_idx
+        self.num_mean = self.transform.num_mean
+        self.num_std = self.transform.num_std
+
+        # 첫 Linear를 (임베딩 부분, 수치 부분)으로 나눠서 concat 없이 계산
+        emb_dim = self.emb.shape[1]
+        self._emb_w1 = self.emb @ self.w1[:emb_dim]   # (num_codes, 64), 코드별로 미리 계산
+        self._num_w1 = self.w1[emb_dim:]              # (2, 64)
+
+    @classmethod
+    def load(cls, path=BUNDLE_PATH):
+        return cls(ModelBundle.open(path))
+
+    # ---- 입력 변환 (학습과 같은 preprocess.ClothesTransform, 모르는 코드 -> 0) ----
+    def encode(self, weather_codes, temperatures, wind_speeds):
+        return self.transform.transform(weather_codes, temperatures, wind_speeds)
+
+    # ---- forward ----
+    def forward(self, w_idx, x_num):
+        h = self._emb_w1[w_idx] + x_num @ self._num_w1 + self.b1
+        np.maximum(h, 0, out=h)
+        z = _linear(h, self.w2, self.s2) + self.b2
+        np.maximum(z, 0, out=z)
+        return _linear(z, self.wt, self.st) + self.bt, _linear(z, self.wb, self.sb) + self.bb
+
+    def predict_proba(self, weather_codes, temperatures, wind_speeds):
+        w, x = self.encode(weather_codes, temperatures, wind_speeds)
+        out_top, out_bottom = self.forward(w, x)
+        return softmax(out_top), softmax(out_bottom)
+
+    # ---- 조합 추천 ----
+    def recommend_combo_batch(self, weather_codes, temperatures, wind_speeds,
+                              top_k_each=5, combo_topk=10, exact=False):
+        p_top, p_bottom = self.predict_proba(weather_codes, temperatures, wind_speeds)
+        return combos_from_proba(p_top, p_bottom, self.top_labels, self.bottom_labels,
+                                 top_k_each, combo_topk, exact=exact)
+
+    def recommend_combo(self, weather_code, temperature, wind_speed,
+                        top_k_each=5, combo_topk=10, exact=False):
+        if exact:
+            p_top, p_bottom = self.predict_proba([weather_code], [temperature], [wind_speed])
+            arrays = k_best_pairs(p_top[0], p_bottom[0], combo_topk)
+            return rows_from_arrays(self.top_labels, self.bottom_labels,
+                                    *(a[None, :] for a in arrays))[0]
+        return self.recommend_combo_batch([weather_code], [temperature], [wind_speed],
+                                          top_k_each=top_k_each, combo_topk=combo_topk)[0]
+
+
+# =========================
+# 4) parity 검사 (torch 모델 vs numpy 엔진)
+# =========================
+def _synthetic_artifacts(seed=0):
+    import torch
+    from clothes_model import MultiHeadClothesNet
+
+    torch.manual_seed(seed)
+    codes = [0, 1, 2, 3, 45, 51, 61, 63, 71, 80, 95]
+    top_classes = np.array(sorted(["패딩", "코트", "재킷", "가디건", "반팔 티셔츠",
+                                   "긴팔 티셔츠", "후드", "셔츠/블라우스", "니트/스웨터"]))
+    bottom_classes = np.array(sorted(["면바지", "청바지", "반바지", "슈트/슬랙스",
+                                      "레깅스", "트레이닝/조거 팬츠"]))
+    model = MultiHeadClothesNet(len(codes), len(top_classes), len(bottom_classes))
+    meta = meta_to_arrays(top_classes, bottom_classes,
+                          ClothesTransform.from_mapping({c: i for i, c in enumerate(codes)},
+                                                        [12.0, 3.0], [9.0, 2.0]))
+    return model, meta
+
+
+def _torch_recommend_batch(model, meta, w, x, top_k_each, combo_topk):
+    import torch
+
+    with torch.no_grad():
+        out_top, out_bottom = model(torch.from_numpy(w), torch.from_numpy(x))
+        p_top = torch.softmax(out_top, dim=1)
+        p_bottom = torch.softmax(out_bottom, dim=1)
+        k_top = min(top_k_each, p_top.size(1))
+        k_bot = min(top_k_each, p_bottom.size(1))
+        top_vals, top_idx = torch.topk(p_top, k=k_top, dim=1)
+        bot_vals, bot_idx = torch.topk(p_bottom, k=k_bot, dim=1)
+        combo = (top_vals.unsqueeze(2) * bot_vals.unsqueeze(1)).reshape(len(w), -1)
+        best_scores, best_flat = torch.topk(combo, k=min(combo_topk, combo.size(1)), dim=1)
+        i_idx, j_idx = best_flat // k_bot, best_flat % k_bot
+        t_cls = torch.gather(top_idx, 1, i_idx).numpy()
+        b_cls = torch.gather(bot_idx, 1, j_idx).numpy()
+    return (p_top.numpy(), p_bottom.numpy(),
+            meta["top_classes"][t_cls], meta["bottom_classes"][b_cls], best_scores.numpy())
+
+
+def check_parity(model, meta, n=2000, top_k_each=5, combo_topk=10, seed=0):
+    model = model.cpu().eval()
+    arrays = state_dict_to_arrays(model.state_dict())
+    arrays.update(meta)
+    engine = NumpyClothesNet(arrays)
+
+    rng = np.random.default_rng(seed)
+    codes = np.append(meta["codes"], 999)  # 모르는 코드 fallback도 같이 확인
+    wc = rng.choice(codes, n)
+    temps = rng.uniform(-20, 38, n)
+    winds = rng.uniform(0, 15, n)
+
+    w, x = engine.encode(wc, temps, winds)
+    ref_pt, ref_pb, ref_t, ref_b, ref_s = _torch_recommend_batch(model, meta, w, x,
+                                                                 top_k_each, combo_topk)
+    np_pt, np_pb = engine.predict_proba(wc, temps, winds)
+    res = engine.recommend_combo_batch(wc, temps, winds, top_k_each, combo_topk)
+
+    prob_diff = max(np.abs(ref_pt - np_pt).max(), np.abs(ref_pb - np_pb).max())
+    score_diff = np.abs(ref_s - np.array([[r[2] for r in rows] for rows in res])).max()
+    # 점수가 허용오차 이내로 같은(동점) 조합끼리는 순서가 바뀔 수 있으므로 제외
+    gap = np.abs(np.diff(ref_s, axis=1)) > 1e-6
+    distinct = np.ones_like(ref_s, dtype=bool)
+    distinct[:, 1:] &= gap
+    distinct[:, :-1] &= gap
+    label_mismatch = sum(
+        (r[0], r[1]) != (t, b)
+        for rows, ts, bs, ds in zip(res, ref_t, ref_b, distinct)
+        for r, t, b, d in zip(rows, ts, bs, ds) if d
+    )
+    return {"n": n, "max_prob_diff": float(prob_diff),
+            "max_score_diff": float(score_diff), "label_mismatch": int(label_mismatch)}
+
+
+# =========================
+# 5) 실행
+# =========================
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("cmd", choices=["export", "check", "demo"], nargs="?", default="demo")
+    parser.add_argument("--synthetic", action="store_true", help="랜덤 모델로 parity 검사")
+    parser.add_argument("--bundle", default=BUNDLE_PATH)
+    args = parser.parse_args()
+
+    if args.cmd == "export":
+        print("✅ 저장 완료:", export_bundle(out_path=args.bundle))
+
+    elif args.cmd == "check":
+        if args.synthetic:
+            model, meta = _synthetic_artifacts()
+        else:
+            bundle = ModelBundle.open(args.bundle)
+            meta = {k: np.array(bundle[k]) for k in META_KEYS}
+            model = torch_model_from_arrays(bundle)
+
+        report = check_parity(model, meta)
+        print(report)
+        ok = (report["max_prob_diff"] < 1e-5 and report["max_score_diff"] < 1e-5
+              and report["label_mismatch"] == 0)
+        print("✅ parity OK" if ok else "❌ parity 실패")
+        raise SystemExit(0 if ok else 1)
+
+    else:
+        engine = NumpyClothesNet.load(args.bundle)
+        print("TOP 조합 추천(상의, 하의, 점수=Ptop*Pbottom, Ptop, Pbottom):")
+        for row in engine.recommend_combo(weather_code=1, temperature=5.0, wind_speed=3.2):
+            print(row)
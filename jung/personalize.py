@@ -0,0 +1,336 @@
+# =========================
+# 개인화 재정렬 (user_outfit 착용 기록 기반, park/outfit_table.py)
+#   - 유저마다 상의/하의 착용 횟수 벡터(번들 라벨 순서)를 메모리에 캐시 (LRU, maxsize명까지)
+#     처음 요청 때만 DB에서 읽고(id > watermark 인 행), 그 뒤로는 record()로
+#     새 착용 기록이 들어올 때마다 카운트만 +1 → 요청마다 DB 조회 없음
+#   - 선호 벡터: 라벨별 (횟수 + alpha) / (전체 + alpha * 클래스 수), 균등 분포 대비 비율의 log를 캐시
+#   - 재정렬 점수 = 모델 점수 * exp(λ * (log r_top + log r_bottom))
+#     λ = weight * n / (n + prior_n): 기록이 적은 유저는 거의 모델 점수 그대로
+#   - 로드(DB 조회) 중에 들어온 record()는 버퍼에 모았다가 로드가 끝나면 적용
+#     (스냅샷보다 늦게 들어온 기록을 잃지 않음, 스냅샷에 이미 있는 row_id는 watermark로 걸러짐)
+#   - watermark는 로드 때 읽은 최대 id로 고정, 그 뒤 record()된 row_id는 seen에 모아서 같은 행 두 번만 거름
+#     (record()가 id 순서대로 오지 않아도 빠지는 기록 없음)
+#   - DB 연결은 park/db_pool.py의 공용 풀 (login / signup / CRUD와 같은 풀)
+#   - 라벨 사전에 없는 상의/하의(정규화 전 이름 등)는 top_map / bottom_map으로 바꿔 보고, 그래도 없으면 무시
+#   - PersonalizedRecommender: 엔진(NumpyClothesNet, ComboCache 등)에서 후보를 oversample배 받아
+#     재정렬 후 combo_topk개로 자름 (캐시는 유저와 무관한 모델 결과만 들고 있음)
+#
+# 사용 예
+#   store = PreferenceStore(engine.top_labels, engine.bottom_labels,
+#                           top_map=TOP_MAPPING, bottom_map=BOTTOM_MAPPING)
+#   rec = PersonalizedRecommender(ComboCache(engine), store)
+#   rec.recommend_combo(1, 5.0, 3.2, user_id=7)
+#
+#   SoleUser(..., user_id=7, on_create=store.record,   # 착용 기록 쓰기 → 캐시 갱신 (park/CRUD.py)
+#            on_change=store.invalidate)               # 수정 / 삭제 → 그 유저만 다시 로드
+# =========================
+import math
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+OUTFIT_TABLE = "user_outfit"
+
+
+def _shared_pool():
+    # park/db_pool.py 공용 풀 (park 모듈과 같은 프로세스면 이미 import되어 있음)
+    try:
+        from db_pool import get_pool
+    except ImportError:
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "park"))
+        from db_pool import get_pool
+    return get_pool()
+
+
+def fetch_user_history(user_id, after_id=0, pool=None):
+    """user_outfit에서 그 유저의 id > after_id 인 (id, top, bottom) 행 (PK (user_id, id) 범위 검색)"""
+    pool = pool or _shared_pool()
+    with pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT id, top, bottom FROM {OUTFIT_TABLE} "
+                        "WHERE user_id = %s AND id > %s ORDER BY id", (user_id, after_id))
+            return [tuple(r.values()) if isinstance(r, dict) else tuple(r) for r in cur.fetchall()]
+
+
+class _UserPref:
+    __slots__ = ("top", "bottom", "n", "watermark", "seen", "log_top", "log_bottom")
+
+    def __init__(self, n_top, n_bottom):
+        self.top = np.zeros(n_top, dtype=np.float64)
+        self.bottom = np.zeros(n_bottom, dtype=np.float64)
+        self.n = 0
+        self.watermark = 0   # 로드 때 읽은 최대 id
+        self.seen = set()    # 로드 뒤 record()로 반영한 row_id
+        self.log_top = None  # 카운트가 바뀌면 None → 다음 재정렬 때 다시 계산
+        self.log_bottom = None
+
+
+class PreferenceStore:
+    def __init__(self, top_labels, bottom_labels, fetch=None, maxsize=100000,
+                 alpha=1.0, weight=1.0, prior_n=10.0, top_map=None, bottom_map=None):
+        """
+        fetch: (user_id, after_id) -> [(id, top, bottom), ...]  (None이면 fetch_user_history)
+        alpha: 라벨별 스무딩 횟수
+        weight: 개인 선호의 최대 반영 비율 (0이면 모델 점수 그대로)
+        prior_n: 기록이 이만큼 있으면 weight의 절반만큼 반영
+        """
+        self.top_idx = {str(t): i for i, t in enumerate(np.asarray(top_labels).tolist())}
+        self.bottom_idx = {str(b): i for i, b in enumerate(np.asarray(bottom_labels).tolist())}
+        self.fetch = fetch if fetch is not None else fetch_user_history
+        self.maxsize = maxsize
+        self.alpha = alpha
+        self.weight = weight
+        self.prior_n = prior_n
+        self.top_map = top_map or {}
+        self.bottom_map = bottom_map or {}
+
+        self._users = OrderedDict()  # user_id -> _UserPref
+        self._loading = {}           # user_id -> 로드 중에 들어온 record() [(top, bottom, row_id), ...]
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.loads = 0
+        self.records = 0
+        self.unknown_labels = 0
+
+    # ---- 라벨 ----
+    def _index(self, idx, mapping, label):
+        label = str(label).strip()
+        i = idx.get(label)
+        if i is None:
+            i = idx.get(mapping.get(label))
+        return i
+
+    def _add(self, pref, top, bottom):
+        ti = self._index(self.top_idx, self.top_map, top)
+        bi = self._index(self.bottom_idx, self.bottom_map, bottom)
+        if ti is None or bi is None:
+            self.unknown_labels += 1
+            return
+        pref.top[ti] += 1
+        pref.bottom[bi] += 1
+        pref.n += 1
+        pref.log_top = pref.log_bottom = None
+
+    # ---- 캐시 ----
+    def _load(self, user_id):
+        pref = _UserPref(len(self.top_idx), len(self.bottom_idx))
+        rows = self.fetch(user_id, 0)
+        for row_id, top, bottom in rows:
+            self._add(pref, top, bottom)
+            pref.watermark = max(pref.watermark, row_id)
+        return pref
+
+    def get(self, user_id):
+        with self._lock:
+            pref = self._users.get(user_id)
+            if pref is not None:
+                self._users.move_to_end(user_id)
+                self.hits += 1
+                return pref
+
+            # 같은 유저를 동시에 로드하면 버퍼를 같이 씀
+            pending = self._loading.setdefault(user_id, [])
+
+        # DB 조회는 락 밖에서 (다른 유저 요청을 막지 않음)
+        pref = self._load(user_id)
+        with self._lock:
+            cur = self._users.get(user_id)
+            if cur is not None:
+                return cur  # 그 사이 다른 스레드가 먼저 올려둠
+            if self._loading.get(user_id) is not pending:
+                return pref  # 로드 중에 invalidate됨 → 이번 결과는 캐시하지 않음
+            del self._loading[user_id]
+            for top, bottom, row_id in pending:
+                self._record(pref, top, bottom, row_id)
+            self._users[user_id] = pref
+            self.loads += 1
+            while len(self._users) > self.maxsize:
+                self._users.popitem(last=False)
+            return pref
+
+    def _record(self, pref, top, bottom, row_id):
+        if row_id is not None:
+            if row_id <= pref.watermark or row_id in pref.seen:
+                return  # 이미 로드할 때 읽었거나 record()로 반영한 행
+            pref.seen.add(row_id)
+        self._add(pref, top, bottom)
+        self.records += 1
+
+    def record(self, user_id, top, bottom, row_id=None):
+        """
+        새 착용 기록 1건 (SoleUser.create 직후).
+        캐시에 없는 유저면 다음 get 때 DB에서 읽으므로 무시, 로드 중이면 버퍼에 모아 두고 로드 후 적용
+        """
+        with self._lock:
+            pref = self._users.get(user_id)
+            if pref is not None:
+                self._record(pref, top, bottom, row_id)
+            elif user_id in self._loading:
+                self._loading[user_id].append((top, bottom, row_id))
+
+    def invalidate(self, user_id=None):
+        """update / delete로 과거 기록이 바뀌었을 때 (None이면 전체)"""
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+                self._loading.clear()
+            else:
+                self._users.pop(user_id, None)
+                self._loading.pop(user_id, None)
+
+    # ---- 재정렬 ----
+    def _log_ratios(self, pref):
+        log_top, log_bottom = pref.log_top, pref.log_bottom
+        if log_top is None or log_bottom is None:
+            # record()가 동시에 None으로 바꿀 수 있어서 지역 변수로 계산해서 돌려줌
+            with self._lock:
+                n = pref.n
+                log_top, log_bottom = (
+                    np.log((counts + self.alpha) / (n + self.alpha * len(counts)) * len(counts))
+                    for counts in (pref.top, pref.bottom))
+                pref.log_top, pref.log_bottom = log_top, log_bottom
+        return log_top, log_bottom
+
+    def strength(self, pref):
+        return self.weight * pref.n / (pref.n + self.prior_n)
+
+    def rerank(self, user_id, rows):
+        """rows: [(top, bottom, score, p_top, p_bottom), ...] → 개인화 점수로 바꿔서 다시 정렬"""
+        if user_id is None or not rows:
+            return list(rows)
+        pref = self.get(user_id)
+        lam = self.strength(pref)
+        if lam == 0.0:
+            return list(rows)
+        log_top, log_bottom = self._log_ratios(pref)
+
+        out = []
+        for t, b, s, pt, pb in rows:
+            ti = self.top_idx.get(str(t))
+            bi = self.bottom_idx.get(str(b))
+            boost = (log_top[ti] if ti is not None else 0.0) + (log_bottom[bi] if bi is not None else 0.0)
+            out.append((t, b, s * math.exp(lam * float(boost)), pt, pb))
+        out.sort(key=lambda r: -r[2])
+        return out
+
+    def stats(self):
+        with self._lock:
+            return {
+                "users": len(self._users),
+                "hits": self.hits,
+                "loads": self.loads,
+                "records": self.records,
+                "unknown_labels": self.unknown_labels,
+            }
+
+
+class PersonalizedRecommender:
+    def __init__(self, engine, store, oversample=3):
+        """engine: recommend_combo / recommend_combo_batch를 가진 객체, oversample: 재정렬용 후보 배수"""
+        self.engine = engine
+        self.store = store
+        self.oversample = oversample
+
+    def recommend_combo(self, weather_code, temperature, wind_speed,
+                        top_k_each=5, combo_topk=10, user_id=None):
+        if user_id is None:
+            return self.engine.recommend_combo(weather_code, temperature, wind_speed,
+                                               top_k_each=top_k_each, combo_topk=combo_topk)
+        rows = self.engine.recommend_combo(weather_code, temperature, wind_speed,
+                                           top_k_each=top_k_each, combo_topk=combo_topk * self.oversample)
+        return self.store.rerank(user_id, rows)[:combo_topk]
+
+    def recommend_combo_batch(self, weather_codes, temperatures, wind_speeds,
+                              top_k_each=5, combo_topk=10, user_ids=None):
+        if user_ids is None:
+            return self.engine.recommend_combo_batch(weather_codes, temperatures, wind_speeds,
+                                                     top_k_each=top_k_each, combo_topk=combo_topk)
+        batch = self.engine.recommend_combo_batch(weather_codes, temperatures, wind_speeds,
+                                                  top_k_each=top_k_each,
+                                                  combo_topk=combo_topk * self.oversample)
+        return [self.store.rerank(u, rows)[:combo_topk] for u, rows in zip(user_ids, batch)]
+
+
+if __name__ == "__main__":
+    # 테스트용: 가짜 기록으로 로드 / 증분 갱신 / 재정렬 확인 + 재정렬 시간
+    import time
+
+    tops = np.array(["반팔 티셔츠", "후드", "코트", "니트/스웨터"])
+    bottoms = np.array(["청바지", "반바지", "슈트/슬랙스"])
+    history = {7: [(1, "후드", "청바지"), (2, "후드티", "청바지"), (3, "후드", "슈트/슬랙스"),
+                   (4, "이상한옷", "청바지")]}
+    calls = []
+
+    def fake_fetch(user_id, after_id):
+        calls.append(user_id)
+        return [r for r in history.get(user_id, []) if r[0] > after_id]
+
+    store = PreferenceStore(tops, bottoms, fetch=fake_fetch, top_map={"후드티": "후드"}, prior_n=2.0)
+    rows = [("코트", "슈트/슬랙스", 0.30, 0.5, 0.6), ("후드", "청바지", 0.20, 0.4, 0.5),
+            ("반팔 티셔츠", "반바지", 0.10, 0.2, 0.5)]
+
+    assert store.rerank(None, rows) == rows
+    assert store.rerank(99, rows)[0][0] == "코트"        # 기록 없는 유저: 순서 그대로
+    ranked = store.rerank(7, rows)
+    assert ranked[0][:2] == ("후드", "청바지"), ranked  # 후드 + 청바지를 자주 입은 유저
+    pref = store.get(7)
+    assert pref.n == 3 and pref.watermark == 4 and store.unknown_labels == 1
+
+    # 증분 갱신: DB를 다시 읽지 않고 카운트만 +1, 이미 읽은 row_id는 무시
+    n_calls = len(calls)
+    store.record(7, "코트", "슈트/슬랙스", row_id=5)
+    store.record(7, "코트", "슈트/슬랙스", row_id=5)
+    assert pref.n == 4 and len(calls) == n_calls
+
+    # 순서가 뒤바뀐 record(): 9 다음에 온 8도 반영, 같은 id는 한 번만, watermark는 로드 때 값 그대로
+    store.record(7, "후드", "청바지", row_id=9)
+    store.record(7, "후드", "반바지", row_id=8)
+    store.record(7, "후드", "반바지", row_id=8)
+    assert pref.n == 6 and pref.bottom[1] == 1 and pref.watermark == 4, (pref.n, pref.watermark)
+    store.record(123, "코트", "청바지")                  # 캐시에 없는 유저는 무시
+    assert 123 not in store._users
+
+    # 로드(DB 조회) 도중에 들어온 기록: 스냅샷에 없는 row_id 6은 로드 후 반영, 이미 있는 4는 무시
+    def slow_fetch(user_id, after_id):
+        rows = [r for r in history[7] if r[0] > after_id]
+        store2.record(7, "코트", "청바지", row_id=6)
+        store2.record(7, "후드", "청바지", row_id=3)
+        return rows
+
+    store2 = PreferenceStore(tops, bottoms, fetch=slow_fetch, top_map={"후드티": "후드"})
+    pref2 = store2.get(7)
+    assert pref2.n == 4 and pref2.watermark == 4 and pref2.seen == {6} and pref2.top[2] == 1, (pref2.n, pref2.watermark)
+
+    # 로드 도중 invalidate되면 그 결과는 캐시하지 않음
+    def invalidating_fetch(user_id, after_id):
+        store3.invalidate(user_id)
+        return history[7]
+
+    store3 = PreferenceStore(tops, bottoms, fetch=invalidating_fetch)
+    store3.get(7)
+    assert 7 not in store3._users and not store3._loading
+
+    class _Engine:
+        def recommend_combo(self, *a, combo_topk=10, **kw):
+            return rows[:combo_topk]
+
+        def recommend_combo_batch(self, w, *a, combo_topk=10, **kw):
+            return [rows[:combo_topk] for _ in w]
+
+    rec = PersonalizedRecommender(_Engine(), store)
+    assert rec.recommend_combo(1, 5.0, 3.2, combo_topk=1)[0][0] == "코트"
+    assert rec.recommend_combo(1, 5.0, 3.2, combo_topk=1, user_id=7)[0][0] == "후드"
+    assert [r[0][0] for r in rec.recommend_combo_batch([1, 1], [5, 5], [3, 3], combo_topk=1,
+                                                        user_ids=[7, None])] == ["후드", "코트"]
+
+    n = 100000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        store.rerank(7, rows)
+    print(f"rerank: {(time.perf_counter() - t0) / n * 1e6:.1f}us / 요청 (후보 {len(rows)}개)")
+    print("stats:", store.stats())
+    print("✅ personalize OK")
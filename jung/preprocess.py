@@ -0,0 +1,129 @@
+# =========================
+# 입력 전처리 (학습 / 추론 공용)
+#   - weather_code -> 임베딩 idx: 정렬된 코드 배열 + np.searchsorted (배열 통째로)
+#     학습에 없던 코드는 unknown_idx(기본 0)로 fallback
+#   - 수치(기온, 풍속) 스케일링: (x - num_mean) / num_std
+#     num_std는 fit할 때 std + eps를 한 번만 더해서 저장한 값 (추론 때 eps를 다시 더하지 않음)
+#   - 번들 배열(codes / code_idx / num_mean / num_std)로 저장하고 그대로 복원
+#
+# 사용 예
+#   tf = ClothesTransform.fit(X_weather, X_num, train_idx)        # 학습
+#   w_idx, x_scaled = tf.transform(X_weather, X_num[:, 0], X_num[:, 1])
+#   arrays.update(tf.to_arrays())
+#
+#   tf = ClothesTransform.from_arrays(bundle)                     # 추론
+#   w_idx, x_scaled = tf.transform(weather_codes, temperatures, wind_speeds)
+# =========================
+import numpy as np
+
+EPS = 1e-8
+TRANSFORM_KEYS = ("codes", "code_idx", "num_mean", "num_std")
+
+
+class ClothesTransform:
+    def __init__(self, codes, code_idx, num_mean, num_std, unknown_idx=0):
+        codes = np.asarray(codes, dtype=np.int64).reshape(-1)
+        code_idx = np.asarray(code_idx, dtype=np.int64).reshape(-1)
+        order = np.argsort(codes, kind="stable")
+        self.codes = codes[order]          # 정렬된 weather_code
+        self.code_idx = code_idx[order]    # codes[i] -> 임베딩 idx
+        self.num_mean = np.asarray(num_mean, dtype=np.float64).reshape(2)
+        self.num_std = np.asarray(num_std, dtype=np.float64).reshape(2)
+        self.unknown_idx = unknown_idx
+
+    # ---- 생성 ----
+    @classmethod
+    def fit(cls, weather_codes, x_num, train_idx=None, eps=EPS):
+        """weather_code 사전은 전체 행, mean/std는 train 행 기준"""
+        codes = np.unique(np.asarray(weather_codes, dtype=np.int64))
+        x = np.asarray(x_num, dtype=np.float64)
+        x_train = x if train_idx is None else x[train_idx]
+        return cls(codes, np.arange(len(codes)), x_train.mean(axis=0), x_train.std(axis=0) + eps)
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays["codes"], arrays["code_idx"], arrays["num_mean"], arrays["num_std"])
+
+    @classmethod
+    def from_mapping(cls, code_to_idx, num_mean, num_std):
+        codes = list(code_to_idx)
+        return cls(codes, [code_to_idx[c] for c in codes], num_mean, num_std)
+
+    def to_arrays(self):
+        return {
+            "codes": self.codes.copy(),
+            "code_idx": self.code_idx.copy(),
+            "num_mean": self.num_mean.copy(),
+            "num_std": self.num_std.copy(),
+        }
+
+    def extend(self, weather_codes):
+        """처음 보는 코드를 기존 idx 뒤에 이어 붙인 새 transform (이어서 학습용). 반환: (transform, 새 코드)"""
+        wc = np.unique(np.asarray(weather_codes, dtype=np.int64))
+        new = np.setdiff1d(wc, self.codes)
+        start = int(self.code_idx.max()) + 1 if len(self.code_idx) else 0
+        tf = ClothesTransform(np.concatenate([self.codes, new]),
+                              np.concatenate([self.code_idx, np.arange(start, start + len(new))]),
+                              self.num_mean, self.num_std, self.unknown_idx)
+        return tf, new
+
+    # ---- 변환 ----
+    @property
+    def num_codes(self):
+        return int(self.code_idx.max()) + 1 if len(self.code_idx) else 0
+
+    @property
+    def code_to_idx(self):
+        return dict(zip(self.codes.tolist(), self.code_idx.tolist()))
+
+    def lookup(self, weather_codes):
+        """반환: (임베딩 idx, 학습에 있던 코드인지 mask)"""
+        wc = np.asarray(weather_codes, dtype=np.int64).reshape(-1)
+        if len(self.codes) == 0:
+            return np.full(len(wc), self.unknown_idx, dtype=np.int64), np.zeros(len(wc), dtype=bool)
+        pos = np.clip(np.searchsorted(self.codes, wc), 0, len(self.codes) - 1)
+        known = self.codes[pos] == wc
+        return np.where(known, self.code_idx[pos], self.unknown_idx), known
+
+    def encode_codes(self, weather_codes):
+        return self.lookup(weather_codes)[0]
+
+    def scale(self, x_num):
+        x = np.asarray(x_num, dtype=np.float64).reshape(-1, 2)
+        return ((x - self.num_mean) / self.num_std).astype(np.float32)
+
+    def transform(self, weather_codes, temperatures, wind_speeds):
+        """배열 통째로 -> (w_idx int64 (N,), x float32 (N, 2))"""
+        w = self.encode_codes(weather_codes)
+        t = np.asarray(temperatures, dtype=np.float64).reshape(-1)
+        ws = np.asarray(wind_speeds, dtype=np.float64).reshape(-1)
+        if not (len(w) == len(t) == len(ws)):
+            raise ValueError("weather_codes / temperatures / wind_speeds 길이가 다릅니다.")
+        return w, self.scale(np.stack([t, ws], axis=1))
+
+
+if __name__ == "__main__":
+    # 테스트용: 기존 학습 코드(dict 매핑 + 인라인 스케일링)와 같은 결과인지 확인
+    rng = np.random.default_rng(0)
+    n = 100000
+    X_weather = rng.choice([0, 1, 3, 45, 61, 63, 95], n)
+    X_num = np.column_stack([rng.uniform(-20, 38, n), rng.uniform(0, 15, n)])
+    train_idx = rng.permutation(n)[: n * 7 // 10]
+
+    tf = ClothesTransform.fit(X_weather, X_num, train_idx)
+    w, x = tf.transform(X_weather, X_num[:, 0], X_num[:, 1])
+
+    unique_codes = np.unique(X_weather)
+    code_to_idx = {c: i for i, c in enumerate(unique_codes)}
+    ref_w = np.array([code_to_idx[c] for c in X_weather], dtype=np.int64)
+    ref_x = (X_num - X_num[train_idx].mean(axis=0)) / (X_num[train_idx].std(axis=0) + 1e-8)
+    assert np.array_equal(w, ref_w)
+    assert np.array_equal(x, ref_x.astype(np.float32))
+
+    # 모르는 코드 -> 0, 저장/복원, 확장
+    assert tf.encode_codes([2, 999, -5, 61]).tolist() == [0, 0, 0, code_to_idx[61]]
+    tf2 = ClothesTransform.from_arrays(tf.to_arrays())
+    assert np.array_equal(tf2.transform(X_weather, X_num[:, 0], X_num[:, 1])[1], x)
+    tf3, new = tf.extend([1, 2, 99])
+    assert new.tolist() == [2, 99] and tf3.encode_codes([2, 99, 95]).tolist() == [7, 8, 6]
+    print("✅ ClothesTransform OK")
@@ -0,0 +1,154 @@
+# =========================
+# 모델 양자화 (int8 / float16) + 정확도 리포트
+#   - int8: Linear 가중치를 열(출력 채널)별 대칭 양자화, "<이름>_scale" (float32)와 같이 저장
+#           bias / 라벨 / 스케일러는 그대로
+#   - fp16: 가중치만 float16
+#   - 둘 다 일반 모델 번들로 저장되고 NumpyClothesNet이 그대로 로드 (CPU)
+#   - 리포트: ai-model.py가 저장한 test split(test_split.npz)에서
+#             fp32 대비 top/bottom 정확도, top-1 일치율, 조합 TOP-k 겹침, 가중치 크기 비교
+#
+# 사용법
+#   python quantize.py                  # clothes_model.bundle -> .int8.bundle / .fp16.bundle + quant_report.json
+#   python quantize.py --test test_split.npz --k 10
+# =========================
+import json
+import os
+
+import numpy as np
+
+from model_bundle import BUNDLE_PATH, ModelBundle, write_bundle
+from np_engine import META_KEYS, NumpyClothesNet
+
+TEST_SPLIT_PATH = "test_split.npz"
+REPORT_PATH = "quant_report.json"
+
+WEIGHT_KEYS = ("emb", "w1", "w2", "wt", "wb")
+
+
+# =========================
+# 1) 양자화
+# =========================
+def quantize_int8(arrays):
+    out = {k: np.array(arrays[k]) for k in arrays.keys()}
+    for k in WEIGHT_KEYS:
+        w = out[k].astype(np.float32)
+        # 열별 최대 절댓값 기준 스케일 (emb는 (코드, dim)이라 dim별 스케일)
+        scale = np.abs(w).max(axis=0) / 127.0
+        scale[scale == 0] = 1.0
+        out[k] = np.clip(np.rint(w / scale), -127, 127).astype(np.int8)
+        out[k + "_scale"] = scale.astype(np.float32)
+    return out
+
+
+def quantize_fp16(arrays):
+    out = {k: np.array(arrays[k]) for k in arrays.keys()}
+    for k in WEIGHT_KEYS:
+        out[k] = out[k].astype(np.float16)
+    return out
+
+
+def weight_bytes(arrays):
+    # 라벨 / weather_code 매핑 / 스케일러를 뺀 나머지 (가중치 + bias + 양자화 스케일)
+    return int(sum(np.asarray(arrays[k]).nbytes for k in arrays.keys() if k not in META_KEYS))
+
+
+def export_variants(bundle_path=BUNDLE_PATH):
+    src = ModelBundle.open(bundle_path)
+    base, ext = os.path.splitext(bundle_path)
+    paths = {}
+    for name, fn in (("int8", quantize_int8), ("fp16", quantize_fp16)):
+        path = f"{base}.{name}{ext}"
+        meta = dict(src.meta, quant=name, source_bundle_id=src.bundle_id)
+        write_bundle(path, fn(src), meta=meta)
+        paths[name] = path
+    return paths
+
+
+# =========================
+# 2) 평가
+# =========================
+def load_test_split(path=TEST_SPLIT_PATH):
+    with np.load(path) as f:
+        return {k: f[k] for k in f.files}
+
+
+def evaluate(engine, ref, split, k=10):
+    """
+    engine을 ref(fp32) 엔진과 비교.
+    split: weather_code / temperature / wind_speed / top / bottom 배열 (top, bottom은 라벨 문자열)
+    """
+    wc, t, ws = split["weather_code"], split["temperature"], split["wind_speed"]
+    p_top, p_bottom = engine.predict_proba(wc, t, ws)
+    r_top, r_bottom = ref.predict_proba(wc, t, ws)
+
+    pred_top = engine.top_labels[p_top.argmax(axis=1)]
+    pred_bottom = engine.bottom_labels[p_bottom.argmax(axis=1)]
+
+    rows = engine.recommend_combo_batch(wc, t, ws, combo_topk=k)
+    ref_rows = ref.recommend_combo_batch(wc, t, ws, combo_topk=k)
+    overlap = np.mean([
+        len({r[:2] for r in a} & {r[:2] for r in b}) / max(len(b), 1)
+        for a, b in zip(rows, ref_rows)
+    ]) if len(rows) else 0.0
+
+    report = {
+        "n": int(len(wc)),
+        "top1_agree_top": float((p_top.argmax(axis=1) == r_top.argmax(axis=1)).mean()),
+        "top1_agree_bottom": float((p_bottom.argmax(axis=1) == r_bottom.argmax(axis=1)).mean()),
+        f"combo_overlap@{k}": float(overlap),
+        "max_prob_diff": float(max(np.abs(p_top - r_top).max(), np.abs(p_bottom - r_bottom).max())),
+    }
+    if "top" in split:
+        report["top_acc"] = float((pred_top == split["top"]).mean())
+        report["bottom_acc"] = float((pred_bottom == split["bottom"]).mean())
+    return report
+
+
+def _synthetic_split(engine, n=5000, seed=0):
+    # test split이 없을 때: 라벨 없이 fp32와의 일치도만 확인
+    rng = np.random.default_rng(seed)
+    return {
+        "weather_code": rng.choice(engine.codes, n),
+        "temperature": rng.uniform(-20, 38, n),
+        "wind_speed": rng.uniform(0, 15, n),
+    }
+
+
+def build_report(bundle_path=BUNDLE_PATH, test_path=TEST_SPLIT_PATH, k=10):
+    paths = export_variants(bundle_path)
+    ref = NumpyClothesNet.load(bundle_path)
+    split = load_test_split(test_path) if os.path.exists(test_path) else _synthetic_split(ref)
+
+    report = {"test_split": test_path if os.path.exists(test_path) else "synthetic", "variants": {}}
+    for name, path in [("fp32", bundle_path)] + list(paths.items()):
+        bundle = ModelBundle.open(path)
+        r = evaluate(NumpyClothesNet(bundle), ref, split, k=k)
+        r["path"] = path
+        r["weight_bytes"] = weight_bytes(bundle)
+        r["file_bytes"] = os.path.getsize(path)
+        report["variants"][name] = r
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bundle", default=BUNDLE_PATH)
+    parser.add_argument("--test", default=TEST_SPLIT_PATH)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--out", default=REPORT_PATH)
+    args = parser.parse_args()
+
+    report = build_report(args.bundle, args.test, args.k)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print("test split:", report["test_split"])
+    for name, r in report["variants"].items():
+        acc = (f"top_acc={r['top_acc']:.4f} bottom_acc={r['bottom_acc']:.4f} | "
+               if "top_acc" in r else "")
+        print(f"[{name}] {acc}top1_agree={r['top1_agree_top']:.4f}/{r['top1_agree_bottom']:.4f} "
+              f"combo_overlap@{args.k}={r[f'combo_overlap@{args.k}']:.4f} "
+              f"weights={r['weight_bytes']}B file={r['file_bytes']}B")
+    print("✅ 저장 완료:", args.out)
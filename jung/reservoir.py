@@ -0,0 +1,281 @@
+# =========================
+# 최근 행 가중 reservoir 샘플 (학습 데이터 크기 고정)
+#   - userdata를 스트리밍(SSCursor, id > watermark)으로 읽으면서 capacity행만 유지
+#     → 테이블이 아무리 커져도 학습에 올라가는 행 수 / 메모리 / 시간은 그대로
+#   - 가중치 w = exp(created_at / tau): half_life_days 전 행은 지금 행의 절반 확률
+#     가중 비복원 샘플링(Efraimidis-Spirakis)을 log로 풀면
+#     key = created_at / tau + Gumbel 잡음, key 상위 capacity행 = 샘플
+#     key는 절대 시각 기준이라 나중에 새 행이 와도 기존 key를 다시 계산할 필요 없음
+#   - Gumbel 잡음은 (seed, id) 해시로 만들어서 같은 행은 언제 읽어도 같은 key
+#     → 증분 sync 여러 번 = 처음부터 한 번에 만든 것과 같은 샘플
+#   - 파일 하나(npz)에 컬럼 + key + meta(watermark, vocab, 설정)를 원자적으로 저장
+#   - 읽는 쪽 인터페이스는 data_snapshot.Snapshot과 같음 (arrays() / ["id"] / watermark)
+#
+# 사용법
+#   python reservoir.py --capacity 200000 --half-life 90      # 증분 sync
+#   python reservoir.py --full                                 # 처음부터 다시
+#   python ai-model.py --reservoir 200000 --half-life 90       # 학습에서
+# =========================
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from data_snapshot import CHUNK_SIZE, DB_CONFIG, LABEL_COLUMNS, SOURCE_TABLE, WATERMARK_COL
+
+RESERVOIR_PATH = "userdata_reservoir.npz"
+RESERVOIR_SIZE = 200000
+HALF_LIFE_DAYS = 90.0
+RESERVOIR_SEED = 42
+FORMAT_VERSION = 1
+
+COLUMNS = {
+    "id": "<i8",
+    "created_at": "<f8",   # unix 초
+    "weather_code": "<i4",
+    "temperature": "<f8",
+    "wind_speed": "<f8",
+    "top": "<i4",
+    "bottom": "<i4",
+    "key": "<f8",
+}
+
+
+def _to_float(v):
+    return np.nan if v is None else float(v)
+
+
+def _to_ts(v):
+    if v is None:
+        return np.nan
+    if isinstance(v, str):
+        v = datetime.fromisoformat(v)
+    return v.timestamp()
+
+
+def _gumbel(ids, seed):
+    # splitmix64(seed, id) -> (0, 1) 균등 -> Gumbel. uint64 곱셈은 2^64로 wrap
+    with np.errstate(over="ignore"):
+        z = np.asarray(ids, dtype=np.uint64) + np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    u = ((z >> np.uint64(11)).astype(np.float64) + 0.5) * 2.0 ** -53
+    return -np.log(-np.log(u))
+
+
+class Reservoir:
+    def __init__(self, path=RESERVOIR_PATH, capacity=RESERVOIR_SIZE,
+                 half_life_days=HALF_LIFE_DAYS, seed=RESERVOIR_SEED):
+        self.path = path
+        self.meta = {
+            "format_version": FORMAT_VERSION,
+            "source_table": SOURCE_TABLE,
+            "capacity": int(capacity),
+            "half_life_days": float(half_life_days),
+            "seed": int(seed),
+            "watermark": None,
+            "n_seen": 0,
+            "last_ts": None,
+            "vocab": {c: [] for c in LABEL_COLUMNS},
+        }
+        self.cols = {c: np.empty(0, dtype=d) for c, d in COLUMNS.items()}
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with np.load(self.path, allow_pickle=False) as z:
+            meta = json.loads(str(z["meta"]))
+            if meta.get("format_version") != FORMAT_VERSION:
+                raise ValueError(f"지원하지 않는 reservoir 포맷: {meta.get('format_version')}")
+            same = all(meta[k] == self.meta[k] for k in ("capacity", "half_life_days", "seed"))
+            if not same:
+                # 설정이 다르면 기존 샘플은 버리고 다음 sync 때 처음부터
+                print(f"reservoir 설정 변경 ({meta['capacity']}, {meta['half_life_days']}일, "
+                      f"seed={meta['seed']}) → 처음부터 다시 만듦")
+                return
+            self.meta = meta
+            self.cols = {c: z[c] for c in COLUMNS}
+
+    @property
+    def capacity(self):
+        return self.meta["capacity"]
+
+    @property
+    def tau(self):
+        # 가중치가 half_life마다 절반: exp(-half_life / tau) = 1/2
+        return self.meta["half_life_days"] * 86400.0 / np.log(2.0)
+
+    @property
+    def n_rows(self):
+        return len(self.cols["id"])
+
+    @property
+    def watermark(self):
+        return self.meta["watermark"]
+
+    def __len__(self):
+        return self.n_rows
+
+    def __getitem__(self, col):
+        return self.cols[col]
+
+    def vocab(self, col):
+        return np.asarray(self.meta["vocab"][col], dtype=str)
+
+    def labeled(self):
+        # reservoir에는 라벨 있는 행만 들어옴 (Snapshot.labeled()와 같은 인터페이스)
+        return np.ones(self.n_rows, dtype=bool)
+
+    def labels(self, col):
+        return self.vocab(col)[self.cols[col]]
+
+    def arrays(self):
+        # 학습 코드용: data_snapshot.Snapshot.arrays()와 같은 형식
+        X_weather = np.asarray(self["weather_code"], dtype=np.int64)
+        X_num = np.stack([self["temperature"], self["wind_speed"]], axis=1)
+        return X_weather, X_num, self.labels("top"), self.labels("bottom")
+
+    # ---- 쓰기 ----
+    def reset(self):
+        self.meta.update(watermark=None, n_seen=0, last_ts=None,
+                         vocab={c: [] for c in LABEL_COLUMNS})
+        self.cols = {c: np.empty(0, dtype=d) for c, d in COLUMNS.items()}
+
+    def save(self):
+        tmp = self.path + ".tmp.npz"
+        np.savez(tmp, meta=np.array(json.dumps(self.meta, ensure_ascii=False)), **self.cols)
+        os.replace(tmp, self.path)
+
+    def add_rows(self, rows):
+        # rows: (id, weather_code, temperature, wind_speed, top, bottom, created_at) 튜플 리스트
+        index = {c: {v: i for i, v in enumerate(self.meta["vocab"][c])} for c in LABEL_COLUMNS}
+
+        def encode(col, values):
+            idx, vocab = index[col], self.meta["vocab"][col]
+            out = np.empty(len(values), dtype=COLUMNS[col])
+            for i, v in enumerate(values):
+                code = idx.get(v)
+                if code is None:
+                    code = idx[v] = len(vocab)
+                    vocab.append(v)
+                out[i] = code
+            return out
+
+        ids, codes, temps, winds, tops, bottoms, created = zip(*rows)
+        ts = np.asarray([_to_ts(v) for v in created], dtype=np.float64)
+        # created_at이 비어 있으면 바로 앞 행 시각 (id 순서 = 입력 순서)
+        last = self.meta["last_ts"] if self.meta["last_ts"] is not None else 0.0
+        for i in np.flatnonzero(np.isnan(ts)):
+            ts[i] = ts[i - 1] if i > 0 else last
+        new = {
+            "id": np.asarray(ids, dtype=COLUMNS["id"]),
+            "created_at": ts,
+            "weather_code": np.asarray(codes, dtype=COLUMNS["weather_code"]),
+            "temperature": np.asarray([_to_float(v) for v in temps], dtype=COLUMNS["temperature"]),
+            "wind_speed": np.asarray([_to_float(v) for v in winds], dtype=COLUMNS["wind_speed"]),
+            "top": encode("top", [str(v) for v in tops]),
+            "bottom": encode("bottom", [str(v) for v in bottoms]),
+        }
+        new["key"] = ts / self.tau + _gumbel(new["id"], self.meta["seed"])
+
+        cols = {c: np.concatenate([self.cols[c], new[c]]) for c in COLUMNS}
+        if len(cols["id"]) > self.capacity:
+            keep = np.argpartition(-cols["key"], self.capacity - 1)[:self.capacity]
+            keep.sort()  # id 순서 유지 (학습 split 재현성)
+            cols = {c: a[keep] for c, a in cols.items()}
+        self.cols = cols
+        self.meta["n_seen"] += len(rows)
+        self.meta["watermark"] = int(new["id"][-1])
+        self.meta["last_ts"] = float(ts[-1])
+
+    def sync(self, connect=None, chunk_size=CHUNK_SIZE, full=False):
+        """DB에서 watermark 이후 행만 스트리밍으로 읽어 reservoir 갱신. 반환: 새로 읽은 행 수"""
+        import pymysql
+
+        if full:
+            self.reset()
+
+        conn = connect() if connect is not None else pymysql.connect(**DB_CONFIG)
+        added = 0
+        try:
+            cursor = conn.cursor(pymysql.cursors.SSCursor)
+            query = f"""
+            SELECT {WATERMARK_COL}, weather_code, temperature, wind_speed, top, bottom, created_at
+            FROM {SOURCE_TABLE}
+            WHERE top IS NOT NULL
+              AND bottom IS NOT NULL
+              AND {WATERMARK_COL} > %s
+            ORDER BY {WATERMARK_COL}
+            """
+            cursor.execute(query, (self.watermark if self.watermark is not None else -1,))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                self.add_rows(rows)
+                added += len(rows)
+            cursor.close()
+        finally:
+            conn.close()
+            # 예외가 나도 그때까지 반영한 chunk는 저장 (watermark도 같이)
+            self.save()
+        return added
+
+
+def sync_reservoir(path=RESERVOIR_PATH, capacity=RESERVOIR_SIZE, half_life_days=HALF_LIFE_DAYS,
+                   seed=RESERVOIR_SEED, full=False, chunk_size=CHUNK_SIZE, connect=None):
+    res = Reservoir(path, capacity, half_life_days, seed)
+    added = res.sync(connect=connect, chunk_size=chunk_size, full=full)
+    print(f"reservoir sync: +{added}행 (샘플 {res.n_rows}/{res.meta['n_seen']}행, "
+          f"반감기 {res.meta['half_life_days']:g}일, watermark={res.watermark})")
+    return res
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", default=RESERVOIR_PATH)
+    parser.add_argument("--capacity", type=int, default=RESERVOIR_SIZE)
+    parser.add_argument("--half-life", type=float, default=HALF_LIFE_DAYS, help="일 단위")
+    parser.add_argument("--seed", type=int, default=RESERVOIR_SEED)
+    parser.add_argument("--full", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--selftest", action="store_true", help="DB 없이 가짜 행으로 동작 확인")
+    args = parser.parse_args()
+
+    if not args.selftest:
+        res = sync_reservoir(args.path, args.capacity, args.half_life, args.seed,
+                             full=args.full, chunk_size=args.chunk_size)
+        if res.n_rows:
+            age = (res.meta["last_ts"] - res["created_at"]) / 86400.0
+            print(f"샘플 나이(일): 중앙값 {np.median(age):.1f} / 90% {np.percentile(age, 90):.1f}")
+    else:
+        # 테스트용: 1년치 가짜 행 (하루 1000행) → 증분 = 한 번에, 최근 행 비율 확인
+        import tempfile
+
+        n, day = 365000, 86400.0
+        t0 = datetime(2025, 1, 1).timestamp()
+        rng = np.random.default_rng(0)
+        rows = [(i + 1, int(rng.integers(0, 4)), 10.0, 2.0, "후드", "청바지",
+                 datetime.fromtimestamp(t0 + i / 1000 * day)) for i in range(n)]
+
+        with tempfile.TemporaryDirectory() as d:
+            a = Reservoir(os.path.join(d, "a.npz"), capacity=5000, half_life_days=30)
+            a.add_rows(rows)
+            b = Reservoir(os.path.join(d, "b.npz"), capacity=5000, half_life_days=30)
+            for s in range(0, n, 7777):
+                b.add_rows(rows[s:s + 7777])
+            b.save()
+            b = Reservoir(os.path.join(d, "b.npz"), capacity=5000, half_life_days=30)
+            assert a.n_rows == b.n_rows == 5000 and np.array_equal(a["id"], b["id"])
+            assert b.meta["n_seen"] == n and b.watermark == n
+
+            # 반감기 30일: 마지막 30일 구간이 그 전 30일 구간의 약 2배
+            age = (a.meta["last_ts"] - a["created_at"]) / day
+            c1, c2 = np.sum(age < 30), np.sum((age >= 30) & (age < 60))
+            assert 1.8 < c1 / c2 < 2.2, (c1, c2)
+            print(f"reservoir: {n}행 -> {a.n_rows}행, 최근 30일 {c1} / 30~60일 {c2} (비율 {c1 / c2:.2f})")
+        print("✅ reservoir OK")
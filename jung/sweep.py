@@ -0,0 +1,274 @@
+# =========================
+# 하이퍼파라미터 sweep (CPU 코어 병렬)
+#   - 부모 프로세스가 스냅샷(data_snapshot.py)을 한 번 읽어서 라벨 인코딩 / split / 스케일링까지 끝낸 뒤
+#     split별 배열을 SharedMemory 블록 하나에 올림 (worker_pool.py와 같은 방식)
+#   - 전처리 / 학습 방식은 ai-model.py 기본값과 같음: split 안에서 중복 행을 합치고(collapse_duplicates)
+#     개수를 샘플 가중치로, 에폭당 합친 train을 --dedup-passes번 (--no-dedup이면 원본 행 그대로)
+#     → sweep 순위가 실제 학습 설정에서의 순위와 같은 조건
+#   - 프로세스 풀 워커는 그 블록을 붙여서(attach) 복사 없이 읽기 전용으로 쓰고,
+#     설정(lr / batch_size / trunk 폭 / 임베딩 크기 / epochs) 하나씩 학습 (clothes_train.train_model)
+#   - 워커당 torch 스레드 수를 제한해서(기본 1) 코어 수만큼 설정을 동시에 돌림
+#   - 결과: val(top+bottom 정확도 합) 기준 순위 + test 정확도 + 학습 시간 → sweep_report.json
+#
+# 사용법
+#   python sweep.py                                   # 기본 grid
+#   python sweep.py --lr 1e-3 3e-3 --batch-size 64 256 --hidden 32 64 128 --emb-dim 4 8 --workers 8
+#   python sweep.py --sample 20                       # grid에서 20개만 랜덤으로
+#   python sweep.py --sync                            # 먼저 DB에서 스냅샷 증분 sync
+#   python sweep.py --no-dedup                        # ai-model.py --no-dedup과 같은 조건
+# =========================
+import itertools
+import json
+import multiprocessing as mp
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from clothes_data import collapse_duplicates
+from clothes_train import split_train_val_test
+from data_snapshot import SNAPSHOT_DIR, Snapshot
+from preprocess import ClothesTransform
+from worker_pool import _from_shared, _to_shared
+
+SWEEP_REPORT_PATH = "sweep_report.json"
+RANDOM_SEED = 42
+
+DEFAULT_GRID = {
+    "lr": [1e-3, 3e-3],
+    "batch_size": [64, 256],
+    "hidden": [32, 64, 128],
+    "emb_dim": [4, 8, 16],
+    "epochs": [30],
+}
+
+
+# =========================
+# 1) 데이터 준비 (ai-model.py 3~7단계와 같은 전처리)
+# =========================
+def prepare_arrays(snap, seed=RANDOM_SEED, dedup=True, temp_round=None, wind_round=None):
+    """
+    dedup: split별로 중복 행을 합치고 개수를 가중치(<split>_sw)로 (ai-model.py 기본, False면 가중치 1)
+    반환: (split별 배열 dict, 차원 dict)
+    """
+    X_weather, X_num, y_top, y_bottom = snap.arrays()
+    if len(X_weather) == 0:
+        raise ValueError(f"스냅샷이 비어 있습니다: {snap.path} (--sync 또는 data_snapshot.py 먼저)")
+
+    # LabelEncoder와 같은 순서 (정렬된 클래스)
+    top_classes, y_top_enc = np.unique(y_top, return_inverse=True)
+    bottom_classes, y_bottom_enc = np.unique(y_bottom, return_inverse=True)
+
+    train_idx, val_idx, test_idx = split_train_val_test(y_top_enc, seed)
+
+    transform = ClothesTransform.fit(X_weather, X_num, train_idx)
+    w_idx, x = transform.transform(X_weather, X_num[:, 0], X_num[:, 1])
+
+    arrays = {}
+    dims = {"n_codes": transform.num_codes, "n_top": len(top_classes), "n_bottom": len(bottom_classes)}
+    for name, idx in (("train", train_idx), ("val", val_idx), ("test", test_idx)):
+        if dedup:
+            # 반올림은 원래 단위에서 한 뒤 스케일링 (ai-model.py make_dataset과 같음)
+            w, xs, yt, yb, counts = collapse_duplicates(w_idx[idx], X_num[idx], y_top_enc[idx], y_bottom_enc[idx],
+                                                        temp_round=temp_round, wind_round=wind_round)
+            xs = transform.scale(xs)
+        else:
+            w, xs, yt, yb = w_idx[idx], x[idx], y_top_enc[idx], y_bottom_enc[idx]
+            counts = np.ones(len(idx), dtype=np.float32)
+        arrays[name + "_w"] = np.asarray(w, dtype=np.int64)
+        arrays[name + "_x"] = np.asarray(xs, dtype=np.float32)
+        arrays[name + "_yt"] = np.asarray(yt, dtype=np.int64)
+        arrays[name + "_yb"] = np.asarray(yb, dtype=np.int64)
+        arrays[name + "_sw"] = np.asarray(counts, dtype=np.float32)
+        dims["n_" + name] = len(w)           # 학습 / 평가에 쓰는 행 수 (합친 뒤)
+        dims["n_" + name + "_rows"] = len(idx)  # 원본 행 수
+    return arrays, dims
+
+
+def dedup_passes(dims, passes=1):
+    """에폭당 합친 train 반복 횟수 (ai-model.py --dedup-passes와 같음, 0이면 원본 에폭과 같은 step 수)"""
+    return passes or max(1, int(round(dims["n_train_rows"] / dims["n_train"])))
+
+
+def grid_configs(grid, sample=None, seed=RANDOM_SEED):
+    keys = list(grid)
+    configs = [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+    if sample is not None and sample < len(configs):
+        configs = random.Random(seed).sample(configs, sample)
+    return configs
+
+
+# =========================
+# 2) 워커
+# =========================
+_shm = None
+_data = None
+_dims = None
+
+
+def _init_worker(shm_name, layout, dims, threads):
+    global _shm, _data, _dims
+    import warnings
+    from multiprocessing import shared_memory
+
+    import torch
+
+    torch.set_num_threads(threads)
+    # 공유 블록은 읽기 전용이라 torch.as_tensor가 경고를 냄 (쓰지 않으니 무시)
+    warnings.filterwarnings("ignore", message="The given NumPy array is not writable")
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _data = _from_shared(_shm, layout)
+    _dims = dims
+
+
+def _run_config(cfg, patience, min_delta, seed, passes=1):
+    import torch
+
+    from clothes_data import ClothesDataset, IndexBatchLoader
+    from clothes_model import MultiHeadClothesNet
+    from clothes_train import evaluate, train_model
+
+    torch.manual_seed(seed)
+    ds = {name: ClothesDataset(_data[name + "_w"], _data[name + "_x"],
+                               _data[name + "_yt"], _data[name + "_yb"], weight=_data[name + "_sw"])
+          for name in ("train", "val", "test")}
+    train_loader = IndexBatchLoader(ds["train"], batch_size=cfg["batch_size"], shuffle=True, seed=seed,
+                                    passes=passes)
+    val_loader = IndexBatchLoader(ds["val"], batch_size=4096)
+    test_loader = IndexBatchLoader(ds["test"], batch_size=4096)
+
+    model = MultiHeadClothesNet(_dims["n_codes"], _dims["n_top"], _dims["n_bottom"],
+                                emb_dim=cfg["emb_dim"], hidden=cfg["hidden"])
+
+    t0 = time.perf_counter()
+    result = train_model(model, train_loader, val_loader, epochs=cfg["epochs"], lr=cfg["lr"],
+                         patience=patience, min_delta=min_delta, log=None)
+    train_s = time.perf_counter() - t0
+
+    model.load_state_dict(result["best_state"])
+    val_top, val_bottom = evaluate(model, val_loader)
+    test_top, test_bottom = evaluate(model, test_loader)
+    return {
+        "config": cfg,
+        "val_top": val_top,
+        "val_bottom": val_bottom,
+        "val_sum": val_top + val_bottom,
+        "test_top": test_top,
+        "test_bottom": test_bottom,
+        "best_epoch": result["best_epoch"],
+        "epochs_run": result["epochs_run"],
+        "train_s": train_s,
+        "s_per_epoch": train_s / max(result["epochs_run"], 1),
+        "params": sum(p.numel() for p in model.parameters()),
+        "pid": os.getpid(),
+    }
+
+
+# =========================
+# 3) sweep
+# =========================
+def run_sweep(configs, arrays, dims, n_workers=None, threads=1, patience=5, min_delta=1e-3,
+              seed=RANDOM_SEED, start_method=None, passes=1):
+    n_workers = n_workers or os.cpu_count() or 1
+    if start_method is None:
+        start_method = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+
+    shm, layout = _to_shared(arrays)
+    results = []
+    t0 = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context(start_method),
+                                 initializer=_init_worker,
+                                 initargs=(shm.name, layout, dims, threads)) as pool:
+            futs = {pool.submit(_run_config, cfg, patience, min_delta, seed, passes): cfg for cfg in configs}
+            for i, fut in enumerate(as_completed(futs), 1):
+                cfg = futs[fut]
+                try:
+                    r = fut.result()
+                except Exception as e:
+                    r = {"config": cfg, "error": repr(e)}
+                    print(f"[{i}/{len(configs)}] {cfg} 실패: {e}")
+                else:
+                    print(f"[{i}/{len(configs)}] {cfg} val_sum={r['val_sum']:.3f} "
+                          f"({r['epochs_run']}에폭, {r['train_s']:.1f}s)")
+                results.append(r)
+    finally:
+        shm.close()
+        shm.unlink()
+
+    ok = sorted((r for r in results if "error" not in r), key=lambda r: -r["val_sum"])
+    for rank, r in enumerate(ok, 1):
+        r["rank"] = rank
+    return {
+        "n_configs": len(configs),
+        "workers": n_workers,
+        "threads_per_worker": threads,
+        "patience": patience,
+        "min_delta": min_delta,
+        "seed": seed,
+        "passes": passes,
+        "data": dims,
+        "wall_s": time.perf_counter() - t0,
+        "results": ok,
+        "failed": [r for r in results if "error" in r],
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--snapshot", default=SNAPSHOT_DIR)
+    parser.add_argument("--sync", action="store_true", help="먼저 DB에서 스냅샷 증분 sync")
+    parser.add_argument("--lr", type=float, nargs="+", default=DEFAULT_GRID["lr"])
+    parser.add_argument("--batch-size", type=int, nargs="+", default=DEFAULT_GRID["batch_size"])
+    parser.add_argument("--hidden", type=int, nargs="+", default=DEFAULT_GRID["hidden"])
+    parser.add_argument("--emb-dim", type=int, nargs="+", default=DEFAULT_GRID["emb_dim"])
+    parser.add_argument("--epochs", type=int, nargs="+", default=DEFAULT_GRID["epochs"])
+    parser.add_argument("--sample", type=int, default=None, help="grid에서 N개만 랜덤으로")
+    parser.add_argument("--patience", type=int, default=5)
+    parser.add_argument("--min-delta", type=float, default=1e-3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=1, help="워커당 torch 스레드 수")
+    parser.add_argument("--seed", type=int, default=RANDOM_SEED)
+    parser.add_argument("--no-dedup", action="store_true", help="중복 행을 합치지 않고 그대로 학습")
+    parser.add_argument("--round-temp", type=float, default=None, help="중복 비교 전에 기온 반올림 간격")
+    parser.add_argument("--round-wind", type=float, default=None, help="중복 비교 전에 풍속 반올림 간격")
+    parser.add_argument("--dedup-passes", type=int, default=1,
+                        help="에폭당 합친 train 반복 횟수 (0이면 원본 에폭과 같은 step 수)")
+    parser.add_argument("--out", default=SWEEP_REPORT_PATH)
+    args = parser.parse_args()
+
+    if args.sync:
+        from data_snapshot import sync_snapshot
+        snap = sync_snapshot(args.snapshot)
+    else:
+        snap = Snapshot(args.snapshot)
+
+    arrays, dims = prepare_arrays(snap, args.seed, dedup=not args.no_dedup,
+                                  temp_round=args.round_temp, wind_round=args.round_wind)
+    passes = dedup_passes(dims, args.dedup_passes)
+    grid = {"lr": args.lr, "batch_size": args.batch_size, "hidden": args.hidden,
+            "emb_dim": args.emb_dim, "epochs": args.epochs}
+    configs = grid_configs(grid, args.sample, args.seed)
+    print(f"sweep: 설정 {len(configs)}개 | train {dims['n_train_rows']}→{dims['n_train']} / "
+          f"val {dims['n_val_rows']}→{dims['n_val']} / test {dims['n_test_rows']}→{dims['n_test']}행 "
+          f"(에폭당 {passes}회)")
+
+    report = run_sweep(configs, arrays, dims, n_workers=args.workers, threads=args.threads,
+                       patience=args.patience, min_delta=args.min_delta, seed=args.seed, passes=passes)
+    report["dedup"] = not args.no_dedup
+    report["dedup_round"] = [args.round_temp, args.round_wind]
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n{'rank':>4} {'lr':>8} {'batch':>5} {'hidden':>6} {'emb':>3} {'ep':>5} "
+          f"{'val_sum':>7} {'test_top':>8} {'test_bot':>8} {'time':>7}")
+    for r in report["results"]:
+        c = r["config"]
+        print(f"{r['rank']:>4} {c['lr']:>8.0e} {c['batch_size']:>5} {c['hidden']:>6} {c['emb_dim']:>3} "
+              f"{r['epochs_run']:>2}/{c['epochs']:<2} {r['val_sum']:>7.3f} {r['test_top']:>8.3f} "
+              f"{r['test_bottom']:>8.3f} {r['train_s']:>6.1f}s")
+    print(f"✅ 저장 완료: {args.out} (총 {report['wall_s']:.1f}s)")
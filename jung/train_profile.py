@@ -0,0 +1,108 @@
+# =========================
+# 학습 파이프라인 계측 (단계별 시간 / 처리량 / 최대 메모리)
+#   - begin(name)으로 단계 시작 (이전 단계는 자동 종료), end()로 마지막 단계 종료
+#     같은 이름이 여러 번 나오면 시간을 합산
+#   - 에폭별 기록: 데이터 로딩 / forward+backward / 평가 시간, samples/s (clothes_train.train_model)
+#     GPU면 배치마다 synchronize해야 시간이 맞아서 학습이 느려짐
+#     → train_model에 profiler를 넘길 때만 (ai-model.py --profile), 단계별 시간은 항상 기록
+#   - 최대 메모리: 프로세스 peak RSS (VmHWM), CUDA를 썼으면 (--profile 없이도) max_memory_allocated
+#   - 결과는 실행 1회당 JSON 한 줄로 train_profile.jsonl에 추가 (테이블이 커질 때 추세 비교용)
+#
+# 사용 예
+#   prof = TrainProfiler()
+#   prof.begin("db_load"); ...
+#   prof.begin("label_encode"); ...
+#   train_model(..., profiler=prof)   # --profile일 때만
+#   prof.end(); prof.save()
+# =========================
+import json
+import sys
+import time
+
+TRAIN_PROFILE_PATH = "train_profile.jsonl"
+
+
+def peak_rss_mb():
+    # ru_maxrss는 fork 직후 부모 값이 남아 있을 수 있어서, 가능하면 /proc의 VmHWM 사용
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+class TrainProfiler:
+    def __init__(self, **info):
+        self.info = dict(info)
+        self.phases = {}
+        self.epochs = []
+        self._t0 = time.perf_counter()
+        self._current = None
+        self._started = None
+
+    # ---- 단계 ----
+    def begin(self, name):
+        self.end()
+        self._current = name
+        self._started = time.perf_counter()
+
+    def end(self):
+        if self._current is not None:
+            dt = time.perf_counter() - self._started
+            self.phases[self._current] = self.phases.get(self._current, 0.0) + dt
+            self._current = None
+
+    def set(self, **info):
+        self.info.update(info)
+
+    # ---- 에폭 ----
+    def sync(self, device):
+        # GPU 연산은 비동기라 구간 끝에서 맞춰야 시간이 맞음
+        if device.type == "cuda":
+            import torch
+            torch.cuda.synchronize(device)
+
+    def epoch(self, **record):
+        self.epochs.append(record)
+
+    # ---- 결과 ----
+    def report(self):
+        self.end()
+        train_s = sum(e.get("data_s", 0.0) + e.get("compute_s", 0.0) for e in self.epochs)
+        samples = sum(e.get("samples", 0) for e in self.epochs)
+        report = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            **self.info,
+            "total_s": time.perf_counter() - self._t0,
+            "phases": self.phases,
+            "epochs": self.epochs,
+            "train_samples_per_s": samples / train_s if train_s > 0 else 0.0,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        # torch를 import하지 않은 프로세스에서는 건드리지 않음, CUDA 컨텍스트가 있으면 모든 GPU 중 최대
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available() and torch.cuda.is_initialized():
+            report["peak_cuda_mb"] = max(torch.cuda.max_memory_allocated(i)
+                                         for i in range(torch.cuda.device_count())) / 2**20
+        return report
+
+    def save(self, path=TRAIN_PROFILE_PATH):
+        report = self.report()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report, ensure_ascii=False) + "\n")
+        return report
+
+    def summary(self, report=None):
+        report = report or self.report()
+        total = report["total_s"]
+        lines = [f"총 {total:.2f}s | "
+                 + (f"train {report['train_samples_per_s']:.0f} samples/s | " if report["epochs"] else "")
+                 + f"peak RSS {report['peak_rss_mb']:.0f}MB"
+                 + (f" | peak CUDA {report['peak_cuda_mb']:.0f}MB" if "peak_cuda_mb" in report else "")]
+        for name, s in report["phases"].items():
+            lines.append(f"  {name:<14} {s:8.3f}s ({s / total:5.1%})")
+        return "\n".join(lines)
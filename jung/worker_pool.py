@@ -0,0 +1,339 @@
+# =========================
+# 멀티 프로세스 CPU 추론 풀 (공유 메모리 가중치)
+#   - 부모 프로세스가 모델 번들(가중치 + 라벨 + weather_code 매핑 + 스케일러)을
+#     SharedMemory 블록 하나에 한 번만 올리고, 워커 N개는 그 블록을 붙여서(attach) 복사 없이 사용
+#   - 요청은 워커별 큐로 분배 (처리 중인 요청이 가장 적은 워커 우선)
+#   - health check: 프로세스 생존 + heartbeat 시각 확인, 죽었거나 멈춘 워커는 재시작하고
+#     그 워커가 들고 있던 요청은 새 워커에 다시 보냄
+#     처리하던 중에 워커가 죽은 요청은 max_retries번까지만 다시 보내고 그 뒤로는 Future에 예외
+#     (워커를 죽이는 요청 하나 때문에 재시작이 끝없이 반복되지 않게)
+#   - 결과는 워커마다 따로 만든 파이프로 받음 (재시작할 때 새로 만듦)
+#     → 결과를 쓰던 중에 죽인 워커가 다른 워커의 결과 통로를 망가뜨리지 않음
+#     파이프가 끊기면(EOF) 그 워커가 죽은 것으로 보고 바로 재시작
+#
+# 사용 예
+#   with InferencePool(n_workers=4) as pool:
+#       pool.recommend_combo(1, 5.0, 3.2)
+#       fut = pool.submit_batch([1, 3], [5.0, 12.0], [3.2, 1.0])   # concurrent.futures.Future
+#       print(pool.stats())
+# =========================
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import connection, shared_memory
+
+import numpy as np
+
+from model_bundle import BUNDLE_PATH, ModelBundle
+from np_engine import NumpyClothesNet
+
+ALIGN = 64
+MAX_RETRIES = 2
+
+
+class WorkerCrashed(RuntimeError):
+    pass
+
+
+# =========================
+# 1) 공유 메모리 배치
+# =========================
+def _to_shared(arrays):
+    """dict/번들 배열 -> (SharedMemory, layout). layout: {이름: (dtype, shape, offset)}"""
+    layout = {}
+    offset = 0
+    for k in arrays.keys():
+        a = np.asarray(arrays[k])
+        layout[k] = (a.dtype.str, a.shape, offset)
+        offset += (a.nbytes + ALIGN - 1) // ALIGN * ALIGN
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for k, (dtype, shape, off) in layout.items():
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=off)[...] = arrays[k]
+    return shm, layout
+
+
+def _from_shared(shm, layout):
+    out = {}
+    for k, (dtype, shape, off) in layout.items():
+        a = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=off)
+        a.flags.writeable = False
+        out[k] = a
+    return out
+
+
+# =========================
+# 2) 워커
+# =========================
+def _worker_main(slot, shm_name, layout, task_q, result_conn, heartbeat, current):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    engine = NumpyClothesNet(_from_shared(shm, layout))
+    heartbeat[slot] = time.time()
+
+    while True:
+        try:
+            task = task_q.get(timeout=0.5)
+        except queue.Empty:
+            heartbeat[slot] = time.time()
+            continue
+        if task is None:
+            break
+        req_id, args, kwargs = task
+        heartbeat[slot] = time.time()
+        current[slot] = req_id  # 이 요청 처리 중에 죽으면 부모가 이 요청의 시도 횟수를 올림
+        try:
+            result = (req_id, True, engine.recommend_combo_batch(*args, **kwargs))
+        except Exception as e:
+            result = (req_id, False, repr(e))
+        result_conn.send(result)
+        current[slot] = -1
+        heartbeat[slot] = time.time()
+
+    del engine
+    result_conn.close()
+    shm.close()
+
+
+# =========================
+# 3) 풀
+# =========================
+class InferencePool:
+    def __init__(self, bundle_path=BUNDLE_PATH, n_workers=None, health_interval=1.0,
+                 heartbeat_timeout=30.0, max_retries=MAX_RETRIES, start_method=None):
+        self.bundle_path = bundle_path
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.health_interval = health_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_retries = max_retries
+        # 가능하면 fork (워커 시작이 빠르고 부모의 import 상태를 그대로 씀)
+        if start_method is None:
+            start_method = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+        self._ctx = mp.get_context(start_method)
+
+        self._shm = None
+        self._layout = None
+        self._procs = [None] * self.n_workers
+        self._task_qs = [None] * self.n_workers
+        self._result_conns = [None] * self.n_workers   # 부모 쪽 받는 끝 (워커별)
+        self._retired = []                              # 재시작으로 바뀐 예전 파이프 (수집 스레드가 비우고 닫음)
+        self._heartbeat = None
+        self._current = None    # 워커별 처리 중인 req_id (-1: 없음)
+
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._pending = {}                                   # req_id -> (slot, task, Future)
+        self._crashes = {}                                   # req_id -> 처리 중 워커가 죽은 횟수
+        self._inflight = [set() for _ in range(self.n_workers)]
+        self._stop = threading.Event()
+        self._threads = []
+
+        self.restarts = 0
+        self.completed = 0
+        self.failed_crash = 0
+
+    # ---- 시작 / 종료 ----
+    def start(self):
+        with ModelBundle.open(self.bundle_path) as bundle:
+            self.bundle_id = bundle.bundle_id
+            self._shm, self._layout = _to_shared(bundle)
+
+        self._heartbeat = self._ctx.Array("d", self.n_workers, lock=False)
+        self._current = self._ctx.Array("q", [-1] * self.n_workers, lock=False)
+        for slot in range(self.n_workers):
+            self._spawn(slot)
+
+        self._threads = [
+            threading.Thread(target=self._collect_results, daemon=True),
+            threading.Thread(target=self._monitor, daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+        return self
+
+    def _spawn(self, slot):
+        self._task_qs[slot] = self._ctx.Queue()
+        self._heartbeat[slot] = time.time()
+        self._current[slot] = -1
+        if self._result_conns[slot] is not None:
+            self._retired.append(self._result_conns[slot])
+        recv_conn, send_conn = self._ctx.Pipe(duplex=False)
+        p = self._ctx.Process(
+            target=_worker_main,
+            args=(slot, self._shm.name, self._layout, self._task_qs[slot],
+                  send_conn, self._heartbeat, self._current),
+            daemon=True,
+        )
+        p.start()
+        send_conn.close()  # 부모 쪽 보내는 끝을 닫아야 워커가 죽었을 때 EOF가 옴
+        self._procs[slot] = p
+        self._result_conns[slot] = recv_conn
+
+    def close(self):
+        self._stop.set()
+        for q in self._task_qs:
+            if q is not None:
+                q.put(None)
+        for p in self._procs:
+            if p is not None:
+                p.join(timeout=5)
+                if p.is_alive():
+                    p.kill()
+        for t in self._threads:
+            t.join(timeout=2)
+        for c in self._result_conns + self._retired:
+            if c is not None:
+                c.close()
+        self._result_conns = [None] * self.n_workers
+        self._retired = []
+        with self._lock:
+            for _, _, fut in self._pending.values():
+                if not fut.done():
+                    fut.set_exception(RuntimeError("InferencePool이 종료되었습니다."))
+            self._pending.clear()
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- 요청 ----
+    def submit_batch(self, weather_codes, temperatures, wind_speeds, top_k_each=5, combo_topk=10):
+        fut = Future()
+        task_args = (list(weather_codes), list(temperatures), list(wind_speeds))
+        task_kwargs = {"top_k_each": top_k_each, "combo_topk": combo_topk}
+        with self._lock:
+            if self._shm is None or self._stop.is_set():
+                raise RuntimeError("InferencePool이 시작되지 않았거나 이미 종료되었습니다. (start() / with 블록 안에서 사용)")
+            req_id = next(self._ids)
+            slot = min(range(self.n_workers), key=lambda s: len(self._inflight[s]))
+            task = (req_id, task_args, task_kwargs)
+            self._pending[req_id] = (slot, task, fut)
+            self._inflight[slot].add(req_id)
+            self._task_qs[slot].put(task)
+        return fut
+
+    def recommend_combo_batch(self, weather_codes, temperatures, wind_speeds,
+                              top_k_each=5, combo_topk=10, timeout=None):
+        return self.submit_batch(weather_codes, temperatures, wind_speeds,
+                                 top_k_each, combo_topk).result(timeout)
+
+    def recommend_combo(self, weather_code, temperature, wind_speed,
+                        top_k_each=5, combo_topk=10, timeout=None):
+        return self.recommend_combo_batch([weather_code], [temperature], [wind_speed],
+                                          top_k_each, combo_topk, timeout)[0]
+
+    # ---- 백그라운드 스레드 ----
+    def _collect_results(self):
+        while not self._stop.is_set():
+            with self._lock:
+                conns = {c: (slot, self._procs[slot]) for slot, c in enumerate(self._result_conns)}
+                retired, self._retired = self._retired, []
+            for c in retired:
+                # 재시작 전에 죽은 워커가 보내 놓은 결과까지 받고 닫음 (쓰다 만 메시지면 거기서 멈춤)
+                try:
+                    while c.poll():
+                        self._deliver(c.recv())
+                except (EOFError, OSError):
+                    pass
+                c.close()
+
+            for c in connection.wait(list(conns), timeout=0.5):
+                slot, p = conns[c]
+                try:
+                    result = c.recv()
+                except (EOFError, OSError):
+                    # 파이프가 끊김 = 워커가 죽음 → 모니터를 기다리지 않고 바로 재시작
+                    self._restart(slot, p)
+                    continue
+                self._deliver(result)
+
+    def _deliver(self, result):
+        req_id, ok, payload = result
+        with self._lock:
+            item = self._pending.pop(req_id, None)
+            if item is None:
+                return  # 재전송된 요청의 늦은 중복 결과
+            slot, _, fut = item
+            self._inflight[slot].discard(req_id)
+            self._crashes.pop(req_id, None)
+            self.completed += 1
+        if ok:
+            fut.set_result(payload)
+        else:
+            fut.set_exception(RuntimeError(payload))
+
+    def _monitor(self):
+        while not self._stop.wait(self.health_interval):
+            now = time.time()
+            for slot, p in enumerate(list(self._procs)):
+                dead = p is None or not p.is_alive()
+                stuck = (not dead) and now - self._heartbeat[slot] > self.heartbeat_timeout
+                if dead or stuck:
+                    self._restart(slot, p)
+
+    def _restart(self, slot, proc):
+        """proc이 아직 slot의 워커일 때만 재시작 (모니터 / 수집 스레드가 같은 죽음을 두 번 처리하지 않게)"""
+        failed = []
+        with self._lock:
+            if self._stop.is_set() or self._procs[slot] is not proc:
+                return
+            if proc is not None and proc.is_alive():
+                proc.kill()  # 멈춘 워커 (또는 파이프만 끊긴 워커)
+            if proc is not None:
+                proc.join(timeout=2)
+            self.restarts += 1
+            culprit = self._current[slot]
+            if culprit in self._pending:
+                self._crashes[culprit] = n = self._crashes.get(culprit, 0) + 1
+                if n > self.max_retries:
+                    # 계속 워커를 죽이는 요청은 다시 보내지 않고 실패 처리
+                    self._inflight[slot].discard(culprit)
+                    self._crashes.pop(culprit)
+                    failed.append(self._pending.pop(culprit)[2])
+                    self.failed_crash += 1
+            self._spawn(slot)
+            # 죽은 워커가 들고 있던 나머지 요청은 새 워커에 다시 보냄
+            for req_id in sorted(self._inflight[slot]):
+                self._task_qs[slot].put(self._pending[req_id][1])
+        for fut in failed:
+            fut.set_exception(WorkerCrashed(
+                f"요청을 처리하던 워커가 {self.max_retries + 1}번 죽어서 더 이상 다시 보내지 않습니다."))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.n_workers,
+                "alive": sum(p is not None and p.is_alive() for p in self._procs),
+                "inflight": [len(s) for s in self._inflight],
+                "completed": self.completed,
+                "restarts": self.restarts,
+                "failed_crash": self.failed_crash,
+                "shared_bytes": self._shm.size if self._shm is not None else 0,
+            }
+
+
+if __name__ == "__main__":
+    import random
+
+    with InferencePool() as pool:
+        n = 20000
+        wc = [random.choice([0, 1, 3, 61]) for _ in range(n)]
+        t = [random.uniform(-5, 30) for _ in range(n)]
+        ws = [random.uniform(0, 8) for _ in range(n)]
+
+        t0 = time.perf_counter()
+        futs = [pool.submit_batch(wc[i:i + 256], t[i:i + 256], ws[i:i + 256])
+                for i in range(0, n, 256)]
+        for f in futs:
+            f.result()
+        dt = time.perf_counter() - t0
+        print(f"{n}건 {dt:.3f}s ({n / dt:.0f} req/s)")
+        print(pool.stats())
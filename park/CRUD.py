@@ -2,82 +2,178 @@
 
 import pymysql
 
+from db_pool import get_pool
+from outfit_table import OUTFIT_COLUMNS, OUTFIT_TABLE
+
+# 연결은 공용 풀(db_pool.py)에서 메서드마다 빌려 쓰고 돌려줌
+#   - 접속 정보가 같으면 login / signup과 같은 풀
+#   - 끊긴 연결은 풀이 꺼낼 때 확인해서 새로 연결 (오래 들고 있던 연결이 죽는 문제 없음)
 class Users:
-    def __init__(self, host, user, password, db):
-        self.conn = pymysql.connect(
-            host=host,
-            user=user,
-            password=password,
-            db=db,
-            charset="utf8mb4",
-            cursorclass=pymysql.cursors.DictCursor
-        )
+    def __init__(self, host, user, password, db, pool=None):
+        self.pool = pool or get_pool(host=host, user=user, password=password, db=db)
 
     def create_user(self, ID, password, nickname, age=None, gender=None):
         sql = "INSERT INTO users (ID, password, nickname, age, gender) VALUES (%s, %s, %s, %s, %s)"
-        with self.conn.cursor() as cursor:
-            cursor.execute(sql, (ID, password, nickname, age, gender))
-        self.conn.commit()
+        with self.pool.connection() as conn:
+            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                cursor.execute(sql, (ID, password, nickname, age, gender))
+            conn.commit()
         return cursor.lastrowid
 
     def read_user(self, user_id):
         sql = "SELECT * FROM users WHERE user_id = %s"
-        with self.conn.cursor() as cursor:
-            cursor.execute(sql, (user_id,))
-            return cursor.fetchone()
+        with self.pool.connection() as conn:
+            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                cursor.execute(sql, (user_id,))
+                return cursor.fetchone()
 
     def update_user(self, user_id, **kwargs):
         fields = ", ".join([f"{k} = %s" for k in kwargs])
         sql = f"UPDATE users SET {fields} WHERE user_id = %s"
         values = list(kwargs.values()) + [user_id]
-        with self.conn.cursor() as cursor:
-            cursor.execute(sql, values)
-        self.conn.commit()
+        with self.pool.connection() as conn:
+            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                cursor.execute(sql, values)
+            conn.commit()
 
     def delete_user(self, user_id):
         sql = "DELETE FROM users WHERE user_id = %s"
-        with self.conn.cursor() as cursor:
-            cursor.execute(sql, (user_id,))
-        self.conn.commit()
+        with self.pool.connection() as conn:
+            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                cursor.execute(sql, (user_id,))
+            conn.commit()
 
 
+# 유저 한 명의 착용 기록 (공용 테이블 user_outfit에서 user_id로 구분, outfit_table.py)
+#   - 메서드 / 반환 형식은 예전 user_table_{user_id} 때와 같음 (row_id = 기록의 id)
+#   - writer(write_behind.OutfitWriter)를 주면 create / update / delete는 큐에 넣고 바로 반환,
+#     모아서 한 번에 commit (durable=True인 호출만 commit까지 기다림)
+#     반환값은 writer의 Future (create는 결과가 새 행 id)
 class SoleUser:
-    def __init__(self, host, user, password, db, user_id):
-        self.conn = pymysql.connect(
-            host=host,
-            user=user,
-            password=password,
-            db=db,
-            charset="utf8mb4",
-            cursorclass=pymysql.cursors.DictCursor
-        )
-        self.table = f"user_table_{user_id}"
-
-    def create(self, top, bottom):
-        sql = f"INSERT INTO {self.table} (top, bottom) VALUES (%s, %s)"
-        with self.conn.cursor() as cursor:
-            cursor.execute(sql, (top, bottom))
-        self.conn.commit()
+    def __init__(self, host, user, password, db, user_id, on_create=None, on_change=None, pool=None,
+                 writer=None):
+        # on_create(user_id, top, bottom, row_id): 착용 기록 INSERT 커밋 직후 (예: 개인화 캐시 갱신)
+        # on_change(user_id): update / delete 커밋 직후 (예: 개인화 캐시 무효화)
+        self.pool = pool or get_pool(host=host, user=user, password=password, db=db)
+        self.user_id = user_id
+        self.table = OUTFIT_TABLE
+        self.on_create = on_create
+        self.on_change = on_change
+        self.writer = writer
+
+    def create(self, top, bottom, durable=False):
+        if self.writer is not None:
+            return self.writer.create(self.user_id, top, bottom, durable=durable, callback=self.on_create)
+        sql = f"INSERT INTO {self.table} (user_id, top, bottom) VALUES (%s, %s, %s)"
+        with self.pool.connection() as conn:
+            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                cursor.execute(sql, (self.user_id, top, bottom))
+            conn.commit()
+        if self.on_create is not None:
+            self.on_create(self.user_id, top, bottom, cursor.lastrowid)
 
     def read_all(self):
-        sql = f"SELECT * FROM {self.table}"
-        with self.conn.cursor() as cursor:
-            cursor.execute(sql)
-            return cursor.fetchall()
-
-    def update(self, row_id, **kwargs):
+        return list(self.iter_all())
+
+    # 착용 기록을 page_size행씩 읽어서 한 행씩 yield (기록이 아무리 많아도 메모리는 한 페이지만큼)
+    #   - keyset 페이지네이션: 마지막으로 읽은 (order 컬럼, id) 다음부터 LIMIT page_size
+    #     OFFSET과 달리 뒤쪽 페이지도 인덱스 범위 검색 한 번 (order="id"는 PK, "created_at"은 idx_user_created)
+    #     페이지마다 풀에서 연결을 빌렸다가 바로 돌려줌 (읽는 쪽이 느려도 연결을 오래 잡지 않음)
+    #   - server_side=True면 쿼리 한 번 + 서버측 커서(SSDictCursor)로 page_size행씩 받아옴
+    #     (순회가 끝날 때까지 연결 하나를 잡고 있음)
+    #   - columns: 가져올 컬럼 (None이면 전체), after: 이 값 다음부터 (order 컬럼 기준, 이어 읽기용)
+    def iter_all(self, page_size=500, columns=None, order="id", descending=False, after=None,
+                 server_side=False):
+        if order not in ("id", "created_at"):
+            raise ValueError(f"order는 id 또는 created_at: {order}")
+        columns = list(OUTFIT_COLUMNS if columns is None else columns)
+        unknown = set(columns) - set(OUTFIT_COLUMNS)
+        if unknown:
+            raise ValueError(f"없는 컬럼: {sorted(unknown)}")
+        if self.writer is not None and self.writer.pending(self.user_id):
+            self.writer.sync()  # 아직 안 쓴 내 기록부터
+
+        # 커서 위치용 컬럼은 항상 가져오고, 요청하지 않았으면 돌려줄 때 뺌
+        keys = ["id"] if order == "id" else ["created_at", "id"]
+        select = columns + [k for k in keys if k not in columns]
+        extra = [k for k in keys if k not in columns]
+        direction = "DESC" if descending else "ASC"
+        op = "<" if descending else ">"
+        base = f"SELECT {', '.join(select)} FROM {self.table} WHERE user_id = %s"
+        order_by = " ORDER BY " + ", ".join(f"{k} {direction}" for k in keys)
+
+        def strip(row):
+            for k in extra:
+                del row[k]
+            return row
+
+        if server_side:
+            sql, params = base, [self.user_id]
+            if after is not None:
+                sql += f" AND {order} {op} %s"
+                params.append(after)
+            with self.pool.connection() as conn:
+                with conn.cursor(pymysql.cursors.SSDictCursor) as cursor:
+                    cursor.execute(sql + order_by, params)
+                    while True:
+                        rows = cursor.fetchmany(page_size)
+                        if not rows:
+                            break
+                        for row in rows:
+                            yield strip(row)
+            return
+
+        last = None  # 마지막 행의 keys 값
+        while True:
+            sql, params = base, [self.user_id]
+            if last is not None:
+                if order == "id":
+                    sql += f" AND id {op} %s"
+                    params.append(last[0])
+                else:
+                    sql += f" AND (created_at {op} %s OR (created_at = %s AND id {op} %s))"
+                    params += [last[0], last[0], last[1]]
+            elif after is not None:
+                sql += f" AND {order} {op} %s"
+                params.append(after)
+            sql += order_by + " LIMIT %s"
+            params.append(page_size)
+            with self.pool.connection() as conn:
+                with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                    cursor.execute(sql, params)
+                    rows = cursor.fetchall()
+            if not rows:
+                return
+            last = [rows[-1][k] for k in keys]
+            for row in rows:
+                yield strip(row)
+            if len(rows) < page_size:
+                return
+
+    def update(self, row_id, durable=False, **kwargs):
+        if self.writer is not None:
+            return self.writer.update(self.user_id, row_id, durable=durable, callback=self.on_change,
+                                      **kwargs)
         fields = ", ".join([f"{k} = %s" for k in kwargs])
-        sql = f"UPDATE {self.table} SET {fields} WHERE id = %s"
-        values = list(kwargs.values()) + [row_id]
-        with self.conn.cursor() as cursor:
-            cursor.execute(sql, values)
-        self.conn.commit()
-
-    def delete(self, row_id):
-        sql = f"DELETE FROM {self.table} WHERE id = %s"
-        with self.conn.cursor() as cursor:
-            cursor.execute(sql, (row_id,))
-        self.conn.commit()
+        sql = f"UPDATE {self.table} SET {fields} WHERE user_id = %s AND id = %s"
+        values = list(kwargs.values()) + [self.user_id, row_id]
+        with self.pool.connection() as conn:
+            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                cursor.execute(sql, values)
+            conn.commit()
+        if self.on_change is not None:
+            self.on_change(self.user_id)
+
+    def delete(self, row_id, durable=False):
+        if self.writer is not None:
+            return self.writer.delete(self.user_id, row_id, durable=durable, callback=self.on_change)
+        sql = f"DELETE FROM {self.table} WHERE user_id = %s AND id = %s"
+        with self.pool.connection() as conn:
+            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                cursor.execute(sql, (self.user_id, row_id))
+            conn.commit()
+        if self.on_change is not None:
+            self.on_change(self.user_id)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,239 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from CRUD import SoleUser, Users
+from db_pool import POOL_SIZE, get_pool
+from login import login
+from signup import signup
+
+# -----------------------------
+# async 서버용 DB 접근 (Users / SoleUser / login / signup의 async 버전)
+#   - pymysql은 동기 드라이버라 이벤트 루프에서 바로 부르면 쿼리마다 루프 전체가 멈춤
+#     → 기존 동기 코드를 전용 스레드 풀(DB_WORKERS개)에서 실행하고 await로 결과만 받음
+#   - 연결은 기존 공용 풀(db_pool.py)을 그대로 씀: 동시에 도는 쿼리 수는 최대 DB_WORKERS개,
+#     나머지 요청은 루프를 막지 않고 스레드 풀 큐에서 차례를 기다림
+#   - 메서드 / 인자 / 반환값 / 오류는 동기 버전과 같음 (await만 붙이면 됨)
+#
+# 사용 예
+#   users = AsyncUsers(host, user, password, db)
+#   row = await users.read_user(3)
+#   me = AsyncSoleUser(host, user, password, db, user_id=3)
+#   async for row in me.iter_all(page_size=200):
+#       ...
+#   ok = await async_login("아이디", "비밀번호")
+# -----------------------------
+DB_WORKERS = POOL_SIZE   # 연결 풀 크기보다 많으면 남는 스레드는 연결을 기다리기만 함
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(DB_WORKERS, thread_name_prefix="db")
+        return _executor
+
+
+def shutdown_executor(wait=True):
+    global _executor
+    with _executor_lock:
+        ex, _executor = _executor, None
+    if ex is not None:
+        ex.shutdown(wait=wait)
+
+
+async def run_db(func, *args, **kwargs):
+    """동기 DB 함수를 DB 스레드 풀에서 실행"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def async_login(userid, password, pool=None):
+    return await run_db(login, userid, password, pool=pool)
+
+
+async def async_signup(userid, password, nickname, age=None, gender=None, pool=None):
+    return await run_db(signup, userid, password, nickname, age, gender, pool=pool)
+
+
+class AsyncUsers:
+    def __init__(self, host, user, password, db, pool=None):
+        self.sync = Users(host, user, password, db, pool=pool)
+
+    async def create_user(self, ID, password, nickname, age=None, gender=None):
+        return await run_db(self.sync.create_user, ID, password, nickname, age, gender)
+
+    async def read_user(self, user_id):
+        return await run_db(self.sync.read_user, user_id)
+
+    async def update_user(self, user_id, **kwargs):
+        return await run_db(self.sync.update_user, user_id, **kwargs)
+
+    async def delete_user(self, user_id):
+        return await run_db(self.sync.delete_user, user_id)
+
+
+# on_create / on_change 훅은 DB 스레드에서 호출됨 (동기 버전과 같은 시점, 커밋 직후)
+class AsyncSoleUser:
+    def __init__(self, host, user, password, db, user_id, on_create=None, on_change=None, pool=None,
+                 writer=None):
+        self.sync = SoleUser(host, user, password, db, user_id, on_create=on_create,
+                             on_change=on_change, pool=pool, writer=writer)
+        self.user_id = user_id
+
+    async def create(self, top, bottom, durable=False):
+        return await run_db(self.sync.create, top, bottom, durable=durable)
+
+    async def read_all(self):
+        return await run_db(self.sync.read_all)
+
+    async def iter_all(self, page_size=500, **kwargs):
+        """
+        SoleUser.iter_all과 같은 인자, 한 페이지씩 스레드에서 받아와서 async for로 한 행씩.
+        중간에 멈출 거면 contextlib.aclosing으로 감싸야 바로 연결을 돌려줌 (아니면 GC될 때)
+        """
+        it = self.sync.iter_all(page_size=page_size, **kwargs)
+        try:
+            while True:
+                rows = await run_db(lambda: list(islice(it, page_size)))
+                for row in rows:
+                    yield row
+                if len(rows) < page_size:
+                    return
+        finally:
+            # 중간에 멈춰도 server_side 커서가 잡은 연결을 풀에 돌려줌
+            await run_db(it.close)
+
+    async def update(self, row_id, durable=False, **kwargs):
+        return await run_db(self.sync.update, row_id, durable=durable, **kwargs)
+
+    async def delete(self, row_id, durable=False):
+        return await run_db(self.sync.delete, row_id, durable=durable)
+
+
+# -----------------------------
+# main 테스트
+#   python async_db.py               # 로컬 sqlite DB(local_db.py)로 async 경로 전체 확인 (MySQL 불필요)
+#   python async_db.py ID 비밀번호    # 실제 DB에 동시 요청 500개
+#   둘 다 DB 요청이 도는 동안 이벤트 루프가 멈추지 않는지 (ticker 지연) 같이 출력
+# -----------------------------
+if __name__ == "__main__":
+    import contextlib
+    import io
+    import sys
+    import time
+
+    from db_pool import DB_CONFIG, close_all
+
+    async def ticker(stop, lag):
+        # 10ms마다 깨어나서 늦게 깨어난 만큼 기록 (루프가 막히면 커짐)
+        while not stop.is_set():
+            t = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag.append(time.perf_counter() - t - 0.01)
+
+    async def local_check():
+        from local_db import local_pool
+
+        pool = local_pool()
+        lag, stop = [], asyncio.Event()
+        tick = asyncio.create_task(ticker(stop, lag))
+        try:
+            # signup / login (동시 50명 + 중복 ID + 틀린 비밀번호 + 없는 ID)
+            with contextlib.redirect_stdout(io.StringIO()):  # 회원가입 성공 메시지 50줄 생략
+                ok = await asyncio.gather(*[async_signup(f"user{i}", "pw", f"닉{i}", 20, None, pool=pool)
+                                            for i in range(50)])
+            assert all(ok), ok
+            assert await async_signup("user0", "pw", "중복", pool=pool) is False
+            assert await async_login("user7", "pw", pool=pool) is True
+            assert await async_login("user7", "틀림", pool=pool) is False
+            assert await async_login("nobody", "pw", pool=pool) is False
+
+            # Users
+            users = AsyncUsers("local", "", "", "", pool=pool)
+            new_id = await users.create_user("extra", "pw", "추가")
+            assert (await users.read_user(new_id))["ID"] == "extra"
+            await users.update_user(new_id, nickname="바뀜")
+            assert (await users.read_user(new_id))["nickname"] == "바뀜"
+            await users.delete_user(new_id)
+            assert await users.read_user(new_id) is None
+            rows = await asyncio.gather(*[users.read_user(i) for i in range(1, 51)])
+            assert sorted(r["ID"] for r in rows) == sorted(f"user{i}" for i in range(50))
+
+            # SoleUser (동시 create 200건 → read_all / iter_all 결과 일치)
+            created = []
+            me = AsyncSoleUser("local", "", "", "", user_id=7, pool=pool,
+                               on_create=lambda u, t, b, row_id: created.append(row_id))
+            other = AsyncSoleUser("local", "", "", "", user_id=8, pool=pool)
+            await asyncio.gather(*[me.create(f"상의{i}", "청바지") for i in range(200)],
+                                 other.create("코트", "슬랙스"))
+            all_rows = await me.read_all()
+            assert len(all_rows) == 200 and sorted(created) == [r["id"] for r in all_rows]
+            streamed = [r async for r in me.iter_all(page_size=30, order="created_at", columns=["top"])]
+            assert sorted(r["top"] for r in streamed) == sorted(r["top"] for r in all_rows)
+            assert list(streamed[0]) == ["top"]
+            await me.update(all_rows[0]["id"], top="수정")
+            await me.delete(all_rows[1]["id"])
+            await other.delete(all_rows[2]["id"])          # 다른 유저 기록은 못 지움
+            after = await me.read_all()
+            assert len(after) == 199 and after[0]["top"] == "수정"
+
+            # 중간에 break해도 서버측 커서 연결은 풀에 돌아감
+            async with contextlib.aclosing(me.iter_all(page_size=10, server_side=True)) as rows:
+                async for _ in rows:
+                    assert pool.stats()["in_use"] == 1
+                    break
+            assert pool.stats()["in_use"] == 0, pool.stats()
+        finally:
+            stop.set()
+            await tick
+            pool.close()
+            os.remove(pool.path)
+        print(f"루프 최대 지연 {max(lag) * 1000:.1f}ms, 평균 {sum(lag) / len(lag) * 1000:.2f}ms")
+        print("✅ async_db OK (로컬 sqlite)")
+
+    def find_user_id(userid):
+        with get_pool().connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT user_id FROM users WHERE ID = %s", (userid,))
+                return cursor.fetchone()[0]
+
+    async def main(userid, password):
+        lag, stop = [], asyncio.Event()
+        tick = asyncio.create_task(ticker(stop, lag))
+
+        cfg = {k: DB_CONFIG[k] for k in ("host", "user", "password", "db")}
+        users = AsyncUsers(**cfg)
+
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*[users.read_user(i % 10 + 1) for i in range(500)])
+        print(f"read_user 500회 동시: {time.perf_counter() - t0:.3f}s, 찾은 유저 {sum(r is not None for r in results)}건")
+
+        if await async_login(userid, password):
+            user_id = await run_db(find_user_id, userid)
+            me = AsyncSoleUser(**cfg, user_id=user_id)
+            n = 0
+            async for _ in me.iter_all(page_size=100):
+                n += 1
+            print(f"착용 기록 {n}건 (read_all {len(await me.read_all())}건)")
+
+        stop.set()
+        await tick
+        print(f"루프 최대 지연 {max(lag) * 1000:.1f}ms, 평균 {sum(lag) / len(lag) * 1000:.2f}ms")
+        print(get_pool().stats())
+
+    if len(sys.argv) == 1:
+        asyncio.run(local_check())
+    elif len(sys.argv) == 3:
+        asyncio.run(main(sys.argv[1], sys.argv[2]))
+    else:
+        print("사용법: python async_db.py [ID 비밀번호]")
+        sys.exit(1)
+    shutdown_executor()
+    close_all()
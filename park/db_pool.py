@@ -0,0 +1,244 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import pymysql
+from pymysql.constants import SERVER_STATUS
+
+# -----------------------------
+# DB 연결 정보 (login / signup / CRUD 공용)
+# -----------------------------
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "dbid253",
+    "password": "dbpass253",
+    "db": "db25320",
+    "charset": "utf8mb4",
+}
+
+POOL_SIZE = 10         # 동시에 열어 둘 수 있는 최대 연결 수
+POOL_TIMEOUT = 10.0    # 연결이 다 사용 중일 때 기다리는 최대 시간 (초)
+RECYCLE = 3600.0       # 이보다 오래 쉬고 있던 연결은 닫고 새로 연결 (MySQL wait_timeout 대비)
+PING_INTERVAL = 1.0    # 이보다 오래 쉬고 있던 연결은 꺼낼 때 ping으로 확인
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+# -----------------------------
+# 연결 풀
+#   - 최대 max_size개까지만 연결을 만들고, 다 사용 중이면 timeout초까지 대기
+#   - 꺼낼 때(checkout): recycle초 넘게 쉰 연결은 새로 연결,
+#     ping_interval초 넘게 쉰 연결은 ping으로 살아 있는지 확인 (끊겼으면 새로 연결)
+#   - 돌려줄 때: 끝나지 않은 트랜잭션은 rollback (다음 사용자가 이전 스냅샷을 보지 않게)
+#   - 사용량 지표: stats()
+#
+# 사용 예
+#   with get_pool().connection() as conn:
+#       with conn.cursor() as cursor:
+#           cursor.execute("SELECT ...")
+#       conn.commit()
+# -----------------------------
+class ConnectionPool:
+    def __init__(self, max_size=POOL_SIZE, timeout=POOL_TIMEOUT, recycle=RECYCLE,
+                 ping_interval=PING_INTERVAL, connect=None, **config):
+        # connect: 새 연결을 만드는 함수 (None이면 pymysql.connect(**config), 로컬 테스트용은 local_db.py)
+        self.config = dict(DB_CONFIG, **config)
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+
+        self._idle = []        # (conn, 마지막 반납 시각), 최근 반납한 연결이 뒤쪽
+        self._size = 0         # 열려 있는 연결 수 (사용 중 + 대기)
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self.created = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.timeouts = 0
+        self.recycled = 0
+        self.ping_failures = 0
+        self.max_in_use = 0
+
+    def _connect(self):
+        conn = self.connect() if self.connect is not None else pymysql.connect(**self.config)
+        with self._cond:
+            self.created += 1
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _validate(self, conn, idle_since):
+        # 반환: 그대로 쓸 수 있는 연결 또는 None (닫고 새로 연결해야 함)
+        idle = time.monotonic() - idle_since
+        if self.recycle is not None and idle > self.recycle:
+            with self._cond:
+                self.recycled += 1
+            return None
+        if self.ping_interval is not None and idle > self.ping_interval:
+            try:
+                conn.ping(reconnect=False)
+            except Exception:
+                with self._cond:
+                    self.ping_failures += 1
+                return None
+        return conn
+
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            if self._closed:
+                raise PoolTimeout("연결 풀이 닫혔습니다.")
+            waited = False
+            t0 = time.monotonic()
+            while not self._idle and self._size >= self.max_size:
+                waited = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(f"{timeout}초 동안 사용 가능한 DB 연결이 없습니다 (최대 {self.max_size}개).")
+                self._cond.wait(remaining)
+            if waited:
+                self.waits += 1
+                self.wait_time += time.monotonic() - t0
+
+            item = self._idle.pop() if self._idle else None
+            if item is None:
+                self._size += 1   # 자리를 먼저 잡고 연결은 락 밖에서
+            self.checkouts += 1
+            self.max_in_use = max(self.max_in_use, self._size - len(self._idle))
+
+        if item is not None:
+            conn = self._validate(*item)
+            if conn is not None:
+                return conn
+            try:
+                item[0].close()
+            except Exception:
+                pass
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn, discard=False):
+        if not discard:
+            try:
+                # 열린 트랜잭션이 있으면 정리 (SELECT만 하고 commit 안 한 경우 등)
+                if getattr(conn, "server_status", 1) & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        if discard or self._closed:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except BaseException as e:
+            # 연결 자체가 끊긴 경우(OperationalError)나 rollback도 안 되면 풀에 돌려놓지 않음
+            discard = isinstance(e, pymysql.OperationalError)
+            if not discard:
+                try:
+                    conn.rollback()
+                except Exception:
+                    discard = True
+            self.release(conn, discard=discard)
+            raise
+        else:
+            self.release(conn)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            in_use = self._size - len(self._idle)
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": in_use,
+                "max_size": self.max_size,
+                "max_in_use": self.max_in_use,
+                "created": self.created,
+                "checkouts": self.checkouts,
+                "reuse_ratio": 1.0 - self.created / self.checkouts if self.checkouts else 0.0,
+                "waits": self.waits,
+                "avg_wait_ms": self.wait_time / self.waits * 1000.0 if self.waits else 0.0,
+                "timeouts": self.timeouts,
+                "recycled": self.recycled,
+                "ping_failures": self.ping_failures,
+            }
+
+
+# -----------------------------
+# 프로세스 공용 풀 (접속 정보별로 하나)
+# -----------------------------
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(**config):
+    """get_pool() → DB_CONFIG 풀, get_pool(host=..., user=...) → 그 접속 정보용 풀"""
+    key = repr(sorted(dict(DB_CONFIG, **config).items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(**config)
+        return pool
+
+
+def close_all():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+# -----------------------------
+# main 테스트 (동시 로그인 흉내: 스레드 50개가 연결 10개를 나눠 씀)
+# -----------------------------
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = get_pool()
+
+    def work(_):
+        with pool.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                return cursor.fetchone()
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(50) as ex:
+        results = list(ex.map(work, range(1000)))
+    print(f"1000회 조회: {time.perf_counter() - t0:.3f}s")
+    print(pool.stats())
+    close_all()
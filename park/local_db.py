@@ -0,0 +1,133 @@
+import os
+import sqlite3
+import tempfile
+
+import pymysql
+from pymysql.constants import SERVER_STATUS
+
+from db_pool import ConnectionPool
+
+# -----------------------------
+# 로컬 테스트용 DB (MySQL 서버 없이 sqlite 파일로 흉내)
+#   - pymysql 연결처럼 쓸 수 있는 LocalConnection: %s 자리표시자, cursor(DictCursor / SSDictCursor),
+#     lastrowid, commit / rollback, ping, server_status(트랜잭션 중인지)
+#   - local_pool(): 이 연결을 쓰는 ConnectionPool → Users / SoleUser / login / signup에 pool=로 넘김
+#   - 스키마는 README의 users / user_outfit과 같은 컬럼
+#     (sqlite는 복합 PK에 AUTO_INCREMENT가 안 돼서 user_outfit은 id PK + (user_id, created_at) 인덱스)
+#   - 여러 스레드가 같이 쓰므로 메모리 DB가 아니라 임시 파일 (연결마다 같은 DB를 봄)
+#
+# 사용 예
+#   pool = local_pool()
+#   signup("아이디", "비밀번호", "닉네임", pool=pool)
+#   SoleUser("local", "", "", "", user_id=1, pool=pool).create("후드", "청바지")
+# -----------------------------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ID varchar(20) NOT NULL UNIQUE,
+    password varchar(50) NOT NULL,
+    nickname varchar(20) NOT NULL,
+    age int,
+    gender varchar(10),
+    created_at datetime DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS user_outfit (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id int NOT NULL,
+    top varchar(20) NOT NULL,
+    bottom varchar(20) NOT NULL,
+    weather varchar(20),
+    temp float,
+    wind_speed float,
+    created_at datetime NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_user_created ON user_outfit (user_id, created_at);
+"""
+
+
+class LocalCursor:
+    def __init__(self, cursor, as_dict):
+        self._cur = cursor
+        self._as_dict = as_dict
+        self.lastrowid = None
+        self.rowcount = -1
+
+    def _row(self, row):
+        if row is None or not self._as_dict:
+            return row
+        return dict(zip([d[0] for d in self._cur.description], row))
+
+    def execute(self, sql, args=None):
+        self._cur.execute(sql.replace("%s", "?"), tuple(args) if args is not None else ())
+        self.lastrowid = self._cur.lastrowid
+        self.rowcount = self._cur.rowcount
+        return max(self.rowcount, 0)
+
+    def executemany(self, sql, seq):
+        self._cur.executemany(sql.replace("%s", "?"), [tuple(a) for a in seq])
+        self.rowcount = self._cur.rowcount
+        return max(self.rowcount, 0)
+
+    def fetchone(self):
+        return self._row(self._cur.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(r) for r in self._cur.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(r) for r in self._cur.fetchall()]
+
+    def close(self):
+        self._cur.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LocalConnection:
+    def __init__(self, path):
+        # 풀이 여러 스레드에 빌려주므로 check_same_thread=False (한 번에 한 스레드만 씀)
+        self._conn = sqlite3.connect(path, timeout=10.0, check_same_thread=False)
+
+    def cursor(self, cursor=None):
+        cursor = cursor or pymysql.cursors.Cursor
+        return LocalCursor(self._conn.cursor(), issubclass(cursor, pymysql.cursors.DictCursorMixin))
+
+    @property
+    def server_status(self):
+        return SERVER_STATUS.SERVER_STATUS_IN_TRANS if self._conn.in_transaction else 0
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def ping(self, reconnect=True):
+        self._conn.execute("SELECT 1")
+
+    def close(self):
+        self._conn.close()
+
+
+def create_schema(path):
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(SCHEMA)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def local_pool(path=None, **pool_kwargs):
+    """path가 None이면 임시 파일 (프로세스가 끝나도 남으므로 필요하면 pool.path를 지움)"""
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="oot_local_", suffix=".db")
+        os.close(fd)
+    create_schema(path)
+    pool = ConnectionPool(connect=lambda: LocalConnection(path), **pool_kwargs)
+    pool.path = path
+    return pool
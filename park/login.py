@@ -1,20 +1,17 @@
-import pymysql
+from db_pool import get_pool
+from outfit_table import OUTFIT_TABLE
 
 # -----------------------------
 # 로그인 함수
 # -----------------------------
-def login(userid, password):
+def login(userid, password, pool=None):
+    pool = pool or get_pool()
     conn = None
     cursor = None
 
     try:
-        conn = pymysql.connect(
-            host="localhost",
-            user="dbid253",
-            password="dbpass253",
-            db="db25320",
-            charset="utf8mb4"
-        )
+        # 공용 연결 풀에서 빌려옴 (요청마다 TCP 연결 / 인증을 새로 하지 않음)
+        conn = pool.acquire()
         cursor = conn.cursor()
 
         # 1) ID, password 확인
@@ -38,14 +35,10 @@ def login(userid, password):
 
         print(f"로그인 성공. user_id = {user_id}")
 
-        # 2) 로그인 성공 시 user_table_{user_id} 구조 출력
-        desc_sql = f"DESC user_table_{user_id};"
-        cursor.execute(desc_sql)
-        table_info = cursor.fetchall()
-
-        print(f"user_table_{user_id} 테이블 구조:")
-        for row in table_info:
-            print(row)
+        # 2) 로그인 성공 시 착용 기록 수 출력 (공용 테이블 user_outfit, outfit_table.py)
+        count_sql = f"SELECT COUNT(*) FROM {OUTFIT_TABLE} WHERE user_id = %s"
+        cursor.execute(count_sql, (user_id,))
+        print(f"착용 기록 {cursor.fetchone()[0]}건")
 
         return True
 
@@ -57,7 +50,7 @@ def login(userid, password):
         if cursor:
             cursor.close()
         if conn:
-            conn.close()
+            pool.release(conn)  # 끝나지 않은 트랜잭션은 rollback, 끊긴 연결은 버림
 
 
 
@@ -0,0 +1,282 @@
+import argparse
+import time
+
+from db_pool import get_pool
+
+# -----------------------------
+# 착용 기록 공용 테이블 (user_table_{user_id} 대신 테이블 하나)
+#   - PRIMARY KEY (user_id, id): InnoDB는 PK 순서로 저장하므로 한 유저의 기록이 붙어 있음
+#     → 유저별 조회 / 수정 / 삭제가 PK 범위 검색
+#   - id는 AUTO_INCREMENT (전체에서 유일), (user_id, created_at) 인덱스로 기간 조회
+#   - 회원가입 때 DDL(CREATE TABLE)이 없어지고, 유저 수만큼 테이블이 생기지 않음
+#   - partitions를 주면 PARTITION BY HASH(user_id) (PK에 user_id가 있어서 가능)
+# -----------------------------
+OUTFIT_TABLE = "user_outfit"
+PROGRESS_TABLE = "user_outfit_migration"
+LEGACY_PREFIX = "user_table_"
+
+OUTFIT_COLUMNS = ("id", "top", "bottom", "weather", "temp", "wind_speed", "created_at")
+
+BATCH_SIZE = 5000
+
+# 예전 테이블은 created_at이 NULL 가능, user_outfit은 NOT NULL → NULL이던 행은 이 값으로 복사
+# (실제 기록 시각일 수 없는 값이라 나중에 WHERE created_at = NULL_CREATED_AT로 찾을 수 있음)
+NULL_CREATED_AT = "1970-01-01 00:00:00"
+
+# 복사하는 동안만 쓰는 세션 sql_mode: 잘림 / 잘못된 날짜 등을 경고 대신 오류로
+STRICT_SQL_MODE = "STRICT_ALL_TABLES,NO_ZERO_IN_DATE,NO_ZERO_DATE,ERROR_FOR_DIVISION_BY_ZERO"
+
+
+class MigrationError(Exception):
+    pass
+
+
+def create_outfit_table(cursor, partitions=None):
+    sql = f"""
+        CREATE TABLE IF NOT EXISTS {OUTFIT_TABLE} (
+            id BIGINT NOT NULL AUTO_INCREMENT,
+            user_id INT NOT NULL,
+            top varchar(20) not null,
+            bottom varchar(20) not null,
+            weather varchar(20),
+            temp float,
+            wind_speed float,
+            created_at datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, id),
+            KEY idx_id (id),
+            KEY idx_user_created (user_id, created_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """
+    if partitions:
+        sql += f" PARTITION BY HASH(user_id) PARTITIONS {int(partitions)}"
+    cursor.execute(sql)
+
+
+def create_progress_table(cursor):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} (
+            user_id INT NOT NULL PRIMARY KEY,
+            last_id BIGINT NOT NULL DEFAULT 0,
+            copied BIGINT NOT NULL DEFAULT 0,
+            updated_at datetime DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+
+
+# -----------------------------
+# user_table_* → user_outfit 온라인 마이그레이션
+#   1) user_outfit / 진행 테이블 생성, AUTO_INCREMENT를 예전 테이블들의 최대 id보다 크게
+#      (예전 id를 그대로 복사하므로 새 코드가 먼저 쓴 행과 (user_id, id)가 겹치지 않게)
+#   2) 유저 테이블마다 id 순서로 batch_size행씩 복사 (batch마다 commit)
+#      진행 상황(last_id)은 같은 트랜잭션에서 저장 → 중간에 끊겨도 다시 실행하면 이어서
+#      행을 조용히 버리거나 바꾸지 않게: INSERT IGNORE 대신 INSERT + 엄격 sql_mode,
+#      경고가 하나라도 나오면 그 batch를 rollback하고 MigrationError
+#      (SHOW WARNINGS는 마지막 문장 것만 보여서 batch 하나를 multi-row INSERT 한 문장으로 보냄)
+#      created_at이 NULL인 행만 명시적으로 NULL_CREATED_AT으로 채움 (개수 출력)
+#   3) 새 코드(SoleUser)로 바꾼 뒤 한 번 더 실행하면 그 사이 예전 테이블에 들어온 행만 추가 복사
+#   4) --verify: 유저별 행 수 + id 합 + 행 내용 checksum(CRC32 합) 비교, --drop: 확인된 예전 테이블 삭제
+#   5) --repair: 확인에서 불일치한 유저(복사한 뒤 예전 테이블에서 수정 / 삭제된 행)는
+#      user_outfit에서 그 유저의 복사분(id <= 진행 테이블 last_id)을 지우고 처음부터 다시 복사 → 다시 확인
+#      지우기 + 다시 복사는 유저마다 한 트랜잭션 (읽는 쪽에서 기록이 반쯤 비어 보이는 순간 없음)
+#      예전 테이블 쓰기를 멈춘 뒤(새 코드로 바꾼 뒤)에 실행 (새 코드가 쓴 행은 id가 last_id보다 커서 안 지워짐)
+#   테이블 전체를 잠그지 않고 작은 트랜잭션으로 나눠서 복사 (--sleep으로 batch 사이 쉬기)
+# -----------------------------
+def legacy_tables(cursor):
+    cursor.execute("SHOW TABLES LIKE %s", (LEGACY_PREFIX.replace("_", "\\_") + "%",))
+    out = []
+    for row in cursor.fetchall():
+        name = row[0] if isinstance(row, (tuple, list)) else next(iter(row.values()))
+        suffix = name[len(LEGACY_PREFIX):]
+        if suffix.isdigit():
+            out.append((int(suffix), name))
+    return sorted(out)
+
+
+def _bump_auto_increment(cursor, tables):
+    top = 0
+    for _, name in tables:
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {name}")
+        top = max(top, int(cursor.fetchone()[0]))
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {OUTFIT_TABLE}")
+    top = max(top, int(cursor.fetchone()[0]))
+    # AUTO_INCREMENT는 현재 값보다 작게는 안 바뀌므로 여러 번 실행해도 안전
+    cursor.execute(f"ALTER TABLE {OUTFIT_TABLE} AUTO_INCREMENT = {top + 1}")
+    return top
+
+
+def _progress(cursor, user_id):
+    cursor.execute(f"SELECT last_id, copied FROM {PROGRESS_TABLE} WHERE user_id = %s", (user_id,))
+    row = cursor.fetchone()
+    return (int(row[0]), int(row[1])) if row else (0, 0)
+
+
+def _legacy_columns():
+    # 예전 테이블에서 읽을 컬럼 (created_at만 NULL 대체)
+    return ", ".join("COALESCE(created_at, %s)" if c == "created_at" else c for c in OUTFIT_COLUMNS)
+
+
+def copy_user_table(conn, user_id, table, batch_size=BATCH_SIZE, sleep=0.0, commit=True):
+    """
+    user_table_{user_id} → user_outfit, 이미 복사한 id 다음부터.
+    commit=False면 batch마다 commit하지 않음 (repair_user_table이 한 트랜잭션으로 묶을 때)
+    반환: (이번에 복사한 행 수, 그중 created_at을 NULL_CREATED_AT으로 채운 행 수)
+    """
+    cols = ", ".join(OUTFIT_COLUMNS)
+    insert_sql = f"INSERT INTO {OUTFIT_TABLE} (user_id, {cols}) VALUES "
+    row_sql = f"(%s, {', '.join(['%s'] * len(OUTFIT_COLUMNS))})"
+    copied_now = filled = 0
+    with conn.cursor() as cursor:
+        last_id, copied = _progress(cursor, user_id)
+        while True:
+            cursor.execute(f"SELECT {_legacy_columns()}, created_at IS NULL FROM {table} "
+                           "WHERE id > %s ORDER BY id LIMIT %s", (NULL_CREATED_AT, last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            # batch 하나 = INSERT 한 문장 (executemany는 max_stmt_length마다 문장을 나눠서
+            # 앞 문장의 경고를 SHOW WARNINGS로 못 봄), batch_size 5000행이면 max_allowed_packet보다 훨씬 작음
+            cursor.execute(insert_sql + ", ".join([row_sql] * len(rows)),
+                           [v for r in rows for v in (user_id, *r[:-1])])
+            cursor.execute("SHOW WARNINGS")
+            warnings = cursor.fetchall()
+            if warnings:
+                conn.rollback()
+                raise MigrationError(f"{table} id {rows[0][0]}~{rows[-1][0]} 복사 중 경고 "
+                                     f"{len(warnings)}건: {list(warnings[:3])}")
+            last_id = int(rows[-1][0])
+            copied += len(rows)
+            copied_now += len(rows)
+            filled += sum(int(r[-1]) for r in rows)
+            cursor.execute(
+                f"REPLACE INTO {PROGRESS_TABLE} (user_id, last_id, copied) VALUES (%s, %s, %s)",
+                (user_id, last_id, copied))
+            if commit:
+                conn.commit()
+            if len(rows) < batch_size:
+                break
+            if sleep and commit:
+                time.sleep(sleep)
+    return copied_now, filled
+
+
+def repair_user_table(conn, user_id, table, batch_size=BATCH_SIZE):
+    """
+    확인에서 불일치한 유저: user_outfit의 복사분을 지우고 예전 테이블을 처음부터 다시 복사 (한 트랜잭션).
+    반환: copy_user_table과 같음
+    """
+    try:
+        with conn.cursor() as cursor:
+            last_id, _ = _progress(cursor, user_id)
+            cursor.execute(f"DELETE FROM {OUTFIT_TABLE} WHERE user_id = %s AND id <= %s", (user_id, last_id))
+            cursor.execute(f"DELETE FROM {PROGRESS_TABLE} WHERE user_id = %s", (user_id,))
+        result = copy_user_table(conn, user_id, table, batch_size, commit=False)
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+    return result
+
+
+def _aggregates_sql(table, created_at, where):
+    # 행 수, id 합, 행 내용 checksum (컬럼을 구분자로 이어 붙인 문자열의 CRC32 합, NULL은 '<NULL>')
+    fields = ", ".join(f"COALESCE({c}, '<NULL>')" for c in OUTFIT_COLUMNS if c != "created_at")
+    return (f"SELECT COUNT(*), COALESCE(SUM(id), 0), "
+            f"COALESCE(SUM(CRC32(CONCAT_WS('|', {fields}, {created_at}))), 0) FROM {table} {where}")
+
+
+def verify_user_table(conn, user_id, table):
+    """
+    예전 테이블 행이 그대로 user_outfit에 있는지: (행 수, id 합, checksum)을 양쪽에서 계산.
+    반환: (예전, 복사됨) — 같으면 일치
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+        max_id = cursor.fetchone()[0]
+        cursor.execute(_aggregates_sql(table, "COALESCE(created_at, %s)", ""), (NULL_CREATED_AT,))
+        old = tuple(int(v) for v in cursor.fetchone())
+        cursor.execute(_aggregates_sql(OUTFIT_TABLE, "created_at", "WHERE user_id = %s AND id <= %s"),
+                       (user_id, max_id))
+        new = tuple(int(v) for v in cursor.fetchone())
+    return old, new
+
+
+def migrate(batch_size=BATCH_SIZE, sleep=0.0, partitions=None, verify=False, drop=False, repair=False,
+            pool=None):
+    pool = pool or get_pool()
+    with pool.connection() as conn:
+        with conn.cursor() as cursor:
+            create_outfit_table(cursor, partitions)
+            create_progress_table(cursor)
+            tables = legacy_tables(cursor)
+            top = _bump_auto_increment(cursor, tables)
+            # 풀 연결이라 끝나면 원래 sql_mode로 되돌림
+            cursor.execute("SELECT @@SESSION.sql_mode")
+            old_mode = cursor.fetchone()[0]
+            cursor.execute("SET SESSION sql_mode = %s", (STRICT_SQL_MODE,))
+        conn.commit()
+        print(f"예전 테이블 {len(tables)}개, 최대 id {top} → {OUTFIT_TABLE} AUTO_INCREMENT {top + 1}")
+
+        total = total_filled = 0
+        t0 = time.perf_counter()
+        try:
+            for i, (user_id, table) in enumerate(tables, 1):
+                n, filled = copy_user_table(conn, user_id, table, batch_size, sleep)
+                total += n
+                total_filled += filled
+                if n:
+                    print(f"[{i}/{len(tables)}] {table}: +{n}행"
+                          + (f" (created_at NULL → {NULL_CREATED_AT}: {filled}행)" if filled else ""))
+            dt = time.perf_counter() - t0
+            print(f"복사 완료: {total}행 ({dt:.1f}s, {total / max(dt, 1e-9):.0f}행/s)"
+                  + (f", created_at을 채운 행 {total_filled}" if total_filled else ""))
+
+            if not (verify or drop or repair):
+                return total
+            bad = repaired = 0
+            for user_id, table in tables:
+                old, new = verify_user_table(conn, user_id, table)
+                if old != new and repair:
+                    # 다시 복사도 엄격 sql_mode로 (그래서 sql_mode를 되돌리기 전에)
+                    n, _ = repair_user_table(conn, user_id, table, batch_size)
+                    fixed = verify_user_table(conn, user_id, table)
+                    print(f"다시 복사: {table} {n}행, 예전 {old[0]}행 / 복사 {new[0]}행 → "
+                          + ("일치" if fixed[0] == fixed[1] else f"여전히 불일치 {fixed}"))
+                    old, new = fixed
+                    repaired += 1
+                if old != new:
+                    bad += 1
+                    print(f"불일치: {table} 예전 (행 수, id 합, checksum)={old} / 복사 {new}"
+                          + ("" if repair else " (--repair로 다시 복사)"))
+                elif drop:
+                    with conn.cursor() as cursor:
+                        cursor.execute(f"DROP TABLE {table}")
+                    conn.commit()
+            print(f"확인: {len(tables) - bad}/{len(tables)}개 일치"
+                  + (f" (다시 복사 {repaired}개)" if repaired else "")
+                  + (", 일치한 테이블 삭제" if drop else ""))
+        finally:
+            with conn.cursor() as cursor:
+                cursor.execute("SET SESSION sql_mode = %s", (old_mode,))
+    return total
+
+
+# -----------------------------
+# 실행
+#   python outfit_table.py                       # 테이블 생성 + 복사 (여러 번 실행해도 이어서)
+#   python outfit_table.py --verify              # 복사 후 행 수 비교
+#   python outfit_table.py --verify --drop       # 일치한 예전 테이블 삭제 (새 코드로 바꾼 뒤에)
+#   python outfit_table.py --repair              # 확인 + 불일치한 유저는 다시 복사 (새 코드로 바꾼 뒤에)
+#   python outfit_table.py --partitions 16       # 처음 만들 때만 적용
+# -----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--sleep", type=float, default=0.0, help="batch 사이 쉬는 시간 (초)")
+    parser.add_argument("--partitions", type=int, default=None)
+    parser.add_argument("--verify", action="store_true")
+    parser.add_argument("--drop", action="store_true")
+    parser.add_argument("--repair", action="store_true", help="확인에서 불일치한 유저는 지우고 다시 복사")
+    args = parser.parse_args()
+
+    migrate(args.batch_size, args.sleep, args.partitions, verify=args.verify, drop=args.drop,
+            repair=args.repair)
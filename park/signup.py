@@ -1,20 +1,16 @@
-import pymysql
+from db_pool import get_pool
 
 # -----------------------------
 # 회원가입 함수
 # -----------------------------
-def signup(userid, password, nickname, age=None, gender=None):
+def signup(userid, password, nickname, age=None, gender=None, pool=None):
+    pool = pool or get_pool()
     conn = None
     cursor = None
 
     try:
-        conn = pymysql.connect(
-            host="localhost",
-            user="dbid253",
-            password="dbpass253",
-            db="db25320",
-            charset="utf8mb4"
-        )
+        # 공용 연결 풀에서 빌려옴 (요청마다 TCP 연결 / 인증을 새로 하지 않음)
+        conn = pool.acquire()
         cursor = conn.cursor()
 
         # 1) ID 중복 검사
@@ -35,25 +31,9 @@ def signup(userid, password, nickname, age=None, gender=None):
         conn.commit()
 
         # 3) auto_increment user_id 가져오기
+        #    (착용 기록은 공용 테이블 user_outfit에 user_id로 저장 → 개인 테이블 생성 없음, outfit_table.py)
         user_id = cursor.lastrowid
         print(f"회원가입 성공. 부여된 user_id = {user_id}")
-
-        # 4) 개인 테이블 생성 (user_table_{user_id})
-        create_table_sql = f"""
-            CREATE TABLE user_table_{user_id} (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                top varchar(20) not null,
-                bottom varchar(20) not null,
-                weather varchar(20),
-                temp float,
-                wind_speed float,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-        """
-        cursor.execute(create_table_sql)
-        conn.commit()
-
-        print(f"user_table_{user_id} 테이블이 생성되었습니다.")
         return True
 
     except Exception as e:
@@ -64,7 +44,7 @@ def signup(userid, password, nickname, age=None, gender=None):
         if cursor:
             cursor.close()
         if conn:
-            conn.close()
+            pool.release(conn)  # 끝나지 않은 트랜잭션은 rollback, 끊긴 연결은 버림
 
 
 # -----------------------------
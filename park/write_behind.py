@@ -0,0 +1,270 @@
+import atexit
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, TimeoutError
+
+from db_pool import get_pool
+from outfit_table import OUTFIT_TABLE
+
+BATCH_SIZE = 500      # 한 번에 쓰는 최대 작업 수 (= commit 1번)
+MAX_DELAY = 0.05      # 첫 작업이 들어온 뒤 이 시간(초)이 지나면 batch_size가 안 차도 씀
+MAX_QUEUE = 20000     # 큐가 가득 차면 create()가 자리가 날 때까지 기다림 (메모리 상한)
+
+
+class CommitUnknown(Exception):
+    """commit 중 오류 — 그 batch가 반영됐는지 알 수 없음 (다시 쓰기 전에 read로 확인)"""
+
+
+# -----------------------------
+# 착용 기록 write-behind (SoleUser.create / update / delete 모아서 쓰기)
+#   - 호출하면 메모리 큐에 넣고 바로 반환, 백그라운드 스레드가 batch_size개 또는 max_delay초마다
+#     한 트랜잭션에서 들어온 순서대로 실행하고 commit 1번
+#     (INSERT도 한 행씩: multi-row INSERT의 AUTO_INCREMENT는 연속이라는 보장이 없어서
+#      행마다 lastrowid로 id를 받음 — auto_increment_increment / innodb_autoinc_lock_mode와 무관)
+#   - 호출마다 durable=True면 그 작업이 commit될 때까지 기다림 (기본은 기다리지 않음)
+#     반환값은 concurrent.futures.Future (create는 결과가 새 행 id)
+#   - commit 전에 실패하면 rollback 후 작업을 하나씩 다시 실행 (잘못된 행 하나 때문에 batch 전체를 잃지 않음)
+#     commit 자체가 실패하면 반영됐는지 알 수 없으므로 다시 실행하지 않고 batch 전체를 CommitUnknown으로 실패
+#     (다시 실행하면 이미 들어간 행이 중복으로 INSERT될 수 있음)
+#   - close() / 프로세스 종료(atexit) 때 남은 작업을 전부 쓰고 종료
+#   - 같은 유저의 쓰기가 큐에 남아 있으면 read 전에 sync()로 먼저 씀 (SoleUser.read_all)
+#   - on_create 훅 / callback은 쓰기 스레드에서 실행됨 → 거기서 durable=True나 sync()를 부르면
+#     자기 자신을 기다리게 되므로 RuntimeError (작업 추가는 가능, 큐가 가득 차도 기다리지 않고 넣음)
+#
+# 사용 예
+#   writer = OutfitWriter()
+#   SoleUser(..., user_id=7, writer=writer).create("후드", "청바지")
+#   writer.stats()
+# -----------------------------
+class OutfitWriter:
+    def __init__(self, pool=None, batch_size=BATCH_SIZE, max_delay=MAX_DELAY, max_queue=MAX_QUEUE,
+                 on_create=None):
+        """on_create(user_id, top, bottom, row_id): commit 직후 (SoleUser.on_create와 같은 형식)"""
+        self.pool = pool or get_pool()
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        self.on_create = on_create
+
+        self._queue = deque()          # (op, user_id, args, future, callback)
+        self._pending = defaultdict(int)
+        self._cond = threading.Condition()
+        self._first_at = None          # 큐가 비어 있다가 첫 작업이 들어온 시각
+        self._flush_now = False
+        self._closed = False
+
+        self.ops = 0
+        self.batches = 0
+        self.commits = 0
+        self.fallbacks = 0
+        self.commit_errors = 0
+        self.failed = 0
+        self.max_batch_seen = 0
+        self.flush_time = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="OutfitWriter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ---- 넣기 ----
+    def _submit(self, op, user_id, args, durable=False, callback=None):
+        fut = Future()
+        on_writer = threading.current_thread() is self._thread
+        if durable and on_writer:
+            raise RuntimeError("쓰기 스레드(on_create 훅 / callback)에서는 durable=True로 기다릴 수 없습니다.")
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("OutfitWriter가 닫혔습니다.")
+            # 쓰기 스레드는 자리가 나기를 기다리면 안 됨 (자리를 비우는 게 자기 자신)
+            while len(self._queue) >= self.max_queue and not on_writer:
+                self._cond.wait()
+            if not self._queue:
+                self._first_at = time.monotonic()
+            self._queue.append((op, user_id, args, fut, callback))
+            self._pending[user_id] += 1
+            if durable or len(self._queue) >= self.batch_size:
+                self._flush_now = durable or self._flush_now
+                self._cond.notify_all()
+        if durable:
+            fut.result()
+        return fut
+
+    def create(self, user_id, top, bottom, durable=False, callback=None):
+        return self._submit("insert", user_id, (top, bottom), durable, callback)
+
+    def update(self, user_id, row_id, durable=False, callback=None, **kwargs):
+        return self._submit("update", user_id, (row_id, kwargs), durable, callback)
+
+    def delete(self, user_id, row_id, durable=False, callback=None):
+        return self._submit("delete", user_id, (row_id,), durable, callback)
+
+    def pending(self, user_id=None):
+        with self._cond:
+            return len(self._queue) if user_id is None else self._pending.get(user_id, 0)
+
+    def sync(self, timeout=None):
+        """
+        지금까지 넣은 작업이 전부 끝날 때까지 기다림 (큐는 순서대로 처리되므로 마지막 작업만 기다리면 됨).
+        timeout초 안에 안 끝나면 TimeoutError, 실패한 작업의 예외는 올리지 않음 (그 작업 Future에서 확인).
+        쓰기 스레드(on_create 훅 / callback)에서 부르면 RuntimeError
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("쓰기 스레드(on_create 훅 / callback)에서는 sync()로 기다릴 수 없습니다.")
+        with self._cond:
+            if not self._queue:
+                last = None
+            else:
+                last = self._queue[-1][3]
+                self._flush_now = True
+                self._cond.notify_all()
+        if last is None:
+            # 큐는 비었지만 쓰는 중인 batch가 있을 수 있음
+            with self._cond:
+                if not self._cond.wait_for(lambda: not self._pending, timeout):
+                    raise TimeoutError(f"OutfitWriter.sync: {timeout}초 안에 쓰기가 끝나지 않았습니다.")
+            return
+        try:
+            last.result(timeout)
+        except TimeoutError:
+            raise
+        except Exception:
+            pass  # 실패한 작업의 예외는 그 작업 Future에서 확인
+
+    # ---- 백그라운드 ----
+    def _take_batch(self):
+        with self._cond:
+            while True:
+                if self._queue:
+                    due = self._first_at + self.max_delay
+                    if (self._flush_now or self._closed or len(self._queue) >= self.batch_size
+                            or time.monotonic() >= due):
+                        break
+                    self._cond.wait(max(due - time.monotonic(), 0.0))
+                elif self._closed:
+                    return None
+                else:
+                    self._cond.wait()
+            n = min(len(self._queue), self.batch_size)
+            batch = [self._queue.popleft() for _ in range(n)]
+            self._first_at = time.monotonic() if self._queue else None
+            if not self._queue:
+                self._flush_now = False
+            self._cond.notify_all()  # 큐 자리가 남 → 기다리던 _submit 깨움
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            t0 = time.perf_counter()
+            try:
+                results = self._write(batch)
+                self.commits += 1
+            except CommitUnknown as e:
+                self.commit_errors += 1
+                results = [e] * len(batch)
+            except Exception:
+                # commit 전에 실패 → rollback됐으므로 하나씩 다시 실행해도 중복 없음
+                self.fallbacks += 1
+                results = self._write_one_by_one(batch)
+            self.flush_time += time.perf_counter() - t0
+            self.batches += 1
+            self.ops += len(batch)
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+            self._finish(batch, results)
+
+    def _finish(self, batch, results):
+        with self._cond:
+            for (_, user_id, _, _, _) in batch:
+                self._pending[user_id] -= 1
+                if self._pending[user_id] <= 0:
+                    del self._pending[user_id]
+            self._cond.notify_all()
+        for (op, user_id, args, fut, callback), res in zip(batch, results):
+            if isinstance(res, Exception):
+                self.failed += 1
+                fut.set_exception(res)
+                continue
+            if op == "insert":
+                for hook in (self.on_create, callback):
+                    if hook is not None:
+                        try:
+                            hook(user_id, *args, res)
+                        except Exception as e:
+                            print("on_create 오류:", e)
+            elif callback is not None:
+                try:
+                    callback(user_id)
+                except Exception as e:
+                    print("callback 오류:", e)
+            fut.set_result(res)
+
+    def _execute(self, cursor, item):
+        # 반환: create는 새 행 id, update / delete는 바뀐 행 수
+        op, user_id, args, _, _ = item
+        if op == "insert":
+            top, bottom = args
+            cursor.execute(f"INSERT INTO {OUTFIT_TABLE} (user_id, top, bottom) VALUES (%s, %s, %s)",
+                           (user_id, top, bottom))
+            return cursor.lastrowid
+        if op == "update":
+            row_id, kwargs = args
+            fields = ", ".join([f"{k} = %s" for k in kwargs])
+            return cursor.execute(f"UPDATE {OUTFIT_TABLE} SET {fields} WHERE user_id = %s AND id = %s",
+                                  list(kwargs.values()) + [user_id, row_id])
+        return cursor.execute(f"DELETE FROM {OUTFIT_TABLE} WHERE user_id = %s AND id = %s",
+                              (user_id, args[0]))
+
+    def _commit(self, conn):
+        try:
+            conn.commit()
+        except Exception as e:
+            raise CommitUnknown(f"commit 중 오류, 반영 여부를 알 수 없음: {e!r}") from e
+
+    def _write(self, batch):
+        with self.pool.connection() as conn:
+            with conn.cursor() as cursor:
+                results = [self._execute(cursor, item) for item in batch]
+            self._commit(conn)
+        return results
+
+    def _write_one_by_one(self, batch):
+        results = []
+        for item in batch:
+            try:
+                with self.pool.connection() as conn:
+                    with conn.cursor() as cursor:
+                        res = self._execute(cursor, item)
+                    self._commit(conn)
+                self.commits += 1
+                results.append(res)
+            except Exception as e:
+                results.append(e)
+        return results
+
+    # ---- 종료 / 지표 ----
+    def close(self, timeout=None):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self):
+        with self._cond:
+            queued = len(self._queue)
+        return {
+            "queued": queued,
+            "ops": self.ops,
+            "batches": self.batches,
+            "commits": self.commits,
+            "avg_batch": self.ops / self.batches if self.batches else 0.0,
+            "max_batch_seen": self.max_batch_seen,
+            "fallbacks": self.fallbacks,
+            "commit_errors": self.commit_errors,
+            "failed": self.failed,
+            "avg_flush_ms": self.flush_time / self.batches * 1000.0 if self.batches else 0.0,
+        }